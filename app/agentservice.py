@@ -1,91 +1,294 @@
 from langgraph.graph import StateGraph
-from .llm import LLMRegistry
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.config import get_stream_writer
+from .llm import LLMRegistry, BaseLLMAdapter
 from .retrievers.text2cypher_builder import Text2CypherRetrieverBuilder
-from neo4j_graphrag.retrievers import Text2CypherRetriever
+from .retrievers.text2cypher_retriever import StagedText2CypherRetriever
+from .retrievers.cypher_guard import CypherGuardrailError, CypherGuardrails
+from .retrievers.cypher_validator import CypherValidation, CypherValidator, EvaluationTierStats
 from .pydantictypes import AppState, Text2CypherRetrieverOutput, MultiTurnState
+from .cache import CypherCache, GraphEpoch, ResultCache, SchemaCache, SemanticCache, normalize_question
+from .metrics import timed_node
+from .tracing import TRACER
+from .utils.result_packing import pack_records
+from neo4j import AsyncDriver
 from neo4j_graphrag.embeddings.base import Embedder
 from neo4j.exceptions import CypherSyntaxError
 from neo4j_graphrag.exceptions import (
     Text2CypherRetrievalError,
     SearchValidationError,
 )
-from neo4j_graphrag.types import RetrieverResultItem
-from typing import Optional, List, Dict, Any
+from neo4j_graphrag.types import RawSearchResult, RetrieverResultItem
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Iterator, Tuple, Union
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import asyncio
+import threading
+import time
+
+FAILED_ANSWER_PREFIX = "⚠️ Failed to generate"
+
+
+class QueuedLLMCall:
+    """A prompt submitted to the LLM worker pool; `running` is set once a worker picks it up.
+
+    `cancel` keeps a queued call from reaching the adapter. With `stream` the answer is read chunk by
+    chunk, so `cancel` also stops a call that is already generating.
+    """
+
+    def __init__(
+        self,
+        executor: ThreadPoolExecutor,
+        ask: Callable[[str], str],
+        prompt: str,
+        stream: Optional[Callable[[str], Iterator[str]]] = None
+    ):
+        self.running = threading.Event()
+        self.cancelled = threading.Event()
+        self.started_at: Optional[float] = None
+        self.future: Future = executor.submit(TRACER.wrap(self._run), ask, prompt, stream)
+
+    def _run(self, ask: Callable[[str], str], prompt: str, stream: Optional[Callable[[str], Iterator[str]]]) -> str:
+        if self.cancelled.is_set():
+            raise CancelledError()
+        self.started_at = time.monotonic()
+        self.running.set()
+        if stream is None:
+            return ask(prompt)
+
+        chunks = []
+        generator = stream(prompt)
+        try:
+            for chunk in generator:
+                if self.cancelled.is_set():
+                    print("🛑 [llm_only_node] Speculative answer no longer needed, closing the stream")
+                    raise CancelledError()
+                chunks.append(chunk)
+        finally:
+            # Closing the stream ends the request, so the provider stops generating
+            generator.close()
+        return "".join(chunks)
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        self.future.cancel()
 
 
 class AgentService:
-    def __init__(self, llm_registry: LLMRegistry, driver, database: str, embedder: Embedder):
+    def __init__(
+        self,
+        llm_registry: LLMRegistry,
+        driver,
+        database: str,
+        embedder: Embedder,
+        llm_timeout: float = 60.0,
+        max_llm_workers: int = 8,
+        async_driver: Optional[AsyncDriver] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        cypher_cache: Optional[CypherCache] = None,
+        result_cache: Optional[ResultCache] = None,
+        graph_epoch: Optional[GraphEpoch] = None,
+        static_validation: bool = True,
+        static_valid: bool = True,
+        result_token_budget: Optional[int] = 6000,
+        cypher_guardrails: Optional[CypherGuardrails] = None,
+        schema_cache: Optional[SchemaCache] = None,
+        examples_top_k: Optional[int] = None,
+        schema_pruning: bool = False
+    ):
         self.llm_registry = llm_registry
         self.driver = driver
+        self.async_driver = async_driver
         self.database = database
+        self.llm_timeout = llm_timeout
+        self.result_token_budget = result_token_budget
+        self.llm_executor = ThreadPoolExecutor(max_workers=max_llm_workers, thread_name_prefix="agent-llm")
+        self.cypher_cache = cypher_cache
+        self.result_cache = result_cache
+        self.graph_epoch = graph_epoch
+        self.cypher_guardrails = cypher_guardrails
+        self.schema_cache = schema_cache
+        self.examples_top_k = examples_top_k
+        self.schema_pruning = schema_pruning
+        self.static_valid = static_valid
+        self.embedder = embedder
         self.text2cypher_retriever = self._build_text2cypher_retriever()
+        self.cypher_validator = self._build_cypher_validator() if static_validation else None
+        self.evaluation_stats = EvaluationTierStats()
+        if self.schema_cache is not None and self.cypher_validator is not None:
+            self.schema_cache.subscribe(lambda snapshot: setattr(self.cypher_validator, "structured_schema", snapshot.structured_schema))
         self.graph = self._build_graph()
-        self.embedder = embedder
+        self.semantic_cache = semantic_cache
+
+        # Cached answers embed graph data, so they go stale together with the graph
+        if self.graph_epoch is not None and self.semantic_cache is not None:
+            self.graph_epoch.subscribe(self.semantic_cache.clear)
 
-    def _build_text2cypher_retriever(self) -> Text2CypherRetriever:
+    def _build_text2cypher_retriever(self) -> StagedText2CypherRetriever:
         return Text2CypherRetrieverBuilder(
             driver=self.driver,
             database=self.database,
-            llm=self.llm_registry.neo4j_llm
+            llm=self.llm_registry.neo4j_llm,
+            async_driver=self.async_driver,
+            cypher_cache=self.cypher_cache,
+            result_cache=self.result_cache,
+            guardrails=self.cypher_guardrails,
+            schema_cache=self.schema_cache,
+            embedder=self.embedder,
+            examples_top_k=self.examples_top_k,
+            schema_pruning=self.schema_pruning
         ).build()
 
-    def _text2cypher_node(self, state: MultiTurnState) -> MultiTurnState:
+    def _build_cypher_validator(self) -> Optional[CypherValidator]:
+        if self.driver is None:
+            return None
+        return CypherValidator(
+            driver=self.driver,
+            database=self.database,
+            structured_schema=getattr(self.text2cypher_retriever, "structured_schema", None),
+            async_driver=self.async_driver,
+            static_valid=self.static_valid
+        )
+
+    def _text2cypher_node(self, state: MultiTurnState, config: RunnableConfig) -> MultiTurnState:
         """Generate Cypher query and execute it"""
         print(f"🔍 [text2cypher_node] Processing question: {state.current_question}")
-        
+
         try:
             # Get search results from Text2Cypher retriever
-            raw_result = self.text2cypher_retriever.get_search_results(state.current_question)
-            cypher_query = raw_result.metadata.get("cypher", "").strip()
-            
-            # Format results
-            formatter = self.text2cypher_retriever.result_formatter or (lambda r: RetrieverResultItem(content=str(r)))
-            items = [formatter(r) for r in raw_result.records]
-            
-            # Update state with results
-            state.results = Text2CypherRetrieverOutput(
-                cypher=cypher_query,
-                results=items
+            raw_result = self.text2cypher_retriever.get_search_results(
+                state.current_question, query_vector=self._question_embedding(config)
+            )
+            self._apply_search_results(state, raw_result)
+        except Exception as e:
+            self._apply_text2cypher_error(state, e)
+
+        return state
+
+    async def _atext2cypher_node(self, state: MultiTurnState, config: RunnableConfig) -> MultiTurnState:
+        """Async variant of _text2cypher_node using async LLM and Neo4j calls"""
+        print(f"🔍 [text2cypher_node] Processing question: {state.current_question}")
+
+        try:
+            raw_result = await self.text2cypher_retriever.aget_search_results(
+                state.current_question, query_vector=self._question_embedding(config)
             )
-            state.cypher_generated = cypher_query
-            state.records_found = len(items)
-            state.error_message = None
-            
-            print(f"✅ [text2cypher_node] Generated Cypher: {cypher_query}")
-            print(f"✅ [text2cypher_node] Found {len(items)} records")
-            
-        except Text2CypherRetrievalError as e:
-            print(f"❌ [text2cypher_node] Text2Cypher error: {e}")
-            state.error_message = f"Failed to generate valid Cypher query: {str(e)}"
+            self._apply_search_results(state, raw_result)
+        except Exception as e:
+            self._apply_text2cypher_error(state, e)
+
+        return state
+
+    def _apply_search_results(self, state: MultiTurnState, raw_result: RawSearchResult) -> None:
+        cypher_query = raw_result.metadata.get("cypher", "").strip()
+
+        # Format results
+        formatter = self.text2cypher_retriever.result_formatter or (lambda r: RetrieverResultItem(content=str(r)))
+        items = [formatter(r) for r in raw_result.records]
+
+        # Update state with results
+        plan = raw_result.metadata.get("plan")
+        state.results = Text2CypherRetrieverOutput(
+            cypher=cypher_query,
+            results=items,
+            estimated_rows=plan.estimated_rows if plan else None,
+            plan_notifications=plan.notifications if plan else None
+        )
+        state.cypher_generated = cypher_query
+        state.records_found = len(items)
+        state.results_truncated = raw_result.metadata.get("truncated", False)
+        state.error_message = None
+
+        print(f"✅ [text2cypher_node] Generated Cypher: {cypher_query}")
+        print(f"✅ [text2cypher_node] Found {len(items)} records")
+
+    def _apply_text2cypher_error(self, state: MultiTurnState, error: Exception) -> None:
+        if isinstance(error, CypherGuardrailError):
+            print(f"🛑 [text2cypher_node] Query refused by guardrails: {error}")
+            state.error_message = f"Generated Cypher was too expensive to run: {str(error)}"
+            state.needs_clarification = True
+            state.clarification_request = "That question would return far too much data to answer in one go. Could you narrow it down, for example to a market, property type or time period?"
+
+        elif (getattr(error, "code", None) or "").startswith("Neo.ClientError.Transaction.TransactionTimedOut"):
+            print(f"⏱️ [text2cypher_node] Cypher timed out: {error}")
+            state.error_message = f"Generated Cypher timed out: {str(error)}"
+            state.needs_clarification = True
+            state.clarification_request = "The database query for that question took too long. Could you narrow it down, for example to a market, property type or time period?"
+
+        elif isinstance(error, Text2CypherRetrievalError):
+            print(f"❌ [text2cypher_node] Text2Cypher error: {error}")
+            state.error_message = f"Failed to generate valid Cypher query: {str(error)}"
             state.needs_clarification = True
             state.clarification_request = "I couldn't understand your question well enough to generate a database query. Could you please provide more specific details about what you're looking for?"
-            
-        except CypherSyntaxError as e:
-            print(f"❌ [text2cypher_node] Cypher syntax error: {e}")
-            state.error_message = f"Generated Cypher had syntax error: {str(e)}"
+
+        elif isinstance(error, CypherSyntaxError):
+            print(f"❌ [text2cypher_node] Cypher syntax error: {error}")
+            state.error_message = f"Generated Cypher had syntax error: {str(error)}"
             state.needs_clarification = True
             state.clarification_request = "I generated a query but it had a syntax error. Could you rephrase your question or provide more specific details?"
-            
-        except Exception as e:
-            print(f"🔥 [text2cypher_node] Unexpected error: {e}")
-            state.error_message = f"Unexpected error: {str(e)}"
+
+        else:
+            print(f"🔥 [text2cypher_node] Unexpected error: {error}")
+            state.error_message = f"Unexpected error: {str(error)}"
             state.needs_clarification = True
             state.clarification_request = "I encountered an unexpected error. Could you try rephrasing your question?"
-        
-        return state
 
     def _evaluate_cypher_node(self, state: MultiTurnState) -> MultiTurnState:
         """Evaluate if the generated Cypher query matches the user's intent"""
         print(f"🔍 [evaluate_cypher_node] Evaluating Cypher: {state.cypher_generated}")
-        
+
         if state.error_message:
             # If there was an error, we already set needs_clarification in text2cypher_node
+            self._record_evaluation_tier(state, "skipped")
             return state
-        
-        adapter = self.llm_registry.get_adapter("langgraph")
-        
+
+        if self.cypher_validator is not None:
+            validation = self.cypher_validator.validate(state.current_question, state.cypher_generated, state.records_found, self._plan_notifications(state))
+            if self._apply_static_validation(state, validation):
+                return state
+
+        adapter = self.llm_registry.get_adapter("evaluation")
+        self._record_evaluation_tier(state, "llm")
+
+        try:
+            evaluation_result = adapter.ask(self._build_evaluation_prompt(state)).strip()
+            self._apply_evaluation_result(state, evaluation_result)
+        except Exception as e:
+            self._apply_evaluation_failure(state, e)
+
+        return state
+
+    async def _aevaluate_cypher_node(self, state: MultiTurnState) -> MultiTurnState:
+        """Async variant of _evaluate_cypher_node"""
+        print(f"🔍 [evaluate_cypher_node] Evaluating Cypher: {state.cypher_generated}")
+
+        if state.error_message:
+            self._record_evaluation_tier(state, "skipped")
+            return state
+
+        if self.cypher_validator is not None:
+            validation = await self.cypher_validator.avalidate(state.current_question, state.cypher_generated, state.records_found, self._plan_notifications(state))
+            if self._apply_static_validation(state, validation):
+                return state
+
+        adapter = self.llm_registry.get_adapter("evaluation")
+        self._record_evaluation_tier(state, "llm")
+
+        try:
+            evaluation_result = (await adapter.aask(self._build_evaluation_prompt(state))).strip()
+            self._apply_evaluation_result(state, evaluation_result)
+        except Exception as e:
+            self._apply_evaluation_failure(state, e)
+
+        return state
+
+    @staticmethod
+    def _plan_notifications(state: MultiTurnState) -> Optional[List[Dict[str, Any]]]:
+        # Reuse the guardrail EXPLAIN instead of explaining the same query again
+        return state.results.plan_notifications if state.results else None
+
+    def _build_evaluation_prompt(self, state: MultiTurnState) -> str:
         # Create evaluation prompt
-        evaluation_prompt = f"""
+        return f"""
         You are an expert real estate data analyst evaluating if a Cypher query matches a user's question.
         
         User Question: "{state.current_question}"
@@ -104,66 +307,158 @@ class AgentService:
         
         If you choose "NEEDS_CLARIFICATION", also provide a brief explanation of what's missing or unclear.
         """
-        
-        try:
-            evaluation_result = adapter.ask(evaluation_prompt).strip()
-            print(f"🔍 [evaluate_cypher_node] Evaluation result: {evaluation_result}")
-            
-            if evaluation_result.startswith("NEEDS_CLARIFICATION"):
-                state.needs_clarification = True
-                # Extract clarification request if provided
-                if ":" in evaluation_result:
-                    state.clarification_request = evaluation_result.split(":", 1)[1].strip()
-                else:
-                    state.clarification_request = "I need more specific details to answer your question accurately. Could you provide more context?"
-                    
-            elif evaluation_result.startswith("NO_RESULTS"):
-                state.needs_clarification = True
-                state.clarification_request = "Your query is valid, but I found no matching data in the database. Would you like to try a broader search or provide different criteria?"
-                
-            else:  # VALID
-                state.needs_clarification = False
-                state.clarification_request = None
-                
-        except Exception as e:
-            print(f"⚠️ [evaluate_cypher_node] Evaluation failed: {e}")
-            # Default to valid if evaluation fails
+
+    def _apply_evaluation_result(self, state: MultiTurnState, evaluation_result: str) -> None:
+        print(f"🔍 [evaluate_cypher_node] Evaluation result: {evaluation_result}")
+
+        if evaluation_result.startswith("NEEDS_CLARIFICATION"):
+            state.needs_clarification = True
+            # Extract clarification request if provided
+            if ":" in evaluation_result:
+                state.clarification_request = evaluation_result.split(":", 1)[1].strip()
+            else:
+                state.clarification_request = "I need more specific details to answer your question accurately. Could you provide more context?"
+
+        elif evaluation_result.startswith("NO_RESULTS"):
+            state.needs_clarification = True
+            state.clarification_request = "Your query is valid, but I found no matching data in the database. Would you like to try a broader search or provide different criteria?"
+
+        else:  # VALID
             state.needs_clarification = False
             state.clarification_request = None
-        
-        return state
 
-    def _format_response_node(self, state: MultiTurnState) -> MultiTurnState:
+    def _apply_static_validation(self, state: MultiTurnState, validation: CypherValidation) -> bool:
+        """Apply a conclusive static verdict; returns False when the LLM evaluator has to decide"""
+        if validation.verdict is None:
+            print(f"🔍 [evaluate_cypher_node] Static checks inconclusive, escalating to LLM: {'; '.join(validation.reasons)}")
+            return False
+
+        self._record_evaluation_tier(state, "static", validation.verdict)
+        if validation.verdict == "NEEDS_CLARIFICATION":
+            self._apply_evaluation_result(state, (
+                "NEEDS_CLARIFICATION: The query I generated does not match the data in the graph "
+                f"({'; '.join(validation.reasons)}). Could you rephrase your question or add more detail?"
+            ))
+        else:
+            self._apply_evaluation_result(state, validation.verdict)
+        return True
+
+    def _record_evaluation_tier(self, state: MultiTurnState, tier: str, verdict: Optional[str] = None) -> None:
+        state.evaluation_tier = tier
+        self.evaluation_stats.record(tier, verdict)
+
+    def _apply_evaluation_failure(self, state: MultiTurnState, error: Exception) -> None:
+        print(f"⚠️ [evaluate_cypher_node] Evaluation failed: {error}")
+        # Default to valid if evaluation fails
+        state.needs_clarification = False
+        state.clarification_request = None
+
+    def _llm_only_node(self, state: MultiTurnState, config: RunnableConfig) -> Dict[str, Any]:
+        """Start the LLM-only answer as soon as the question is known; format collects it"""
+        print(f"🔍 [llm_only_node] Starting speculative LLM-only answer")
+        speculation = self._speculation(config)
+        if speculation is not None:
+            adapter = self.llm_registry.get_adapter("llm_only")
+            # Streamed, so a clarification can stop it mid-answer like the async path cancels its task
+            speculation["llm_only"] = QueuedLLMCall(self.llm_executor, adapter.ask, self._build_llm_only_prompt(state), stream=adapter.stream)
+        # No state updates, so this branch never conflicts with text2cypher in the same step
+        return {}
+
+    async def _allm_only_node(self, state: MultiTurnState, config: RunnableConfig) -> Dict[str, Any]:
+        """Async variant of _llm_only_node"""
+        print(f"🔍 [llm_only_node] Starting speculative LLM-only answer")
+        speculation = self._speculation(config)
+        if speculation is not None:
+            adapter = self.llm_registry.get_adapter("llm_only")
+            speculation["llm_only"] = asyncio.create_task(self._aask_one(adapter, "llm_only", self._build_llm_only_prompt(state)))
+        return {}
+
+    def _format_response_node(self, state: MultiTurnState, config: RunnableConfig) -> MultiTurnState:
         """Format the final response for the user"""
         print(f"🔍 [format_response_node] Formatting response")
-        
+        speculative = (self._speculation(config) or {}).pop("llm_only", None)
+
         if state.needs_clarification:
+            # The speculative LLM-only answer is not shown with a clarification, drop it
+            if speculative:
+                speculative.cancel()
             # Return clarification request
             state.formatted_response = state.clarification_request
             state.llm_only_response = None
             return state
-        
-        adapter = self.llm_registry.get_adapter("langgraph")
-        
-        # Format successful response
-        cypher = state.results.cypher if state.results else None
-        records = state.results.results if state.results else []
-        records_text = "\n".join(r.content for r in records)
-        
+
+        prompts = self._build_format_prompts(state)
+
+        if speculative:
+            answers = self._ask_concurrently({"graph": prompts["graph"]})
+            answers["llm_only"] = self._collect_answer("llm_only", speculative)
+        else:
+            # Both prompts are independent, so run them side by side
+            answers = self._ask_concurrently(prompts)
+        self._apply_format_answers(state, answers)
+
+        return state
+
+    async def _aformat_response_node(self, state: MultiTurnState, config: RunnableConfig) -> MultiTurnState:
+        """Async variant of _format_response_node; streams the graph answer tokens when astream asked for them"""
+        print(f"🔍 [format_response_node] Formatting response")
+        speculative = (self._speculation(config) or {}).pop("llm_only", None)
+
+        if state.needs_clarification:
+            if speculative:
+                speculative.cancel()
+            state.formatted_response = state.clarification_request
+            state.llm_only_response = None
+            return state
+
+        on_token = None
+        if config.get("configurable", {}).get("stream_tokens"):
+            writer = get_stream_writer()
+            on_token = lambda name, text: writer({"event": "token", "data": {"answer": name, "text": text}})
+
+        prompts = self._build_format_prompts(state)
+        if speculative:
+            answers = await self._aask_concurrently({"graph": prompts["graph"]}, on_token=on_token, streamed=("graph",))
+            answers["llm_only"] = await speculative
+        else:
+            answers = await self._aask_concurrently(prompts, on_token=on_token, streamed=("graph",))
+        self._apply_format_answers(state, answers)
+
+        return state
+
+    @staticmethod
+    def _speculation(config: Optional[RunnableConfig]) -> Optional[Dict[str, Any]]:
+        # Per-run holder for in-flight speculative calls, created by _run_config
+        return (config or {}).get("configurable", {}).get("speculation")
+
+    @staticmethod
+    def _question_embedding(config: Optional[RunnableConfig]) -> Optional[List[float]]:
+        # Embedded once for the semantic cache; example selection and schema pruning reuse it
+        return (config or {}).get("configurable", {}).get("question_embedding")
+
+    @staticmethod
+    def _run_config(**configurable) -> RunnableConfig:
+        return {"configurable": {"speculation": {}, **configurable}}
+
+    def _build_format_prompts(self, state: MultiTurnState) -> Dict[str, str]:
+        return {"llm_only": self._build_llm_only_prompt(state), "graph": self._build_graph_prompt(state)}
+
+    def _build_llm_only_prompt(self, state: MultiTurnState) -> str:
         # LLM-only interpretation
-        llm_only_prompt = f"""
+        return f"""
         You are a CBRE real estate genai assistant. Interpret this question and give your best possible answer using your own knowledge.
 
         Question: "{state.current_question}"
         """.strip()
 
-        try:
-            state.llm_only_response = adapter.ask(llm_only_prompt)
-        except Exception as e:
-            state.llm_only_response = f"⚠️ Failed to generate LLM-only answer: {str(e)}"
+    def _build_graph_prompt(self, state: MultiTurnState) -> str:
+        # Format successful response
+        cypher = state.results.cypher if state.results else None
+        records = state.results.results if state.results else []
+        records_text = pack_records(records, self.result_token_budget, getattr(self.llm_registry, "model_name", None))
 
         # Graph-enhanced response
-        graph_prompt = f"""
+        return f"""
         You are an expert real estate assistant. A Cypher query was run on a Neo4j database to answer this user question.
 
         Question: "{state.current_question}"
@@ -178,49 +473,341 @@ class AgentService:
         can you nicely format as a list output.
         """.strip()
 
+    def _apply_format_answers(self, state: MultiTurnState, answers: Dict[str, Any]) -> None:
+        llm_only_answer = answers["llm_only"]
+        if isinstance(llm_only_answer, Exception):
+            state.llm_only_response = f"{FAILED_ANSWER_PREFIX} LLM-only answer: {str(llm_only_answer)}"
+        else:
+            state.llm_only_response = llm_only_answer
+
+        graph_answer = answers["graph"]
+        if isinstance(graph_answer, Exception):
+            state.formatted_response = f"{FAILED_ANSWER_PREFIX} Graph-enhanced answer: {str(graph_answer)}"
+        else:
+            state.formatted_response = graph_answer
+
+    def _format_adapter(self, name: str) -> BaseLLMAdapter:
+        # The graph answer summarizes query results; the LLM-only answer comes from the model's own knowledge
+        return self.llm_registry.get_adapter("summarization" if name == "graph" else "llm_only")
+
+    def _ask_concurrently(self, prompts: Dict[str, str]) -> Dict[str, Any]:
+        """Send independent prompts in parallel; each answer is either the response or the exception it raised"""
+        calls = {
+            name: QueuedLLMCall(self.llm_executor, self._format_adapter(name).ask, prompt)
+            for name, prompt in prompts.items()
+        }
+        return {name: self._collect_answer(name, call) for name, call in calls.items()}
+
+    def _collect_answer(self, name: str, call: QueuedLLMCall) -> Any:
+        # Time spent queued behind other requests' calls is not held against this one: its timeout
+        # starts when a worker picks it up, and the wait for a worker gets a timeout of its own
+        if not call.running.wait(timeout=self.llm_timeout):
+            call.cancel()
+            print(f"⏱️ [ask_concurrently] '{name}' prompt waited {self.llm_timeout}s for a free LLM worker")
+            return TimeoutError(f"No LLM worker was free within {self.llm_timeout}s")
+
+        remaining = self.llm_timeout - (time.monotonic() - call.started_at)
         try:
-            state.formatted_response = adapter.ask(graph_prompt)
+            return call.future.result(timeout=max(remaining, 0.0))
+        except FutureTimeoutError:
+            call.cancel()
+            print(f"⏱️ [ask_concurrently] '{name}' prompt timed out after {self.llm_timeout}s")
+            return TimeoutError(f"LLM call timed out after {self.llm_timeout}s")
         except Exception as e:
-            state.formatted_response = f"⚠️ Failed to generate Graph-enhanced answer: {str(e)}"
+            print(f"⚠️ [ask_concurrently] '{name}' prompt failed: {e}")
+            return e
 
-        return state
+    async def _aask_concurrently(
+        self,
+        prompts: Dict[str, str],
+        on_token: Optional[Callable[[str, str], None]] = None,
+        streamed: tuple = ()
+    ) -> Dict[str, Any]:
+        """Async variant of _ask_concurrently; timed out calls are cancelled.
+
+        Prompts named in `streamed` are streamed and every chunk is passed to `on_token(name, text)`.
+        """
+        answers = await asyncio.gather(*(
+            self._aask_one(self._format_adapter(name), name, prompt, on_token if name in streamed else None)
+            for name, prompt in prompts.items()
+        ))
+        return dict(zip(prompts.keys(), answers))
+
+    async def _aask_one(
+        self,
+        adapter: BaseLLMAdapter,
+        name: str,
+        prompt: str,
+        on_token: Optional[Callable[[str, str], None]] = None
+    ) -> Any:
+        """Ask one prompt with the LLM timeout; returns the response or the exception it raised"""
+        async def stream() -> str:
+            chunks = []
+            async for text in adapter.astream(prompt):
+                chunks.append(text)
+                on_token(name, text)
+            return "".join(chunks)
+
+        call = stream() if on_token else adapter.aask(prompt)
+        try:
+            return await asyncio.wait_for(call, timeout=self.llm_timeout)
+        except asyncio.TimeoutError:
+            print(f"⏱️ [ask_concurrently] '{name}' prompt timed out after {self.llm_timeout}s")
+            return TimeoutError(f"LLM call timed out after {self.llm_timeout}s")
+        except Exception as e:
+            print(f"⚠️ [ask_concurrently] '{name}' prompt failed: {e}")
+            return e
 
     def _build_graph(self):
-        """Build the simplified graph with only Text2Cypher and evaluation nodes"""
+        """Build the graph: text2cypher -> evaluate -> format, with the LLM-only answer running alongside"""
         builder = StateGraph(state_schema=MultiTurnState)
 
-        # Add nodes
-        builder.add_node("text2cypher", self._text2cypher_node)
-        builder.add_node("evaluate", self._evaluate_cypher_node)
-        builder.add_node("format", self._format_response_node)
+        # Add nodes; each has a sync implementation for invoke and an async one for ainvoke, timed for /metrics
+        nodes = {
+            "text2cypher": (self._text2cypher_node, self._atext2cypher_node),
+            "evaluate": (self._evaluate_cypher_node, self._aevaluate_cypher_node),
+            "llm_only": (self._llm_only_node, self._allm_only_node),
+            "format": (self._format_response_node, self._aformat_response_node)
+        }
+        for name, (func, afunc) in nodes.items():
+            builder.add_node(name, RunnableLambda(timed_node(name, func), afunc=timed_node(name, afunc), name=name))
 
-        # Set entry point
+        # Set entry points; the LLM-only answer only needs the question, so it starts alongside text2cypher
         builder.set_entry_point("text2cypher")
+        builder.set_entry_point("llm_only")
 
-        # Add edges
+        # Add edges; format waits for both branches
         builder.add_edge("text2cypher", "evaluate")
-        builder.add_edge("evaluate", "format")
+        builder.add_edge(["evaluate", "llm_only"], "format")
 
         # Set finish point
         builder.set_finish_point("format")
 
         return builder.compile()
 
-    def run(self, question: str, conversation_history: Optional[List[Dict[str, Any]]] = None) -> MultiTurnState:
-        """Run the multi-turn agent with conversation context"""
+    def _initial_state(self, question: str, conversation_history: Optional[List[Dict[str, Any]]] = None) -> MultiTurnState:
         # Initialize state with current question and conversation history
-        initial_state = MultiTurnState(
+        return MultiTurnState(
             current_question=question,
             conversation_history=conversation_history or [],
             turn_number=len(conversation_history) + 1 if conversation_history else 1
         )
-        
-        # Run the graph
-        raw_state = self.graph.invoke(initial_state)
-        return MultiTurnState(**raw_state)
 
-    def add_to_conversation(self, state: MultiTurnState, user_response: str) -> MultiTurnState:
-        """Add user's clarification response to conversation and continue"""
+    def run(self, question: str, conversation_history: Optional[List[Dict[str, Any]]] = None) -> MultiTurnState:
+        """Run the multi-turn agent with conversation context"""
+        with TRACER.trace("agent.run", question=question):
+            initial_state = self._initial_state(question, conversation_history)
+
+            embedding = self._embed_for_cache(initial_state)
+            cached = self._cached_answer(initial_state, embedding)
+            if cached:
+                return cached
+
+            # Run the graph
+            raw_state = self.graph.invoke(initial_state, config=self._run_config(question_embedding=embedding))
+            state = MultiTurnState(**raw_state)
+            self._remember_answer(state, embedding)
+            return state
+
+    async def arun(self, question: str, conversation_history: Optional[List[Dict[str, Any]]] = None) -> MultiTurnState:
+        """Async variant of run; never blocks the event loop on LLM or Neo4j calls"""
+        with TRACER.trace("agent.run", question=question):
+            initial_state = self._initial_state(question, conversation_history)
+
+            embedding = await self._aembed_for_cache(initial_state)
+            cached = self._cached_answer(initial_state, embedding)
+            if cached:
+                return cached
+
+            raw_state = await self.graph.ainvoke(initial_state, config=self._run_config(question_embedding=embedding))
+            state = MultiTurnState(**raw_state)
+            self._remember_answer(state, embedding)
+            return state
+
+    def run_many(self, questions: List[str], max_concurrency: int = 8) -> List[Union[MultiTurnState, Exception]]:
+        """Answer a batch of standalone questions, at most `max_concurrency` at a time.
+
+        Results come back in input order; a question that failed gets the exception it raised instead of a state.
+        Questions that only differ in case, punctuation or spacing are answered once.
+        """
+        groups = self._group_batch(questions)
+        results: List[Union[MultiTurnState, Exception]] = [None] * len(questions)
+
+        def run_one(question: str) -> Union[MultiTurnState, Exception]:
+            try:
+                return self.run(question)
+            except Exception as e:
+                print(f"⚠️ [run_many] Question failed: {question}: {e}")
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="agent-batch") as pool:
+            futures = {pool.submit(TRACER.wrap(run_one), questions[indexes[0]]): indexes for indexes in groups}
+            for future, indexes in futures.items():
+                result = future.result()
+                for i in indexes:
+                    results[i] = self._batch_result(result, questions[i])
+        return results
+
+    async def arun_many(self, questions: List[str], max_concurrency: int = 8) -> List[Union[MultiTurnState, Exception]]:
+        """Async variant of run_many"""
+        results: List[Union[MultiTurnState, Exception]] = [None] * len(questions)
+        async for i, result in self.astream_many(questions, max_concurrency):
+            results[i] = result
+        return results
+
+    async def astream_many(
+        self,
+        questions: List[str],
+        max_concurrency: int = 8
+    ) -> AsyncIterator[Tuple[int, Union[MultiTurnState, Exception]]]:
+        """Like arun_many, but yields `(index, result)` pairs as soon as each question finishes"""
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_one(indexes: List[int]) -> Tuple[List[int], Union[MultiTurnState, Exception]]:
+            async with semaphore:
+                question = questions[indexes[0]]
+                try:
+                    return indexes, await self.arun(question)
+                except Exception as e:
+                    print(f"⚠️ [run_many] Question failed: {question}: {e}")
+                    return indexes, e
+
+        tasks = [asyncio.create_task(run_one(indexes)) for indexes in self._group_batch(questions)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                indexes, result = await next_done
+                for i in indexes:
+                    yield i, self._batch_result(result, questions[i])
+        finally:
+            # The consumer went away, stop the rest of the batch
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _group_batch(questions: List[str]) -> List[List[int]]:
+        groups: Dict[str, List[int]] = {}
+        for i, question in enumerate(questions):
+            groups.setdefault(normalize_question(question), []).append(i)
+        return list(groups.values())
+
+    @staticmethod
+    def _batch_result(result: Union[MultiTurnState, Exception], question: str) -> Union[MultiTurnState, Exception]:
+        if isinstance(result, Exception) or result.current_question == question:
+            return result
+        # Duplicates share one answer but each keeps its own wording and can be clarified independently
+        return result.model_copy(update={"current_question": question}, deep=True)
+
+    def _cache_applies(self, state: MultiTurnState) -> bool:
+        # Follow-up turns depend on the conversation so far, only standalone questions are cached
+        return self.semantic_cache is not None and self.embedder is not None and not state.conversation_history
+
+    def _embed_for_cache(self, state: MultiTurnState) -> Optional[List[float]]:
+        if not self._cache_applies(state):
+            return None
+        # Poll the graph epoch first so answers from before the last ETL run are dropped
+        if self.graph_epoch is not None:
+            self.graph_epoch.current()
+        try:
+            with TRACER.span("semantic_cache.embed"):
+                return self.embedder.embed_query(state.current_question)
+        except Exception as e:
+            print(f"⚠️ [semantic_cache] Embedding failed, skipping cache: {e}")
+            return None
+
+    async def _aembed_for_cache(self, state: MultiTurnState) -> Optional[List[float]]:
+        if not self._cache_applies(state):
+            return None
+        # Poll the graph epoch first so answers from before the last ETL run are dropped
+        if self.graph_epoch is not None:
+            await self.graph_epoch.acurrent()
+        try:
+            with TRACER.span("semantic_cache.embed"):
+                return await asyncio.to_thread(self.embedder.embed_query, state.current_question)
+        except Exception as e:
+            print(f"⚠️ [semantic_cache] Embedding failed, skipping cache: {e}")
+            return None
+
+    def _cached_answer(self, initial_state: MultiTurnState, embedding: Optional[List[float]]) -> Optional[MultiTurnState]:
+        if embedding is None:
+            return None
+
+        with TRACER.span("semantic_cache.lookup") as span:
+            cached = self.semantic_cache.lookup(initial_state.current_question, embedding)
+            if span is not None:
+                span.set(hit=cached is not None)
+        if cached is None:
+            return None
+
+        print(f"⚡ [semantic_cache] Cache hit for: {initial_state.current_question} (cached question: {cached.current_question})")
+        cached.current_question = initial_state.current_question
+        cached.conversation_history = initial_state.conversation_history
+        cached.turn_number = initial_state.turn_number
+        cached.cache_hit = True
+        return cached
+
+    def _remember_answer(self, state: MultiTurnState, embedding: Optional[List[float]]) -> None:
+        if embedding is None or state.needs_clarification or state.error_message:
+            return
+        # Never replay an answer where one of the LLM calls failed
+        for response in (state.formatted_response, state.llm_only_response):
+            if response and response.startswith(FAILED_ANSWER_PREFIX):
+                return
+        self.semantic_cache.store(state.current_question, embedding, state)
+
+    async def astream(self, question: str, conversation_history: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Run the agent and yield events as soon as each stage produces them.
+
+        Events are dicts with an `event` name and `data` payload: `cypher` once text2cypher finishes,
+        `evaluation` once the query is judged, `token` for each chunk of the graph answer, and finally
+        `done` carrying the complete MultiTurnState.
+        """
+        initial_state = self._initial_state(question, conversation_history)
+
+        embedding = await self._aembed_for_cache(initial_state)
+        cached = self._cached_answer(initial_state, embedding)
+        if cached:
+            for node in ("text2cypher", "evaluate"):
+                yield self._node_event(node, cached.model_dump())
+            yield {"event": "done", "data": cached}
+            return
+
+        final_state: Dict[str, Any] = initial_state.model_dump()
+
+        async for mode, chunk in self.graph.astream(
+            initial_state,
+            config=self._run_config(stream_tokens=True, question_embedding=embedding),
+            stream_mode=["updates", "custom", "values"]
+        ):
+            if mode == "custom":
+                yield chunk
+            elif mode == "values":
+                final_state = chunk
+            elif mode == "updates":
+                for node, update in chunk.items():
+                    event = self._node_event(node, update)
+                    if event:
+                        yield event
+
+        state = MultiTurnState(**final_state)
+        self._remember_answer(state, embedding)
+        yield {"event": "done", "data": state}
+
+    def _node_event(self, node: str, update: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if node == "text2cypher":
+            return {"event": "cypher", "data": {
+                "cypher_generated": update.get("cypher_generated"),
+                "records_found": update.get("records_found", 0),
+                "error_message": update.get("error_message")
+            }}
+        if node == "evaluate":
+            return {"event": "evaluation", "data": {
+                "needs_clarification": update.get("needs_clarification", False),
+                "clarification_request": update.get("clarification_request"),
+                "evaluation_tier": update.get("evaluation_tier")
+            }}
+        return None
+
+    def _continue_conversation(self, state: MultiTurnState, user_response: str) -> tuple[str, List[Dict[str, Any]]]:
         # Add the current interaction to conversation history
         interaction = {
             "question": state.current_question,
@@ -229,11 +816,21 @@ class AgentService:
             "cypher": state.cypher_generated,
             "records_found": state.records_found
         }
-        
+
         updated_history = state.conversation_history + [interaction]
-        
+
         # Create new question combining original question with clarification
         combined_question = f"{state.current_question} Additional context: {user_response}"
-        
+        return combined_question, updated_history
+
+    def add_to_conversation(self, state: MultiTurnState, user_response: str) -> MultiTurnState:
+        """Add user's clarification response to conversation and continue"""
+        combined_question, updated_history = self._continue_conversation(state, user_response)
+
         # Run the agent again with updated context
         return self.run(combined_question, updated_history)
+
+    async def aadd_to_conversation(self, state: MultiTurnState, user_response: str) -> MultiTurnState:
+        """Async variant of add_to_conversation"""
+        combined_question, updated_history = self._continue_conversation(state, user_response)
+        return await self.arun(combined_question, updated_history)
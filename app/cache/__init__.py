@@ -0,0 +1,7 @@
+from .semantic_cache import SemanticCache, normalize_question
+from .cypher_cache import CypherCache, schema_fingerprint
+from .graph_epoch import GraphEpoch, without_graph_meta
+from .result_cache import ResultCache
+from .schema_cache import SchemaCache, SchemaSnapshot
+from .response_cache import ResponseCache
+from .llm_recording import LLMRecording
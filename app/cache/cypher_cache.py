@@ -0,0 +1,72 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .semantic_cache import normalize_question
+
+
+def schema_fingerprint(schema: str) -> str:
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()[:16]
+
+
+class CypherCache:
+    """LRU cache of generated Cypher keyed by normalized question and schema fingerprint.
+
+    Only the LLM generation step is cached; callers still execute the Cypher on every hit. Because
+    the schema fingerprint is part of the key, a schema change makes every older entry unreachable
+    and they age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        # The schema string rarely changes, so remember the fingerprint of the last one seen
+        self._last_schema: Tuple[Optional[str], str] = (None, "")
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, question: str, schema: str) -> Tuple[str, str]:
+        last_schema = self._last_schema
+        if last_schema[0] is not schema:
+            last_schema = self._last_schema = (schema, schema_fingerprint(schema))
+        return normalize_question(question), last_schema[1]
+
+    def get(self, question: str, schema: str) -> Optional[str]:
+        key = self.key(question, schema)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self.ttl_seconds is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, question: str, schema: str, cypher: str) -> None:
+        key = self.key(question, schema)
+        with self._lock:
+            self._entries[key] = (cypher, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, question: str, schema: str) -> None:
+        with self._lock:
+            self._entries.pop(self.key(question, schema), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from neo4j import AsyncDriver, Driver, RoutingControl
+
+# The ETL (graph_build) bumps this counter every time it finishes writing to the graph
+GRAPH_META_LABEL = "GraphMeta"
+READ_EPOCH_QUERY = f"MATCH (m:{GRAPH_META_LABEL} {{id: 'graph'}}) RETURN m.epoch AS epoch"
+
+
+def without_graph_meta(structured_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """The structured schema minus the `:GraphMeta` bookkeeping node, which no question is about"""
+    metadata = structured_schema.get("metadata") or {}
+    return {
+        **structured_schema,
+        "node_props": {
+            label: props for label, props in (structured_schema.get("node_props") or {}).items()
+            if label != GRAPH_META_LABEL
+        },
+        "relationships": [
+            r for r in structured_schema.get("relationships") or []
+            if GRAPH_META_LABEL not in (r.get("start"), r.get("end"))
+        ],
+        # Constraints and indexes (the MERGE key on :GraphMeta(id), if someone adds one)
+        "metadata": {
+            key: [entry for entry in entries if GRAPH_META_LABEL not in (entry.get("labelsOrTypes") or [])]
+            for key, entries in metadata.items()
+        }
+    }
+
+
+class GraphEpoch:
+    """Tracks the graph write epoch maintained by the ETL on the `:GraphMeta` node.
+
+    The epoch is re-read from Neo4j at most once per `check_interval` seconds, so callers can ask
+    for it on every request. Subscribers are called whenever a change is observed, which is how
+    caches holding graph data drop their stale entries.
+    """
+
+    def __init__(
+        self,
+        driver: Driver,
+        database: Optional[str] = None,
+        async_driver: Optional[AsyncDriver] = None,
+        check_interval: float = 5.0
+    ):
+        self.driver = driver
+        self.database = database
+        self.async_driver = async_driver
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._epoch: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._subscribers: List[Callable[[], None]] = []
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        self._subscribers.append(callback)
+
+    def current(self) -> Optional[int]:
+        if not self._due():
+            return self._epoch
+
+        with self._lock:
+            if not self._due():
+                return self._epoch
+            # Claim the check before querying so concurrent callers keep using the known epoch
+            self._checked_at = time.monotonic()
+
+        try:
+            self._observe(self._read())
+        except Exception as e:
+            print(f"⚠️ [graph_epoch] Could not read graph epoch: {e}")
+        return self._epoch
+
+    async def acurrent(self) -> Optional[int]:
+        if not self._due():
+            return self._epoch
+
+        with self._lock:
+            if not self._due():
+                return self._epoch
+            self._checked_at = time.monotonic()
+
+        try:
+            if self.async_driver is None:
+                epoch = await asyncio.to_thread(self._read)
+            else:
+                records, _, _ = await self.async_driver.execute_query(
+                    READ_EPOCH_QUERY, database_=self.database, routing_=RoutingControl.READ
+                )
+                epoch = records[0]["epoch"] if records else 0
+            self._observe(epoch)
+        except Exception as e:
+            print(f"⚠️ [graph_epoch] Could not read graph epoch: {e}")
+        return self._epoch
+
+    def _due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.check_interval
+
+    def _read(self) -> int:
+        records, _, _ = self.driver.execute_query(
+            READ_EPOCH_QUERY, database_=self.database, routing_=RoutingControl.READ
+        )
+        return records[0]["epoch"] if records else 0
+
+    def _observe(self, epoch: Optional[int]) -> None:
+        epoch = epoch or 0
+        previous, self._epoch = self._epoch, epoch
+        if previous is not None and previous != epoch:
+            print(f"🔄 [graph_epoch] Graph epoch changed {previous} -> {epoch}, invalidating caches")
+            for callback in self._subscribers:
+                callback()
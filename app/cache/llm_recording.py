@@ -0,0 +1,88 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class LLMRecording:
+    """Recorded model answers in a gzipped JSON lines file, for replaying runs without a model server.
+
+    Entries are keyed by a hash of their kind ("llm" or "embedding") and the prompt, so prompts are
+    not stored and a recording stays small. Each entry keeps the answer and how long the live call
+    took. New entries are buffered and appended as one gzip member per flush; gzip readers see the
+    members as one stream. Every `flush_every` puts a background thread writes the buffer, so a
+    recorded call never waits on gzip and the latencies being recorded stay undistorted. Whatever is
+    left is flushed at exit.
+    """
+
+    def __init__(self, path: str = ".cache/llm_recording.jsonl.gz", flush_every: int = 64):
+        self.path = path
+        self.flush_every = flush_every
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # Held while a batch is taken and written, so batches reach the file in order
+        self._write_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._load()
+        self._writer = threading.Thread(target=self._write_loop, name="llm-recording-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def key(kind: str, prompt: str) -> str:
+        return hashlib.sha256(f"{kind}\x00{prompt}".encode("utf-8")).hexdigest()[:32]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, kind: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """`{"r": answer, "s": seconds}` for a recorded prompt, else None"""
+        return self._entries.get(self.key(kind, prompt))
+
+    def put(self, kind: str, prompt: str, answer: Any, seconds: float) -> None:
+        entry = {"k": self.key(kind, prompt), "r": answer, "s": round(seconds, 4)}
+        with self._lock:
+            self._entries[entry["k"]] = entry
+            self._pending.append(entry)
+            if len(self._pending) < self.flush_every:
+                return
+        self._flush_requested.set()
+
+    def flush(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with gzip.open(self.path, "at", encoding="utf-8") as f:
+                    f.writelines(json.dumps(entry, separators=(",", ":")) + "\n" for entry in pending)
+            except OSError as e:
+                print(f"⚠️ [llm_recording] Could not write {self.path}: {e}")
+                return
+        print(f"📼 [llm_recording] Saved {len(pending)} answers to {self.path}")
+
+    def _write_loop(self) -> None:
+        while True:
+            self._flush_requested.wait()
+            self._flush_requested.clear()
+            self.flush()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    # A prompt recorded twice keeps its latest answer
+                    self._entries[entry["k"]] = entry
+        except (OSError, EOFError, ValueError) as e:
+            # A run killed mid-flush leaves a truncated last member; the entries before it are kept
+            print(f"⚠️ [llm_recording] {self.path} is damaged after {len(self._entries)} entries: {e}")
+        print(f"📼 [llm_recording] Loaded {len(self._entries)} recorded answers from {self.path}")
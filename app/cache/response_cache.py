@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS responses "
+    "(key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    # Keep meta.bytes equal to SUM(size) without ever scanning the table
+    "CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses "
+    "BEGIN UPDATE meta SET value = value + new.size WHERE key = 'bytes'; END",
+    "CREATE TRIGGER IF NOT EXISTS responses_size_update AFTER UPDATE OF size ON responses "
+    "BEGIN UPDATE meta SET value = value + new.size - old.size WHERE key = 'bytes'; END",
+    "CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses "
+    "BEGIN UPDATE meta SET value = value - old.size WHERE key = 'bytes'; END",
+)
+
+
+class ResponseCache:
+    """LLM responses stored in a SQLite file, keyed by model, temperature and a hash of the prompt.
+
+    Only meant for deterministic (temperature 0) calls. The file is shared by worker processes: WAL
+    mode lets readers run alongside a writer, and each thread keeps its own connection. When the
+    stored responses exceed `max_bytes`, the least recently used ones are deleted until the cache
+    is back under 90% of the cap.
+
+    Triggers keep the total size in a `meta` row, so a put never sums the table. Hits do not write:
+    their access times are collected in memory and written in one transaction every
+    `access_batch` hits, every `access_flush_seconds`, and before an eviction.
+
+    Both `get` and `put` can wait on another process's write lock, so async callers use
+    `aget`/`aput`, which run them on a worker thread.
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/llm_responses.sqlite",
+        max_bytes: int = 256 * 1024 * 1024,
+        access_batch: int = 64,
+        access_flush_seconds: float = 30.0
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.access_batch = access_batch
+        self.access_flush_seconds = access_flush_seconds
+        self._local = threading.local()
+        self._access_lock = threading.Lock()
+        self._accessed: Dict[str, float] = {}
+        self._flushed_at = time.monotonic()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, temperature: float, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\x00{float(temperature)}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, temperature: float, prompt: str) -> Optional[str]:
+        key = self.key(model, temperature, prompt)
+        try:
+            db = self._connection()
+            row = db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._touch(db, key)
+        except sqlite3.Error as e:
+            print(f"⚠️ [response_cache] Lookup failed: {e}")
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, model: str, temperature: float, prompt: str, response: str) -> None:
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        try:
+            db = self._connection()
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete would skip the size trigger
+            db.execute(
+                "INSERT INTO responses (key, response, size, accessed) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET response = excluded.response, size = excluded.size, accessed = excluded.accessed",
+                (self.key(model, temperature, prompt), response, size, time.time())
+            )
+            self._evict(db)
+        except sqlite3.Error as e:
+            print(f"⚠️ [response_cache] Store failed: {e}")
+
+    async def aget(self, model: str, temperature: float, prompt: str) -> Optional[str]:
+        return await asyncio.to_thread(self.get, model, temperature, prompt)
+
+    async def aput(self, model: str, temperature: float, prompt: str, response: str) -> None:
+        await asyncio.to_thread(self.put, model, temperature, prompt, response)
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        return self._connection().execute("SELECT value FROM meta WHERE key = 'bytes'").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._access_lock:
+            self._accessed.clear()
+        self._connection().execute("DELETE FROM responses")
+
+    def _touch(self, db: sqlite3.Connection, key: str) -> None:
+        with self._access_lock:
+            self._accessed[key] = time.time()
+            due = (
+                len(self._accessed) >= self.access_batch
+                or time.monotonic() - self._flushed_at >= self.access_flush_seconds
+            )
+        if due:
+            self._flush_accessed(db)
+
+    def _flush_accessed(self, db: sqlite3.Connection) -> None:
+        with self._access_lock:
+            accessed, self._accessed = self._accessed, {}
+            self._flushed_at = time.monotonic()
+        if not accessed:
+            return
+        # One write transaction for the whole batch instead of one per hit
+        with self._transaction(db):
+            db.executemany(
+                "UPDATE responses SET accessed = ? WHERE key = ? AND accessed < ?",
+                [(at, key, at) for key, at in accessed.items()]
+            )
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = db.execute("SELECT value FROM meta WHERE key = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Recent hits decide what survives, so write them before picking the least recently used
+        self._flush_accessed(db)
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        keys = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            keys.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        with self._transaction(db):
+            db.executemany("DELETE FROM responses WHERE key = ?", keys)
+        print(f"🧹 [response_cache] Evicted {len(keys)} responses ({freed:,} bytes)")
+
+    @staticmethod
+    @contextmanager
+    def _transaction(db: sqlite3.Connection) -> Iterator[None]:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit, so no transaction holds the write lock between calls
+            db = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            with self._transaction(db):
+                for statement in SCHEMA:
+                    db.execute(statement)
+                # Files from before the size triggers existed get their total counted once
+                if db.execute("SELECT 1 FROM meta WHERE key = 'bytes'").fetchone() is None:
+                    db.execute("INSERT INTO meta (key, value) VALUES ('bytes', (SELECT COALESCE(SUM(size), 0) FROM responses))")
+            self._local.db = db
+        return db
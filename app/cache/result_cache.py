@@ -0,0 +1,109 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from neo4j import Record
+
+from .graph_epoch import GraphEpoch
+
+
+class ResultCache:
+    """LRU cache of executed Cypher results, invalidated when the graph epoch changes.
+
+    Keys are the query text plus its parameters. Memory is bounded by `max_entries`, by an
+    approximate `max_bytes` budget and by `max_rows_per_entry`; larger results are never cached.
+    """
+
+    def __init__(
+        self,
+        graph_epoch: GraphEpoch,
+        max_entries: int = 1000,
+        max_bytes: int = 128 * 1024 * 1024,
+        max_rows_per_entry: int = 10_000
+    ):
+        self.graph_epoch = graph_epoch
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_rows_per_entry = max_rows_per_entry
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[List[Record], int]]" = OrderedDict()
+        self._bytes = 0
+        self._epoch: Optional[int] = None
+
+        self.hits = 0
+        self.misses = 0
+
+        graph_epoch.subscribe(self.clear)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def validate(self) -> Optional[int]:
+        """Check the graph epoch (cheap between polls) and return it for a later put"""
+        return self._sync_epoch(self.graph_epoch.current())
+
+    async def avalidate(self) -> Optional[int]:
+        return self._sync_epoch(await self.graph_epoch.acurrent())
+
+    def get(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> Optional[List[Record]]:
+        key = self._key(query, parameters)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, query: str, parameters: Optional[Dict[str, Any]], records: List[Record], epoch: Optional[int]) -> None:
+        """Store results read at `epoch`; results from before an epoch change are discarded"""
+        if len(records) > self.max_rows_per_entry:
+            return
+
+        size_bytes = self._estimate_bytes(query, records)
+        if size_bytes > self.max_bytes:
+            return
+
+        key = self._key(query, parameters)
+        with self._lock:
+            if epoch != self._epoch:
+                return
+
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._bytes -= previous[1]
+
+            while self._entries and (len(self._entries) >= self.max_entries or self._bytes + size_bytes > self.max_bytes):
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+
+            self._entries[key] = (records, size_bytes)
+            self._bytes += size_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _sync_epoch(self, epoch: Optional[int]) -> Optional[int]:
+        with self._lock:
+            if epoch != self._epoch:
+                # Covers the first check and any change the subscription has not cleared yet
+                self._entries.clear()
+                self._bytes = 0
+                self._epoch = epoch
+        return epoch
+
+    @staticmethod
+    def _key(query: str, parameters: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        return query.strip(), repr(sorted((parameters or {}).items()))
+
+    @staticmethod
+    def _estimate_bytes(query: str, records: List[Record]) -> int:
+        return len(query) + sum(len(str(record)) for record in records) + 64 * len(records)
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from neo4j import Driver, RoutingControl
+from neo4j_graphrag.schema import format_schema, get_structured_schema
+
+from .graph_epoch import GRAPH_META_LABEL, without_graph_meta
+
+# Labels, types and keys come from the token store and the counts from the count store, so this stays cheap on any graph size.
+# The ETL's :GraphMeta epoch node is left out, so bumping the epoch does not look like a schema change
+# (its property keys only show up once, when the first ETL run creates it).
+FINGERPRINT_QUERY = f"""
+RETURN COLLECT {{ CALL db.labels() YIELD label WHERE label <> '{GRAPH_META_LABEL}' RETURN label }} AS labels,
+       COLLECT {{ CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType }} AS types,
+       COLLECT {{ CALL db.propertyKeys() YIELD propertyKey RETURN propertyKey }} AS keys,
+       COUNT {{ MATCH (n) }} - COUNT {{ MATCH (:{GRAPH_META_LABEL}) }} AS nodes,
+       COUNT {{ MATCH ()-[r]->() }} AS relationships
+"""
+
+
+@dataclass
+class SchemaSnapshot:
+    fingerprint: str
+    database: Optional[str]
+    enhanced: bool
+    schema: str
+    structured_schema: Dict[str, Any]
+    fetched_at: float
+
+
+class SchemaCache:
+    """Graph schema persisted to disk together with a fingerprint of the graph's shape.
+
+    `get()` serves the file from the last run without touching Neo4j, so startup does not wait for
+    `get_structured_schema` (which samples property values when `enhanced`). `refresh()` compares
+    the fingerprint against the live graph, refetches only when it moved, and hands the new
+    snapshot to subscribers; `watch()` runs it in the background.
+    """
+
+    def __init__(
+        self,
+        driver: Driver,
+        database: Optional[str] = None,
+        path: str = ".cache/schema.json",
+        enhanced: bool = False,
+        refresh_interval: float = 300.0
+    ):
+        self.driver = driver
+        self.database = database
+        self.path = path
+        self.enhanced = enhanced
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._snapshot: Optional[SchemaSnapshot] = None
+        self._subscribers: List[Callable[[SchemaSnapshot], None]] = []
+
+    def subscribe(self, callback: Callable[[SchemaSnapshot], None]) -> None:
+        self._subscribers.append(callback)
+
+    def get(self) -> SchemaSnapshot:
+        """Current schema: in memory, else from disk, else fetched from Neo4j"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._load()
+            if self._snapshot is None:
+                self._snapshot = self._fetch(self.fingerprint())
+                self._save(self._snapshot)
+            return self._snapshot
+
+    def refresh(self) -> bool:
+        """Refetch the schema if the graph's fingerprint changed; returns whether it did"""
+        fingerprint = self.fingerprint()
+        if self._snapshot is not None and self._snapshot.fingerprint == fingerprint:
+            return False
+
+        with self._lock:
+            if self._snapshot is not None and self._snapshot.fingerprint == fingerprint:
+                return False
+            previous = self._snapshot
+            snapshot = self._fetch(fingerprint)
+            self._save(snapshot)
+            self._snapshot = snapshot
+
+        if previous is not None and previous.schema != snapshot.schema:
+            print(f"🔄 [schema_cache] Schema changed ({previous.fingerprint} -> {fingerprint}), updating prompts")
+            for callback in self._subscribers:
+                callback(snapshot)
+        return True
+
+    async def watch(self) -> None:
+        """Check the fingerprint now and then every `refresh_interval` seconds until cancelled"""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"⚠️ [schema_cache] Could not refresh schema: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def fingerprint(self) -> str:
+        records, _, _ = self.driver.execute_query(
+            FINGERPRINT_QUERY, database_=self.database, routing_=RoutingControl.READ
+        )
+        record = records[0]
+        shape = {
+            "labels": sorted(record["labels"]),
+            "types": sorted(record["types"]),
+            "keys": sorted(record["keys"]),
+            "nodes": record["nodes"],
+            "relationships": record["relationships"]
+        }
+        return hashlib.sha256(json.dumps(shape, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def _fetch(self, fingerprint: str) -> SchemaSnapshot:
+        started = time.perf_counter()
+        structured_schema = without_graph_meta(
+            get_structured_schema(self.driver, is_enhanced=self.enhanced, database=self.database)
+        )
+        print(f"📊 [schema_cache] Fetched {'enhanced ' if self.enhanced else ''}schema in {time.perf_counter() - started:.1f}s")
+        return SchemaSnapshot(
+            fingerprint=fingerprint,
+            database=self.database,
+            enhanced=self.enhanced,
+            schema=format_schema(structured_schema, is_enhanced=self.enhanced),
+            structured_schema=structured_schema,
+            fetched_at=time.time()
+        )
+
+    def _load(self) -> Optional[SchemaSnapshot]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = SchemaSnapshot(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ [schema_cache] Ignoring unreadable schema cache {self.path}: {e}")
+            return None
+
+        # A file written for another database or schema flavour is as good as missing
+        if snapshot.database != self.database or snapshot.enhanced != self.enhanced:
+            return None
+        print(f"⚡ [schema_cache] Loaded schema {snapshot.fingerprint} from {self.path}")
+        return snapshot
+
+    def _save(self, snapshot: SchemaSnapshot) -> None:
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Write then rename so a crash or a concurrent reader never sees half a file
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(snapshot), f, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ [schema_cache] Could not write schema cache {self.path}: {e}")
@@ -0,0 +1,315 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..pydantictypes import MultiTurnState
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace so trivially different phrasings share a key"""
+    question = re.sub(r"[^\w\s]", " ", question.lower())
+    return " ".join(question.split())
+
+
+@dataclass
+class _CacheEntry:
+    question: str
+    normalized: str
+    state: MultiTurnState
+    created_at: float
+    size_bytes: int
+
+
+class SemanticCache:
+    """In-memory cache of answered questions, looked up by embedding similarity.
+
+    Embeddings live in two preallocated NumPy matrices: a full-precision float16 copy used to
+    confirm a match, and a float32 random projection (`index_dim` wide) that is scanned for
+    candidates. Once the cache holds `partition_min_entries` questions the projected rows are
+    partitioned around ~sqrt(n) centroids, and lookups only scan the `n_probe` closest partitions
+    (under 1 ms at 100k entries of 1536 dimensions, checked by `semantic_cache_lookup_100k` in
+    benchmarks/microbench.py). The partitions are rebuilt whenever the cache doubles, from a copy of
+    the rows and without holding the lock, so lookups keep running during a rebuild. The best
+    `rerank_k` candidates are rescored against the full vectors and a hit is only returned when the
+    exact cosine similarity is at least `threshold`. Entries are evicted least-recently-used once
+    `max_entries` or `max_bytes` is exceeded, and expire after `ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 10_000,
+        ttl_seconds: Optional[float] = 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        index_dim: int = 64,
+        rerank_k: int = 8,
+        partition_min_entries: int = 4096,
+        n_probe: int = 8,
+        seed: int = 0
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.index_dim = index_dim
+        self.rerank_k = rerank_k
+        self.partition_min_entries = partition_min_entries
+        self.n_probe = n_probe
+        self.seed = seed
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._by_text: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._next_slot = 0
+        self._dim: Optional[int] = None
+        self._projection: Optional[np.ndarray] = None
+        self._index = np.zeros((0, 0), dtype=np.float32)
+        self._vectors = np.zeros((0, 0), dtype=np.float16)
+        self._bytes = 0
+
+        # Partitioned index, built lazily once the cache is large enough
+        self._centroids: Optional[np.ndarray] = None
+        self._partitions: List[np.ndarray] = []
+        self._partition_of = np.zeros(0, dtype=np.int32)
+        self._partitioned_size = 0
+        # Slots stored or evicted while a rebuild runs outside the lock; None when none is running
+        self._changed: Optional[set] = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate memory held by live entries: their matrix rows plus cached states"""
+        return len(self._entries) * self._row_bytes() + self._bytes
+
+    def lookup(self, question: str, embedding: Sequence[float]) -> Optional[MultiTurnState]:
+        """Return a copy of the cached state for the closest past question, or None"""
+        normalized = normalize_question(question)
+        with self._lock:
+            slot = self._by_text.get(normalized)
+            if slot is None and self._entries:
+                slot = self._nearest(embedding)
+
+            if slot is None or self._expire_if_stale(slot):
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(slot)
+            self.hits += 1
+            state = self._entries[slot].state
+
+        return state.model_copy(deep=True)
+
+    def store(self, question: str, embedding: Sequence[float], state: MultiTurnState) -> None:
+        normalized = normalize_question(question)
+        vector = self._normalize(embedding)
+        size_bytes = self._estimate_bytes(state)
+
+        with self._lock:
+            self._ensure_dim(vector.shape[0])
+            if vector.shape[0] != self._dim:
+                print(f"⚠️ [semantic_cache] Embedding dimension {vector.shape[0]} does not match cache dimension {self._dim}, skipping")
+                return
+
+            existing = self._by_text.get(normalized)
+            if existing is not None:
+                self._evict(existing)
+
+            while self._entries and (
+                len(self._entries) >= self.max_entries
+                or self.memory_bytes + self._row_bytes() + size_bytes > self.max_bytes
+            ):
+                self._evict(next(iter(self._entries)))
+
+            slot = self._allocate_slot()
+            self._vectors[slot] = vector
+            self._index[slot] = vector @ self._projection
+            if self._centroids is not None:
+                self._assign(slot)
+            self._entries[slot] = _CacheEntry(
+                question=question,
+                normalized=normalized,
+                state=state.model_copy(deep=True),
+                created_at=time.monotonic(),
+                size_bytes=size_bytes
+            )
+            self._by_text[normalized] = slot
+            self._bytes += size_bytes
+
+            snapshot = None
+            if self._changed is None and len(self._entries) >= max(self.partition_min_entries, 2 * self._partitioned_size):
+                # Take a copy of the rows and rebuild outside the lock, so lookups keep running meanwhile
+                self._changed = set()
+                slots = np.fromiter(self._entries.keys(), dtype=np.int64)
+                snapshot = (slots, self._index[slots], self._index.shape[0])
+
+        if snapshot is not None:
+            self._partition(*snapshot)
+
+    def clear(self) -> None:
+        with self._lock:
+            for slot in list(self._entries):
+                self._evict(slot)
+
+    def _nearest(self, embedding: Sequence[float]) -> Optional[int]:
+        query = self._normalize(embedding)
+        if query.shape[0] != self._dim:
+            return None
+
+        projected = query @ self._projection
+        if self._centroids is None:
+            slots = np.arange(self._next_slot)
+        else:
+            n_probe = min(self.n_probe, len(self._partitions))
+            closest = np.argpartition(self._centroids @ projected, -n_probe)[-n_probe:]
+            slots = np.concatenate([self._partitions[p] for p in closest])
+        if slots.size == 0:
+            return None
+
+        # Screen on the compact index, then confirm against the full vectors
+        scores = self._index[slots] @ projected
+        k = min(self.rerank_k, slots.size)
+        candidates = slots[np.argpartition(scores, -k)[-k:]] if k < slots.size else slots
+        candidates = np.array([c for c in candidates if int(c) in self._entries], dtype=np.int64)
+        if candidates.size == 0:
+            return None
+
+        exact = self._vectors[candidates].astype(np.float32) @ query
+        best = int(np.argmax(exact))
+        if exact[best] < self.threshold:
+            return None
+        return int(candidates[best])
+
+    def _expire_if_stale(self, slot: int) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        if time.monotonic() - self._entries[slot].created_at <= self.ttl_seconds:
+            return False
+        self._evict(slot)
+        return True
+
+    def _evict(self, slot: int) -> None:
+        entry = self._entries.pop(slot)
+        if self._changed is not None:
+            self._changed.add(slot)
+        self._by_text.pop(entry.normalized, None)
+        self._bytes -= entry.size_bytes
+        # Zeroed rows score 0 and can never pass the threshold
+        self._index[slot] = 0
+        self._vectors[slot] = 0
+        partition = self._partition_of[slot]
+        if partition >= 0:
+            members = self._partitions[partition]
+            self._partitions[partition] = members[members != slot]
+            self._partition_of[slot] = -1
+        self._free_slots.append(slot)
+
+    def _allocate_slot(self) -> int:
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = self._next_slot
+            if slot >= self._index.shape[0]:
+                self._grow(max(64, min(self._index.shape[0] * 2, self.max_entries)))
+            self._next_slot += 1
+        if self._changed is not None:
+            self._changed.add(slot)
+        return slot
+
+    def _grow(self, capacity: int) -> None:
+        index = np.zeros((capacity, self._index.shape[1]), dtype=np.float32)
+        vectors = np.zeros((capacity, self._vectors.shape[1]), dtype=np.float16)
+        partition_of = np.full(capacity, -1, dtype=np.int32)
+        index[:self._index.shape[0]] = self._index
+        vectors[:self._vectors.shape[0]] = self._vectors
+        partition_of[:self._partition_of.shape[0]] = self._partition_of
+        self._index, self._vectors, self._partition_of = index, vectors, partition_of
+
+    def _partition(self, slots: np.ndarray, rows: np.ndarray, capacity: int) -> None:
+        """(Re)build the partitioned index from a snapshot with one refinement round of spherical k-means.
+
+        Runs without the lock; slots stored or evicted meanwhile are fixed up when the new index is swapped in.
+        """
+        n_partitions = max(1, int(np.sqrt(slots.size)))
+
+        rng = np.random.default_rng(self.seed)
+        centroids = rows[rng.choice(slots.size, n_partitions, replace=False)]
+        assignment = self._closest_centroids(rows, centroids)
+        for p in range(n_partitions):
+            members = rows[assignment == p]
+            if members.size:
+                centroids[p] = members.mean(axis=0)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        assignment = self._closest_centroids(rows, centroids)
+        order = np.argsort(assignment, kind="stable")
+        partitions = np.split(slots[order], np.searchsorted(assignment[order], np.arange(1, n_partitions)))
+        partition_of = np.full(capacity, -1, dtype=np.int32)
+        partition_of[slots] = assignment
+
+        with self._lock:
+            changed, self._changed = self._changed, None
+            for slot in changed:
+                if slot < capacity and partition_of[slot] >= 0:
+                    members = partitions[partition_of[slot]]
+                    partitions[partition_of[slot]] = members[members != slot]
+                    partition_of[slot] = -1
+            if self._index.shape[0] > capacity:
+                partition_of = np.concatenate([partition_of, np.full(self._index.shape[0] - capacity, -1, dtype=np.int32)])
+            self._centroids, self._partitions, self._partition_of = centroids, partitions, partition_of
+            for slot in changed:
+                if slot in self._entries:
+                    self._assign(slot)
+            self._partitioned_size = slots.size
+
+    def _assign(self, slot: int) -> None:
+        partition = int(np.argmax(self._centroids @ self._index[slot]))
+        self._partitions[partition] = np.append(self._partitions[partition], slot)
+        self._partition_of[slot] = partition
+
+    @staticmethod
+    def _closest_centroids(rows: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(rows[start:start + chunk] @ centroids.T, axis=1)
+            for start in range(0, rows.shape[0], chunk)
+        ])
+
+    def _row_bytes(self) -> int:
+        return self._index.itemsize * self._index.shape[1] + self._vectors.itemsize * self._vectors.shape[1]
+
+    def _ensure_dim(self, dim: int) -> None:
+        if self._dim is not None:
+            return
+
+        self._dim = dim
+        index_dim = min(self.index_dim, dim)
+        rng = np.random.default_rng(self.seed)
+        # Gaussian random projection approximately preserves cosine similarity
+        self._projection = (rng.standard_normal((dim, index_dim)) / np.sqrt(index_dim)).astype(np.float32)
+        self._index = np.zeros((0, index_dim), dtype=np.float32)
+        self._vectors = np.zeros((0, dim), dtype=np.float16)
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _estimate_bytes(state: MultiTurnState) -> int:
+        results = state.results.results if state.results else []
+        # Record metadata mirrors the content string, so count the content twice
+        text_bytes = sum(2 * len(r.content) for r in results)
+        for text in (state.current_question, state.cypher_generated, state.formatted_response, state.llm_only_response):
+            text_bytes += len(text or "")
+        return text_bytes + 512
@@ -90,7 +90,7 @@ if clarification and st.session_state.current_state:
                 "http://localhost:8000/clarify",
                 json={
                     "clarification": clarification,
-                    "previous_state": st.session_state.current_state
+                    "session_id": st.session_state.current_state.get("session_id")
                 },
                 timeout=60
             )
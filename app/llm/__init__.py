@@ -1,4 +1,10 @@
 from .base_adapter import BaseLLMAdapter
 from .langchain_adapter import LangchainLLMAdapter
 from .neo4j_adapter import Neo4jLLMAdapter
-from .registry import LLMRegistry
+from .metered_adapter import MeteredLLMAdapter
+from .client_layer import LLMClientLayer, CircuitOpenError
+from .resilient_adapter import ResilientLLM, ResilientLLMAdapter
+from .cached_adapter import CachedLLM, CachedLLMAdapter
+from .hedged_adapter import HedgedLLM, HedgedLLMAdapter
+from .replay_adapter import LLM_MODES, RecordReplayLLM, RecordReplayLLMAdapter, ReplayMissError, ScriptedResponder
+from .registry import LLMRegistry, ModelConfig, ROLES
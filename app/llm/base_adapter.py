@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator, List, Sequence
+import asyncio
 
 
 class BaseLLMAdapter(ABC):
@@ -6,3 +9,32 @@ class BaseLLMAdapter(ABC):
     def ask(self, prompt: str) -> str:
         """Uniform interface to get a response from the LLM"""
         pass
+
+    async def aask(self, prompt: str) -> str:
+        """Async variant of ask; backends without native async support run ask in a worker thread"""
+        return await asyncio.to_thread(self.ask, prompt)
+
+    def ask_many(self, prompts: Sequence[str], max_concurrency: int = 8) -> List[str]:
+        """Answer `prompts` with at most `max_concurrency` calls in flight; answers are in prompt order"""
+        if not prompts:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(prompts)))) as pool:
+            return list(pool.map(self.ask, prompts))
+
+    async def aask_many(self, prompts: Sequence[str], max_concurrency: int = 8, return_exceptions: bool = False) -> list:
+        """Async ask_many; with `return_exceptions` a failed prompt gives its exception instead of failing the rest"""
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def bounded(prompt: str) -> str:
+            async with semaphore:
+                return await self.aask(prompt)
+
+        return await asyncio.gather(*(bounded(p) for p in prompts), return_exceptions=return_exceptions)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield the response in chunks as it is generated; backends without streaming yield it whole"""
+        yield self.ask(prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Async variant of stream"""
+        yield await self.aask(prompt)
@@ -0,0 +1,95 @@
+from typing import Any, AsyncIterator, Iterator
+
+from neo4j_graphrag.llm import LLMInterface, LLMResponse
+
+from .base_adapter import BaseLLMAdapter
+from ..cache.response_cache import ResponseCache
+
+
+class CachedLLMAdapter(BaseLLMAdapter):
+    """Answers repeated prompts from the response cache; only use it for temperature 0 models"""
+
+    def __init__(self, adapter: BaseLLMAdapter, cache: ResponseCache, model_name: str, temperature: float = 0.0):
+        self.adapter = adapter
+        self.cache = cache
+        self.model_name = model_name
+        self.temperature = temperature
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.adapter, attr)
+
+    def ask(self, prompt: str) -> str:
+        cached = self.cache.get(self.model_name, self.temperature, prompt)
+        if cached is not None:
+            return cached
+        response = self.adapter.ask(prompt)
+        self.cache.put(self.model_name, self.temperature, prompt, response)
+        return response
+
+    async def aask(self, prompt: str) -> str:
+        cached = await self.cache.aget(self.model_name, self.temperature, prompt)
+        if cached is not None:
+            return cached
+        response = await self.adapter.aask(prompt)
+        await self.cache.aput(self.model_name, self.temperature, prompt, response)
+        return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        cached = self.cache.get(self.model_name, self.temperature, prompt)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        for chunk in self.adapter.stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.put(self.model_name, self.temperature, prompt, "".join(chunks))
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        cached = await self.cache.aget(self.model_name, self.temperature, prompt)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        async for chunk in self.adapter.astream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        await self.cache.aput(self.model_name, self.temperature, prompt, "".join(chunks))
+
+
+class CachedLLM(LLMInterface):
+    """neo4j-graphrag LLM counterpart of CachedLLMAdapter, e.g. for the ETL's entity extraction.
+
+    Calls with a message history or system instruction are passed through uncached.
+    """
+
+    def __init__(self, llm: Any, cache: ResponseCache, model_name: str, temperature: float = 0.0):
+        super().__init__(model_name, getattr(llm, "model_params", None))
+        self.llm = llm
+        self.cache = cache
+        self.temperature = temperature
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr == "llm":
+            raise AttributeError(attr)
+        return getattr(self.llm, attr)
+
+    def invoke(self, input: str, message_history=None, system_instruction=None) -> LLMResponse:
+        if message_history or system_instruction:
+            return self.llm.invoke(input, message_history=message_history, system_instruction=system_instruction)
+        cached = self.cache.get(self.model_name, self.temperature, input)
+        if cached is not None:
+            return LLMResponse(content=cached)
+        response = self.llm.invoke(input)
+        self.cache.put(self.model_name, self.temperature, input, response.content)
+        return response
+
+    async def ainvoke(self, input: str, message_history=None, system_instruction=None) -> LLMResponse:
+        if message_history or system_instruction:
+            return await self.llm.ainvoke(input, message_history=message_history, system_instruction=system_instruction)
+        cached = await self.cache.aget(self.model_name, self.temperature, input)
+        if cached is not None:
+            return LLMResponse(content=cached)
+        response = await self.llm.ainvoke(input)
+        await self.cache.aput(self.model_name, self.temperature, input, response.content)
+        return response
@@ -0,0 +1,332 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, TypeVar
+
+import httpx
+
+from ..metrics import LLM_RETRIES, LLM_THROTTLE_SECONDS
+from ..utils.tokens import estimate_tokens
+
+T = TypeVar("T")
+
+# Statuses worth another attempt; 429 is throttling, the rest are transient server or proxy failures
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = ("APIConnectionError", "APITimeoutError", "ServiceUnavailableError")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the model while the circuit breaker is open"""
+
+
+class TokenBucket:
+    """Refills `per_minute` units a minute up to one minute's worth.
+
+    `reserve` always succeeds and returns how long the caller must wait, so concurrent callers queue
+    up in arrival order instead of racing and failing.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= min(amount, self.capacity)
+            return max(0.0, -self._tokens / self.rate)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive transient failures and fails fast for `reset_seconds`.
+
+    After that one trial call is let through (half-open); its success closes the circuit again.
+    A trial that ends without an answer either way (cancelled, throttled) frees the slot for the next one.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.reset_seconds else "open"
+
+    def before_call(self) -> bool:
+        """Raise while open; True when this call is the half-open trial"""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_running:
+                raise CircuitOpenError(f"LLM circuit open after {self._failures} consecutive failures")
+            self._trial_running = True
+            return True
+
+    def release_trial(self) -> None:
+        """End a trial call that proved nothing about the backend, leaving the state as it was"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._failures >= self.failure_threshold or self._opened_at is not None:
+                if self._opened_at is None:
+                    print(f"🔌 [llm_client] Circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+
+def _error_chain(error: BaseException) -> Iterator[BaseException]:
+    # neo4j-graphrag wraps OpenAI errors in LLMGenerationError(e), so look through args and causes too
+    seen = set()
+    stack = [error]
+    while stack:
+        current = stack.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        stack.extend([current.__cause__, current.__context__])
+        stack.extend(arg for arg in getattr(current, "args", ()) if isinstance(arg, BaseException))
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, from `retry-after-ms` or `retry-after` (seconds or HTTP date)"""
+    for current in _error_chain(error):
+        headers = getattr(getattr(current, "response", None), "headers", None)
+        if not headers:
+            continue
+        if headers.get("retry-after-ms"):
+            try:
+                return float(headers["retry-after-ms"]) / 1000.0
+            except ValueError:
+                pass
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+    return None
+
+
+def failure_kind(error: BaseException) -> Optional[str]:
+    """"throttled", "transient" or None when retrying cannot help (bad request, auth, ...)"""
+    for current in _error_chain(error):
+        status = getattr(current, "status_code", None)
+        if status == 429:
+            return "throttled"
+        if status in RETRYABLE_STATUS:
+            return "transient"
+        if isinstance(current, (httpx.TransportError, ConnectionError, TimeoutError)):
+            return "transient"
+        if type(current).__name__ in TRANSIENT_ERRORS:
+            return "transient"
+    return None
+
+
+class LLMClientLayer:
+    """What every model call shares: a pooled HTTP client, a request and token rate limiter,
+    jittered exponential backoff that honours Retry-After, and a circuit breaker.
+
+    Rate limits are per process; give each process (API workers, ETL) its share of the account quota.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = 500,
+        tokens_per_minute: Optional[float] = 200_000,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        max_connections: int = 100,
+        expected_completion_tokens: int = 500
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self.max_connections = max_connections
+        self.expected_completion_tokens = expected_completion_tokens
+
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            self._http_client = httpx.Client(limits=self._limits(), timeout=None)
+        return self._http_client
+
+    @property
+    def http_async_client(self) -> httpx.AsyncClient:
+        if self._http_async_client is None:
+            self._http_async_client = httpx.AsyncClient(limits=self._limits(), timeout=None)
+        return self._http_async_client
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+
+    def call(self, func: Callable[[], T], prompt: str = "") -> T:
+        attempt = 0
+        while True:
+            time.sleep(self._throttle(prompt))
+            trial = self.breaker.before_call()
+            try:
+                result = func()
+            except Exception as e:
+                delay = self._after_failure(e, attempt, trial)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            except BaseException:
+                if trial:
+                    self.breaker.release_trial()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, func: Callable[[], Awaitable[T]], prompt: str = "") -> T:
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._throttle(prompt))
+            trial = self.breaker.before_call()
+            try:
+                result = await func()
+            except Exception as e:
+                delay = self._after_failure(e, attempt, trial)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (timeouts, hedge losers, client disconnects); must not leave a trial hanging
+                if trial:
+                    self.breaker.release_trial()
+                raise
+            self.breaker.record_success()
+            return result
+
+    def stream(self, func: Callable[[], Iterable[str]], prompt: str = "") -> Iterator[str]:
+        """Stream through the limiter; a failure is only retried before the first chunk arrives"""
+        attempt = 0
+        while True:
+            time.sleep(self._throttle(prompt))
+            trial = self.breaker.before_call()
+            started = False
+            try:
+                for chunk in func():
+                    started = True
+                    yield chunk
+            except Exception as e:
+                delay = self._after_failure(e, attempt, trial)
+                if delay is None or started:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Closed early by the consumer (GeneratorExit)
+                if trial:
+                    self.breaker.release_trial()
+                raise
+            self.breaker.record_success()
+            return
+
+    async def astream(self, func: Callable[[], AsyncIterator[str]], prompt: str = "") -> AsyncIterator[str]:
+        """Async variant of stream"""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._throttle(prompt))
+            trial = self.breaker.before_call()
+            started = False
+            try:
+                async for chunk in func():
+                    started = True
+                    yield chunk
+            except Exception as e:
+                delay = self._after_failure(e, attempt, trial)
+                if delay is None or started:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                if trial:
+                    self.breaker.release_trial()
+                raise
+            self.breaker.record_success()
+            return
+
+    def _throttle(self, prompt: str) -> float:
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = self.request_bucket.reserve(1)
+        if self.token_bucket is not None:
+            # The budget is an estimate anyway, so the prompt is not tokenized here
+            wait = max(wait, self.token_bucket.reserve(estimate_tokens(prompt) + self.expected_completion_tokens))
+        if wait > 0:
+            LLM_THROTTLE_SECONDS.observe(wait)
+        return wait
+
+    def _after_failure(self, error: Exception, attempt: int, trial: bool = False) -> Optional[float]:
+        """Seconds to wait before retrying, or None to give up and re-raise"""
+        kind = failure_kind(error)
+        if kind == "transient":
+            self.breaker.record_failure()
+        elif kind == "throttled":
+            # A 429 is no proof the backend is healthy, so a half-open circuit stays half-open
+            if trial:
+                self.breaker.release_trial()
+        else:
+            # The backend answered; the request itself was bad
+            self.breaker.record_success()
+        if kind is None or attempt >= self.max_retries:
+            return None
+
+        delay = retry_after(error)
+        if delay is None:
+            # Full jitter keeps a burst of failed callers from retrying in lockstep
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        LLM_RETRIES.inc(kind)
+        print(f"🔁 [llm_client] {kind} failure ({type(error).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return min(delay, self.max_delay)
+
+    async def aclose(self) -> None:
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+        if self._http_async_client is not None:
+            await self._http_async_client.aclose()
+            self._http_async_client = None
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Dict, Optional
+
+from neo4j_graphrag.llm import LLMInterface, LLMResponse
+
+from .base_adapter import BaseLLMAdapter
+from ..metrics import LLM_HEDGES
+
+
+class LatencyWindow:
+    """The last `size` latencies of one backend, in seconds"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+class HedgedLLMAdapter(BaseLLMAdapter):
+    """Sends a prompt to `primary` and, if it has not answered within the hedge delay, also to `secondary`.
+
+    The first answer wins and the other call is cancelled; a primary that fails early falls back to
+    the secondary. The hedge delay is the `percentile`-th latency of the primary's last `window`
+    calls, clamped to [`min_delay`, `max_delay`]; until `min_samples` calls have been seen it is
+    `max_delay`. So only the slow tail is hedged, and the secondary sees roughly
+    (100 - percentile)% of the traffic.
+    """
+
+    def __init__(
+        self,
+        primary: BaseLLMAdapter,
+        secondary: BaseLLMAdapter,
+        name: str = "llm",
+        percentile: float = 95.0,
+        min_delay: float = 0.5,
+        max_delay: float = 10.0,
+        window: int = 200,
+        min_samples: int = 20
+    ):
+        self.primary = primary
+        self.secondary = secondary
+        self.name = name
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.latency = {"primary": LatencyWindow(window), "secondary": LatencyWindow(window)}
+        # Blocking calls cannot be cancelled, so the losing one finishes on this pool and is ignored
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.primary, attr)
+
+    @property
+    def hedge_delay(self) -> float:
+        primary = self.latency["primary"]
+        if len(primary) < self.min_samples:
+            return self.max_delay
+        return min(self.max_delay, max(self.min_delay, primary.percentile(self.percentile)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Rolling p50/p95 per backend and the current hedge delay"""
+        return {
+            "hedge_delay": self.hedge_delay,
+            **{
+                backend: {"samples": len(window), "p50": window.percentile(50), "p95": window.percentile(95)}
+                for backend, window in self.latency.items()
+            }
+        }
+
+    def ask(self, prompt: str) -> str:
+        started = time.monotonic()
+        calls = {self._executor.submit(self.primary.ask, prompt): "primary"}
+        done, _ = wait(calls, timeout=self.hedge_delay)
+        if _needs_secondary(done):
+            calls[self._executor.submit(self.secondary.ask, prompt)] = "secondary"
+
+        pending = set(calls)
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = _pick(done, pending)
+            if winner is not None:
+                return self._finish(winner, calls[winner], calls, started)
+
+    async def aask(self, prompt: str) -> str:
+        started = time.monotonic()
+        calls = {asyncio.ensure_future(self.primary.aask(prompt)): "primary"}
+        done, _ = await asyncio.wait(calls, timeout=self.hedge_delay)
+        if _needs_secondary(done):
+            calls[asyncio.ensure_future(self.secondary.aask(prompt))] = "secondary"
+
+        pending = set(calls)
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = _pick(done, pending)
+                if winner is not None:
+                    return self._finish(winner, calls[winner], calls, started)
+        finally:
+            for task in calls:
+                task.cancel()
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        # Hedge on the first chunk, then stay with the backend that produced it
+        started = time.monotonic()
+        streams = {"primary": self.primary.astream(prompt)}
+        calls = {asyncio.ensure_future(anext(streams["primary"])): "primary"}
+        done, _ = await asyncio.wait(calls, timeout=self.hedge_delay)
+        if _needs_secondary(done):
+            streams["secondary"] = self.secondary.astream(prompt)
+            calls[asyncio.ensure_future(anext(streams["secondary"]))] = "secondary"
+
+        winner = None
+        pending = set(calls)
+        try:
+            while winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = _pick(done, pending)
+            backend = calls[winner]
+            # The hedge delay is compared against the wait for the first chunk, so that is what is recorded
+            first = self._finish(winner, backend, calls, started)
+        except StopAsyncIteration:
+            return
+        finally:
+            for task in calls:
+                task.cancel()
+            # A generator cannot be closed while its cancelled anext is still unwinding
+            await asyncio.gather(*calls, return_exceptions=True)
+            for other, stream in streams.items():
+                if winner is None or other != calls[winner]:
+                    await stream.aclose()
+
+        yield first
+        async for chunk in streams[backend]:
+            yield chunk
+
+    def _finish(self, winner: Any, backend: str, calls: Dict[Any, str], started: float) -> Any:
+        elapsed = time.monotonic() - started
+        hedged = len(calls) > 1
+        for call, other in calls.items():
+            if call is not winner:
+                call.cancel()
+                # The loser took at least this long; keep it in the window so slow stretches still move the delay
+                self.latency[other].add(elapsed)
+        LLM_HEDGES.inc(self.name, backend if hedged else "not_hedged")
+        result = winner.result()
+        self.latency[backend].add(elapsed)
+        return result
+
+
+def _needs_secondary(done: set) -> bool:
+    # The primary is either still running past the hedge delay or has already failed
+    return not done or next(iter(done)).exception() is not None
+
+
+def _pick(done: set, pending: set) -> Optional[Any]:
+    """The first successful call, or a failed one once nothing else is left to wait for"""
+    for call in done:
+        if call.exception() is None:
+            return call
+    return next(iter(done)) if not pending else None
+
+
+class HedgedLLM(LLMInterface):
+    """neo4j-graphrag LLM backed by a HedgedLLMAdapter, for the Cypher generation retriever.
+
+    Only plain prompts are hedged; message history and system instructions are not supported.
+    """
+
+    def __init__(self, adapter: HedgedLLMAdapter, model_name: str):
+        super().__init__(model_name)
+        self.adapter = adapter
+
+    def invoke(self, input: str, message_history=None, system_instruction=None) -> LLMResponse:
+        if message_history or system_instruction:
+            raise ValueError("HedgedLLM only takes a plain prompt")
+        return LLMResponse(content=self.adapter.ask(input))
+
+    async def ainvoke(self, input: str, message_history=None, system_instruction=None) -> LLMResponse:
+        if message_history or system_instruction:
+            raise ValueError("HedgedLLM only takes a plain prompt")
+        return LLMResponse(content=await self.adapter.aask(input))
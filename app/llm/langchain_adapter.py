@@ -1,5 +1,7 @@
+from typing import AsyncIterator, Iterator
 from .base_adapter import BaseLLMAdapter
 from langchain_openai import ChatOpenAI
+from ..utils.tokens import report_usage
 
 
 class LangchainLLMAdapter(BaseLLMAdapter):
@@ -7,4 +9,21 @@ class LangchainLLMAdapter(BaseLLMAdapter):
         self.model = model
 
     def ask(self, prompt: str) -> str:
-        return self.model.invoke(prompt).content
+        message = self.model.invoke(prompt)
+        report_usage(message)
+        return message.content
+
+    async def aask(self, prompt: str) -> str:
+        message = await self.model.ainvoke(prompt)
+        report_usage(message)
+        return message.content
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self.model.stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        async for chunk in self.model.astream(prompt):
+            if chunk.content:
+                yield chunk.content
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from .base_adapter import BaseLLMAdapter
+from ..metrics import record_llm_call
+from ..tracing import TRACER, Span
+from ..utils.tokens import capture_usage
+
+
+class MeteredLLMAdapter(BaseLLMAdapter):
+    """Wraps an adapter, records call counts, latency and token usage under `name`, and traces every call"""
+
+    def __init__(self, adapter: BaseLLMAdapter, name: str, model_name: Optional[str] = None):
+        self.adapter = adapter
+        self.name = name
+        self.model_name = model_name
+
+    def __getattr__(self, attr: str) -> Any:
+        # Anything beyond the adapter interface (e.g. invoke on the neo4j adapter) goes straight through
+        return getattr(self.adapter, attr)
+
+    def ask(self, prompt: str) -> str:
+        with TRACER.span(f"llm.{self.name}.ask") as span:
+            started = time.perf_counter()
+            try:
+                with capture_usage() as usage:
+                    response = self.adapter.ask(prompt)
+            except Exception:
+                self._record(span, started, prompt, None, "error")
+                raise
+            self._record(span, started, prompt, response, usage=usage)
+            return response
+
+    async def aask(self, prompt: str) -> str:
+        with TRACER.span(f"llm.{self.name}.ask") as span:
+            started = time.perf_counter()
+            try:
+                with capture_usage() as usage:
+                    response = await self.adapter.aask(prompt)
+            except asyncio.CancelledError:
+                self._record(span, started, prompt, None, "cancelled")
+                raise
+            except Exception:
+                self._record(span, started, prompt, None, "error")
+                raise
+            self._record(span, started, prompt, response, usage=usage)
+            return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        trace = TRACER.current_trace()
+        span = TRACER.begin(f"llm.{self.name}.stream")
+        started = time.perf_counter()
+        chunks = []
+        try:
+            for chunk in self.adapter.stream(prompt):
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit as e:
+            self._record(span, started, prompt, "".join(chunks), "cancelled")
+            TRACER.finish(span, trace, e)
+            raise
+        except Exception as e:
+            self._record(span, started, prompt, "".join(chunks), "error")
+            TRACER.finish(span, trace, e)
+            raise
+        self._record(span, started, prompt, "".join(chunks))
+        TRACER.finish(span, trace)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        # The consumer may close the stream from another context, so the span is never made current
+        trace = TRACER.current_trace()
+        span = TRACER.begin(f"llm.{self.name}.stream")
+        started = time.perf_counter()
+        chunks = []
+        try:
+            async for chunk in self.adapter.astream(prompt):
+                chunks.append(chunk)
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit) as e:
+            self._record(span, started, prompt, "".join(chunks), "cancelled")
+            TRACER.finish(span, trace, e)
+            raise
+        except Exception as e:
+            self._record(span, started, prompt, "".join(chunks), "error")
+            TRACER.finish(span, trace, e)
+            raise
+        self._record(span, started, prompt, "".join(chunks))
+        TRACER.finish(span, trace)
+
+    def _record(self, span: Optional[Span], started: float, prompt: str, response: Any, outcome: str = "ok", usage: Optional[Dict[str, int]] = None) -> None:
+        prompt_tokens, completion_tokens = record_llm_call(self.name, started, prompt, response, outcome, usage)
+        if span is not None:
+            span.set(outcome=outcome, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
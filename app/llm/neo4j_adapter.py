@@ -1,13 +1,63 @@
+from typing import AsyncIterator, Iterator, Union
+
 from .base_adapter import BaseLLMAdapter
-from neo4j_graphrag.llm import OpenAILLM, LLMResponse
+from neo4j_graphrag.llm import LLMResponse, OllamaLLM, OpenAILLM
 
 
 class Neo4jLLMAdapter(BaseLLMAdapter):
-    def __init__(self, model: OpenAILLM):
+    """Adapter for neo4j-graphrag LLMs; streaming talks to the OpenAI or Ollama client underneath"""
+
+    def __init__(self, model: Union[OpenAILLM, OllamaLLM]):
         self.model = model
 
-    def ask(self, prompt: str) -> LLMResponse:
-        return self.model.invoke(prompt)
+    def ask(self, prompt: str) -> str:
+        return self.model.invoke(prompt).content
+
+    async def aask(self, prompt: str) -> str:
+        return (await self.model.ainvoke(prompt)).content
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        if getattr(self.model, "openai", None) is not None:
+            for chunk in self.model.client.chat.completions.create(**self._openai_request(prompt)):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        elif getattr(self.model, "ollama", None) is not None:
+            for chunk in self.model.client.chat(**self._ollama_request(prompt)):
+                if chunk.message.content:
+                    yield chunk.message.content
+        else:
+            yield self.ask(prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        if getattr(self.model, "openai", None) is not None:
+            async for chunk in await self.model.async_client.chat.completions.create(**self._openai_request(prompt)):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        elif getattr(self.model, "ollama", None) is not None:
+            async for chunk in await self.model.async_client.chat(**self._ollama_request(prompt)):
+                if chunk.message.content:
+                    yield chunk.message.content
+        else:
+            yield await self.aask(prompt)
+
+    def _openai_request(self, prompt: str) -> dict:
+        return {
+            "messages": self.model.get_messages(prompt),
+            "model": self.model.model_name,
+            "stream": True,
+            **self.model.model_params
+        }
+
+    def _ollama_request(self, prompt: str) -> dict:
+        return {
+            "model": self.model.model_name,
+            "messages": self.model.get_messages(prompt),
+            "options": self.model.model_params,
+            "stream": True
+        }
 
     def invoke(self, input: str, **kwargs) -> LLMResponse:
         return self.model.invoke(input, **kwargs)
+
+    async def ainvoke(self, input: str, **kwargs) -> LLMResponse:
+        return await self.model.ainvoke(input, **kwargs)
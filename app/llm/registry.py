@@ -1,48 +1,218 @@
-from neo4j_graphrag.llm import OpenAILLM
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import openai
+from neo4j_graphrag.llm import LLMInterface, OpenAILLM
 from neo4j_graphrag.llm.ollama_llm import OllamaLLM
 from langchain_openai import ChatOpenAI
-from ragas.llms import LangchainLLMWrapper
 
 
 from .neo4j_adapter import Neo4jLLMAdapter
 from .langchain_adapter import LangchainLLMAdapter
 from .base_adapter import BaseLLMAdapter
+from .metered_adapter import MeteredLLMAdapter
+from .client_layer import LLMClientLayer
+from .resilient_adapter import ResilientLLM, ResilientLLMAdapter
+from .cached_adapter import CachedLLMAdapter
+from .hedged_adapter import HedgedLLM, HedgedLLMAdapter
+from .replay_adapter import LLM_MODES, RecordReplayLLM, RecordReplayLLMAdapter
+from ..cache.response_cache import ResponseCache
+from ..cache.llm_recording import LLMRecording
+
+# What the agent asks models to do; each role can run on its own model
+ROLES = ("cypher_generation", "evaluation", "summarization", "llm_only", "routing")
+
 
+@dataclass(frozen=True)
+class ModelConfig:
+    """A model and its params; `provider` is "openai" or "ollama" """
+    model_name: str
+    temperature: float = 0.0
+    provider: str = "openai"
+
+    @classmethod
+    def parse(cls, spec: str, temperature: float = 0.0) -> "ModelConfig":
+        """`gpt-4o-mini`, `openai/gpt-4o-mini` or `ollama/llama3.1:8b`"""
+        provider, separator, model_name = spec.partition("/")
+        if separator and provider in ("openai", "ollama"):
+            return cls(model_name, float(temperature), provider)
+        return cls(spec, float(temperature))
+
+    def __str__(self) -> str:
+        return f"{self.provider}/{self.model_name} (temperature {self.temperature})"
 
 
 class LLMRegistry:
-    def __init__(self, model_name="gpt-4o", temperature=0, local_mode = False):
+    def __init__(
+        self,
+        model_name="gpt-4o",
+        temperature=0,
+        local_mode = False,
+        client_layer: LLMClientLayer = None,
+        response_cache: ResponseCache = None,
+        roles: Optional[Dict[str, ModelConfig]] = None,
+        hedge: Optional[ModelConfig] = None,
+        hedge_roles: Iterable[str] = ROLES,
+        hedge_options: Optional[Dict[str, float]] = None,
+        mode: str = "live",
+        recording: Optional[LLMRecording] = None,
+        replay_latency: Optional[float] = None
+    ):
+        unknown = set(roles or {}) - set(ROLES)
+        if unknown:
+            raise ValueError(f"Unknown LLM roles {sorted(unknown)}; expected some of {list(ROLES)}")
+        if mode not in LLM_MODES:
+            raise ValueError(f"Unknown LLM mode '{mode}'; expected one of {list(LLM_MODES)}")
+
         self.model_name = model_name
         self.temperature = temperature
         self.local_mode = local_mode
+        # Shared by every OpenAI model: one connection pool, one rate limit budget, one circuit breaker
+        self.client_layer = client_layer or LLMClientLayer()
+        # A local Ollama server has no quota and fails independently of OpenAI, so it gets its own layer
+        self.local_client_layer = LLMClientLayer(requests_per_minute=None, tokens_per_minute=None, max_retries=2)
+        # "record" saves every answer to `recording`; "replay" and "fake" never reach a model server.
+        # Cached answers would skip the recording or the synthetic latency, so the cache is live only.
+        self.mode = mode
+        self.recording = recording if recording is not None or mode in ("live", "fake") else LLMRecording()
+        self.replay_latency = replay_latency
+        self.response_cache = response_cache if mode == "live" else None
+
+        self.default_config = ModelConfig(model_name, float(temperature), "ollama" if local_mode else "openai")
+        self.roles = {role: (roles or {}).get(role, self.default_config) for role in ROLES}
+        # Slow calls of these roles are also sent to the `hedge` model; options go to HedgedLLMAdapter
+        self.hedge = hedge
+        self.hedge_roles = set(hedge_roles)
+        self.hedge_options = hedge_options or {}
+        self.hedges: Dict[str, HedgedLLMAdapter] = {}
+        self._graphrag_llms: Dict[ModelConfig, LLMInterface] = {}
+        self._chat_models: Dict[ModelConfig, ChatOpenAI] = {}
         self._init_models()
 
     def _init_models(self):
-        if self.local_mode:
-            self.neo4j_llm = OllamaLLM(
-                model_name=self.model_name,
-                model_params={"temperature": self.temperature}
-            )
+        if self.mode in ("replay", "fake"):
+            self._init_offline_models()
+            return
+
+        # Cypher generation runs inside the neo4j-graphrag retriever, which takes an LLMInterface
+        cypher_config = self.roles["cypher_generation"]
+        hedged = self._hedged("cypher_generation", cypher_config)
+        if self.mode == "record":
+            cypher_adapter = hedged or self._resilient(self._role_adapter("cypher_generation", cypher_config), cypher_config)
+            self.neo4j_llm = RecordReplayLLM(self._recorded(cypher_adapter), cypher_config.model_name)
+        elif hedged is not None:
+            self.neo4j_llm = HedgedLLM(hedged, cypher_config.model_name)
         else:
-            self.neo4j_llm = OpenAILLM(
-                model_name=self.model_name,
-                model_params={"temperature": self.temperature}
-            )
+            self.neo4j_llm = ResilientLLM(self._graphrag_llm(cypher_config), self._layer(cypher_config))
+        # The LangChain model always talks to OpenAI; ragas and the "langgraph" adapter use it
+        chat_config = ModelConfig(self.model_name, float(self.temperature))
+        self.langchain_llm = self._chat_model(chat_config)
 
-        self.langchain_llm = ChatOpenAI(
-            model=self.model_name,
-            temperature=self.temperature
-        )
+        # ragas is slow to import, so its wrapper is built the first time it is asked for
+        self.ragas_llm = None
 
-        self.ragas_llm = LangchainLLMWrapper(self.langchain_llm)
+        neo4j_adapter = self._resilient(Neo4jLLMAdapter(self._graphrag_llm(self.default_config)), self.default_config)
+        langgraph_adapter = self._resilient(LangchainLLMAdapter(self.langchain_llm), chat_config)
+        self.adapters = {
+            "neo4j": self._wrap(self._recorded(neo4j_adapter), "neo4j", self.default_config),
+            "langgraph": self._wrap(self._recorded(langgraph_adapter), "langgraph", chat_config)
+        }
+        for role, config in self.roles.items():
+            adapter = self._hedged(role, config) or self._resilient(self._role_adapter(role, config), config)
+            self.adapters[role] = self._wrap(self._recorded(adapter), role, config)
+            if config != self.default_config:
+                print(f"🧠 [llm_registry] {role} uses {config}")
+        if self.hedges:
+            print(f"🏁 [llm_registry] {', '.join(sorted(self.hedges))} hedged with {self.hedge}")
+        if self.mode == "record":
+            print(f"📼 [llm_registry] Recording LLM answers to {self.recording.path}")
 
+    def _init_offline_models(self):
+        # Every role answers from the recording or the script; the metering still times each call
+        offline = RecordReplayLLMAdapter(self.mode, self.recording, latency=self.replay_latency)
+        self.neo4j_llm = RecordReplayLLM(offline, self.roles["cypher_generation"].model_name)
+        self.langchain_llm = None
+        self.ragas_llm = None
         self.adapters = {
-            "neo4j": Neo4jLLMAdapter(self.neo4j_llm),
-            "langgraph": LangchainLLMAdapter(self.langchain_llm)
+            "neo4j": self._wrap(offline, "neo4j", self.default_config),
+            "langgraph": self._wrap(offline, "langgraph", self.default_config)
         }
+        for role, config in self.roles.items():
+            self.adapters[role] = self._wrap(offline, role, config)
+        print(f"📼 [llm_registry] LLM mode '{self.mode}', no model server is used")
+
+    def _recorded(self, adapter: BaseLLMAdapter) -> BaseLLMAdapter:
+        if self.mode != "record":
+            return adapter
+        return RecordReplayLLMAdapter("record", self.recording, adapter)
+
+    def _role_adapter(self, role: str, config: ModelConfig) -> BaseLLMAdapter:
+        if config.provider == "ollama" or role == "cypher_generation":
+            return Neo4jLLMAdapter(self._graphrag_llm(config))
+        return LangchainLLMAdapter(self._chat_model(config))
+
+    def _hedged(self, role: str, config: ModelConfig) -> Optional[HedgedLLMAdapter]:
+        if self.hedge is None or role not in self.hedge_roles or config == self.hedge:
+            return None
+        if role not in self.hedges:
+            self.hedges[role] = HedgedLLMAdapter(
+                self._resilient(self._role_adapter(role, config), config),
+                self._resilient(self._role_adapter(role, self.hedge), self.hedge),
+                name=role,
+                **self.hedge_options
+            )
+        return self.hedges[role]
+
+    def _resilient(self, adapter: BaseLLMAdapter, config: ModelConfig) -> BaseLLMAdapter:
+        return ResilientLLMAdapter(adapter, self._layer(config))
+
+    def _wrap(self, adapter: BaseLLMAdapter, name: str, config: ModelConfig) -> BaseLLMAdapter:
+        adapter = MeteredLLMAdapter(adapter, name, config.model_name)
+        # Sampled answers differ run to run, so responses are only cached at temperature 0.
+        # The cache sits outside the metering, so answers served from it are not counted as LLM calls.
+        if self.response_cache is not None and config.temperature == 0:
+            adapter = CachedLLMAdapter(adapter, self.response_cache, config.model_name, config.temperature)
+        return adapter
+
+    def _layer(self, config: ModelConfig) -> LLMClientLayer:
+        return self.local_client_layer if config.provider == "ollama" else self.client_layer
+
+    def _graphrag_llm(self, config: ModelConfig) -> LLMInterface:
+        llm = self._graphrag_llms.get(config)
+        if llm is None:
+            model_params = {"temperature": config.temperature}
+            if config.provider == "ollama":
+                llm = OllamaLLM(model_name=config.model_name, model_params=model_params)
+            else:
+                llm = OpenAILLM(model_name=config.model_name, model_params=model_params)
+                # Retries happen in the client layer, so the SDKs' own retries are turned off
+                layer = self._layer(config)
+                llm.client = openai.OpenAI(http_client=layer.http_client, max_retries=0)
+                llm.async_client = openai.AsyncOpenAI(http_client=layer.http_async_client, max_retries=0)
+            self._graphrag_llms[config] = llm
+        return llm
+
+    def _chat_model(self, config: ModelConfig) -> ChatOpenAI:
+        model = self._chat_models.get(config)
+        if model is None:
+            layer = self._layer(config)
+            model = self._chat_models[config] = ChatOpenAI(
+                model=config.model_name,
+                temperature=config.temperature,
+                max_retries=0,
+                http_client=layer.http_client,
+                http_async_client=layer.http_async_client
+            )
+        return model
 
     def get_adapter(self, mode: str = "langgraph") -> BaseLLMAdapter:
+        """Adapter for a role in ROLES, or for the "neo4j"/"langgraph" backends of the default model"""
         return self.adapters[mode]
 
     def get_ragas_llm(self):
+        if self.langchain_llm is None:
+            raise RuntimeError(f"No ragas LLM in LLM mode '{self.mode}'")
+        if self.ragas_llm is None:
+            from ragas.llms import LangchainLLMWrapper
+            self.ragas_llm = LangchainLLMWrapper(self.langchain_llm)
         return self.ragas_llm
@@ -0,0 +1,180 @@
+import asyncio
+import os
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+import yaml
+from neo4j_graphrag.llm import LLMInterface, LLMResponse
+
+from .base_adapter import BaseLLMAdapter
+from ..cache.llm_recording import LLMRecording
+
+# "live" talks to the model servers; the others are for offline, repeatable profiling runs
+LLM_MODES = ("live", "record", "replay", "fake")
+
+FALLBACK_CYPHER = "MATCH (p:Property)\nRETURN p.name, p.address, p.property_type\nLIMIT 10"
+
+
+class ReplayMissError(LookupError):
+    """A replayed run asked a prompt that was never recorded"""
+
+
+class ScriptedResponder:
+    """Plausible answers for the agent's prompts, told apart by text their templates always contain.
+
+    Cypher generation gets the query_examples.yml output whose input shares the most words with
+    the question, so a local Neo4j loaded with the same data returns real rows.
+    """
+
+    def __init__(self, examples_file: str = "query_examples.yml"):
+        self.examples: List[Tuple[str, str]] = []
+        if os.path.exists(examples_file):
+            with open(examples_file, encoding="utf-8") as f:
+                for example in (yaml.safe_load(f) or {}).get("query_examples", []):
+                    if example.get("input") and example.get("output"):
+                        self.examples.append((example["input"], example["output"].strip()))
+
+    def respond(self, prompt: str) -> str:
+        if "Cypher-generating expert" in prompt:
+            return self.cypher_for(_after(prompt, "User Question:"))
+        if "retriever router" in prompt:
+            return '{"route": "text2cypher"}'
+        if "evaluating if a Cypher query" in prompt:
+            return "NO_RESULTS" if "Number of Records Found: 0\n" in prompt else "VALID"
+        if "Extract the entities (nodes)" in prompt:
+            return '{"nodes": [], "relationships": []}'
+        question = _quoted_question(prompt)
+        if "summarize the results" in prompt:
+            return f"Here is a summary of what the graph returned for \"{question}\"."
+        return f"Based on general real estate knowledge, here is an answer to \"{question}\"."
+
+    def cypher_for(self, question: str) -> str:
+        words = _words(question)
+        best, best_overlap = None, 0
+        for example_input, cypher in self.examples:
+            if example_input.lower() == question.lower():
+                return cypher
+            overlap = len(words & _words(example_input))
+            if overlap > best_overlap:
+                best, best_overlap = cypher, overlap
+        return best or FALLBACK_CYPHER
+
+
+class RecordReplayLLMAdapter(BaseLLMAdapter):
+    """Records, replays or fakes model answers so the agent and the ETL can be profiled offline.
+
+    - "record": asks `adapter` and saves each prompt's answer and latency to `recording`
+    - "replay": answers from `recording`, waiting `latency` seconds per call, or as long as the
+      recorded call took when `latency` is None; unrecorded prompts raise ReplayMissError
+    - "fake": answers from a ScriptedResponder after `latency` seconds (default none)
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        recording: Optional[LLMRecording] = None,
+        adapter: Optional[BaseLLMAdapter] = None,
+        latency: Optional[float] = None,
+        responder: Optional[ScriptedResponder] = None
+    ):
+        if mode not in ("record", "replay", "fake"):
+            raise ValueError(f"Unknown LLM mode '{mode}'; expected record, replay or fake")
+        if mode == "record" and adapter is None:
+            raise ValueError("Recording needs the adapter to record")
+        self.mode = mode
+        self.recording = recording if recording is not None or mode == "fake" else LLMRecording()
+        self.adapter = adapter
+        self.latency = latency
+        self.responder = responder or (ScriptedResponder() if mode == "fake" else None)
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr == "adapter" or self.adapter is None:
+            raise AttributeError(attr)
+        return getattr(self.adapter, attr)
+
+    def ask(self, prompt: str) -> str:
+        if self.mode == "record":
+            started = time.monotonic()
+            response = self.adapter.ask(prompt)
+            self.recording.put("llm", prompt, response, time.monotonic() - started)
+            return response
+        response, seconds = self._offline_answer(prompt)
+        time.sleep(seconds)
+        return response
+
+    async def aask(self, prompt: str) -> str:
+        if self.mode == "record":
+            started = time.monotonic()
+            response = await self.adapter.aask(prompt)
+            self.recording.put("llm", prompt, response, time.monotonic() - started)
+            return response
+        response, seconds = self._offline_answer(prompt)
+        await asyncio.sleep(seconds)
+        return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        if self.mode != "record":
+            yield self.ask(prompt)
+            return
+        started = time.monotonic()
+        chunks = []
+        for chunk in self.adapter.stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self.recording.put("llm", prompt, "".join(chunks), time.monotonic() - started)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        if self.mode != "record":
+            yield await self.aask(prompt)
+            return
+        started = time.monotonic()
+        chunks = []
+        async for chunk in self.adapter.astream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self.recording.put("llm", prompt, "".join(chunks), time.monotonic() - started)
+
+    def _offline_answer(self, prompt: str) -> Tuple[str, float]:
+        if self.mode == "fake":
+            return self.responder.respond(prompt), self.latency or 0.0
+        entry = self.recording.get("llm", prompt)
+        if entry is None:
+            raise ReplayMissError(f"No recorded answer for prompt: {prompt.strip()[:80]!r}")
+        return entry["r"], entry["s"] if self.latency is None else self.latency
+
+
+class RecordReplayLLM(LLMInterface):
+    """neo4j-graphrag LLM backed by a RecordReplayLLMAdapter, for Cypher generation and the ETL.
+
+    Only plain prompts are recorded; message history and system instructions are not supported.
+    """
+
+    def __init__(self, adapter: RecordReplayLLMAdapter, model_name: str):
+        super().__init__(model_name)
+        self.adapter = adapter
+
+    def invoke(self, input: str, message_history=None, system_instruction=None) -> LLMResponse:
+        if message_history or system_instruction:
+            raise ValueError("RecordReplayLLM only takes a plain prompt")
+        return LLMResponse(content=self.adapter.ask(input))
+
+    async def ainvoke(self, input: str, message_history=None, system_instruction=None) -> LLMResponse:
+        if message_history or system_instruction:
+            raise ValueError("RecordReplayLLM only takes a plain prompt")
+        return LLMResponse(content=await self.adapter.aask(input))
+
+
+def _after(prompt: str, marker: str) -> str:
+    # The line following `marker`, e.g. the question under "User Question:"
+    _, _, rest = prompt.partition(marker)
+    return rest.strip().split("\n", 1)[0].strip()
+
+
+def _quoted_question(prompt: str) -> str:
+    match = re.search(r'Question: "(.*?)"', prompt, re.S)
+    return match.group(1) if match else ""
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
@@ -0,0 +1,60 @@
+from typing import Any, AsyncIterator, Iterator
+
+from neo4j_graphrag.llm import LLMInterface, LLMResponse
+
+from .base_adapter import BaseLLMAdapter
+from .client_layer import LLMClientLayer
+
+
+class ResilientLLMAdapter(BaseLLMAdapter):
+    """Sends every call of the wrapped adapter through the shared client layer (rate limits, retries, circuit breaker)"""
+
+    def __init__(self, adapter: BaseLLMAdapter, layer: LLMClientLayer):
+        self.adapter = adapter
+        self.layer = layer
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.adapter, attr)
+
+    def ask(self, prompt: str) -> str:
+        return self.layer.call(lambda: self.adapter.ask(prompt), prompt)
+
+    async def aask(self, prompt: str) -> str:
+        return await self.layer.acall(lambda: self.adapter.aask(prompt), prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        yield from self.layer.stream(lambda: self.adapter.stream(prompt), prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        async for chunk in self.layer.astream(lambda: self.adapter.astream(prompt), prompt):
+            yield chunk
+
+
+class ResilientLLM(LLMInterface):
+    """neo4j-graphrag LLM that sends `invoke`/`ainvoke` of the wrapped model through the shared client layer.
+
+    Only `invoke`/`ainvoke` are needed from the wrapped model, so a LangChain chat model works as well.
+    """
+
+    def __init__(self, llm: Any, layer: LLMClientLayer):
+        super().__init__(getattr(llm, "model_name", None) or getattr(llm, "model", ""), getattr(llm, "model_params", None))
+        self.llm = llm
+        self.layer = layer
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr == "llm":
+            raise AttributeError(attr)
+        return getattr(self.llm, attr)
+
+    def invoke(self, input: str, message_history=None, system_instruction=None) -> LLMResponse:
+        kwargs = _optional(message_history=message_history, system_instruction=system_instruction)
+        return self.layer.call(lambda: self.llm.invoke(input, **kwargs), input)
+
+    async def ainvoke(self, input: str, message_history=None, system_instruction=None) -> LLMResponse:
+        kwargs = _optional(message_history=message_history, system_instruction=system_instruction)
+        return await self.layer.acall(lambda: self.llm.ainvoke(input, **kwargs), input)
+
+
+def _optional(**kwargs: Any) -> dict:
+    # LangChain models do not take neo4j-graphrag's message_history/system_instruction, so only pass them when set
+    return {k: v for k, v in kwargs.items() if v is not None}
@@ -1,14 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-from neo4j import GraphDatabase
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from neo4j import AsyncGraphDatabase, GraphDatabase
 from neo4j_graphrag.embeddings import OpenAIEmbeddings
 from neo4j_graphrag.embeddings.base import Embedder
 from neo4j_graphrag.embeddings.sentence_transformers import SentenceTransformerEmbeddings
 from .agentservice import AgentService
-from .llm import LLMRegistry
-from .pydantictypes import AskRequest, ClarificationRequest, MultiTurnState
+from .cache import CypherCache, GraphEpoch, LLMRecording, ResponseCache, ResultCache, SchemaCache, SemanticCache
+from .llm import ROLES as LLM_ROLES, CircuitOpenError, LLMClientLayer, LLMRegistry, ModelConfig
+from .retrievers import CypherGuardrails
+from .metrics import REGISTRY as METRICS, register_cache, register_circuit
+from .tracing import TRACER, JsonlSpanExporter, OtlpSpanExporter
+from .pydantictypes import AskRequest, BatchAskRequest, ClarificationRequest, MultiTurnState
+from .sessions import InMemorySessionStore, RedisSessionStore
+from .startup import Readiness, warm_step
+from .utils.replay_embedder import RecordReplayEmbedder
 from dotenv import load_dotenv
 import os
+import json
+import asyncio
 import logging
+from typing import Optional
 
 # Silence Neo4j info and warning logs
 logging.getLogger("neo4j").setLevel(logging.ERROR)
@@ -26,84 +39,436 @@ MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o")
 TEMPERATURE = float(os.getenv("TEMPERATURE", 0.0))
 TEXT_EMBEDDING_MODEL = os.getenv("TEXT_EMBEDDING_MODEL")
 LOCAL_MODE = os.getenv("LOCAL_MODE", "False")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60.0))
+LLM_MAX_WORKERS = int(os.getenv("LLM_MAX_WORKERS", 8))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 500))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", 200000))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 5))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+LLM_CIRCUIT_FAILURES = int(os.getenv("LLM_CIRCUIT_FAILURES", 5))
+LLM_CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", 30.0))
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "True")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 10000))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", 3600))
+SEMANTIC_CACHE_MAX_MB = int(os.getenv("SEMANTIC_CACHE_MAX_MB", 256))
+CYPHER_CACHE_ENABLED = os.getenv("CYPHER_CACHE_ENABLED", "True")
+CYPHER_CACHE_MAX_ENTRIES = int(os.getenv("CYPHER_CACHE_MAX_ENTRIES", 5000))
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "True")
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 1000))
+RESULT_CACHE_MAX_MB = int(os.getenv("RESULT_CACHE_MAX_MB", 128))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "True")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite")
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", 256))
+# Per-role models, e.g. EVALUATION_MODEL=ollama/llama3.1:8b; roles without one use MODEL_NAME and TEMPERATURE
+LLM_ROLE_MODELS = {
+    role: ModelConfig.parse(os.getenv(f"{role.upper()}_MODEL"), os.getenv(f"{role.upper()}_TEMPERATURE", TEMPERATURE))
+    for role in LLM_ROLES if os.getenv(f"{role.upper()}_MODEL")
+}
+# Hedging: calls slower than the primary's HEDGE_PERCENTILE latency are also sent to HEDGE_MODEL
+HEDGE_MODEL = os.getenv("HEDGE_MODEL")
+HEDGE_ROLES = os.getenv("HEDGE_ROLES", ",".join(LLM_ROLES))
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 95))
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", 0.5))
+HEDGE_MAX_DELAY_SECONDS = float(os.getenv("HEDGE_MAX_DELAY_SECONDS", 10.0))
+LLM_MODE = os.getenv("LLM_MODE", "live")
+LLM_RECORDING_PATH = os.getenv("LLM_RECORDING_PATH", ".cache/llm_recording.jsonl.gz")
+LLM_REPLAY_LATENCY_SECONDS = os.getenv("LLM_REPLAY_LATENCY_SECONDS")
+GRAPH_EPOCH_CHECK_SECONDS = float(os.getenv("GRAPH_EPOCH_CHECK_SECONDS", 5.0))
+STATIC_VALIDATION_ENABLED = os.getenv("STATIC_VALIDATION_ENABLED", "True")
+STATIC_VALID_ENABLED = os.getenv("STATIC_VALID_ENABLED", "True")
+CYPHER_GUARDRAILS_ENABLED = os.getenv("CYPHER_GUARDRAILS_ENABLED", "True")
+CYPHER_TIMEOUT_SECONDS = float(os.getenv("CYPHER_TIMEOUT_SECONDS", 30.0))
+CYPHER_FETCH_SIZE = int(os.getenv("CYPHER_FETCH_SIZE", 1000))
+CYPHER_MAX_ROWS = int(os.getenv("CYPHER_MAX_ROWS", 5000))
+CYPHER_AUTO_LIMIT = int(os.getenv("CYPHER_AUTO_LIMIT", 1000))
+CYPHER_MAX_ESTIMATED_ROWS = float(os.getenv("CYPHER_MAX_ESTIMATED_ROWS", 1000000))
+RESULT_TOKEN_BUDGET = int(os.getenv("RESULT_TOKEN_BUDGET", 6000))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 8))
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", 500))
+TRACE_JSONL_PATH = os.getenv("TRACE_JSONL_PATH")
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL")
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", 10000))
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 3600))
+SCHEMA_CACHE_ENABLED = os.getenv("SCHEMA_CACHE_ENABLED", "True")
+SCHEMA_CACHE_PATH = os.getenv("SCHEMA_CACHE_PATH", ".cache/schema.json")
+SCHEMA_REFRESH_SECONDS = float(os.getenv("SCHEMA_REFRESH_SECONDS", 300))
+EXAMPLES_TOP_K = int(os.getenv("EXAMPLES_TOP_K", 5))
+SCHEMA_PRUNING_ENABLED = os.getenv("SCHEMA_PRUNING_ENABLED", "True")
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", 1.0))
+WARMUP_MAX_RETRY_SECONDS = float(os.getenv("WARMUP_MAX_RETRY_SECONDS", 30.0))
 
-# 🔌 Neo4j driver
+# 🔌 Neo4j driver; creating it does no network I/O, connectivity is checked during warmup
 driver = GraphDatabase.driver(
     NEO4J_URI,
     auth=(NEO4J_USER, NEO4J_PASSWORD)
 )
 
-# 🧠 LLM Registry
-llm_registry = LLMRegistry(model_name=MODEL_NAME, temperature=TEMPERATURE)
+# 🔌 Async Neo4j driver for the async request path
+async_driver = AsyncGraphDatabase.driver(
+    NEO4J_URI,
+    auth=(NEO4J_USER, NEO4J_PASSWORD)
+)
+
+# ⚡ Semantic answer cache
+semantic_cache = SemanticCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+    ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
+    max_bytes=SEMANTIC_CACHE_MAX_MB * 1024 * 1024
+) if SEMANTIC_CACHE_ENABLED == "True" else None
 
-# 🧠 Embedder
-embedder = OpenAIEmbeddings(model=TEXT_EMBEDDING_MODEL)
+# ⚡ Generated Cypher cache (generation is deterministic at temperature 0)
+cypher_cache = CypherCache(
+    max_entries=CYPHER_CACHE_MAX_ENTRIES
+) if CYPHER_CACHE_ENABLED == "True" and TEMPERATURE == 0 else None
 
-# 🕸️ Agent Service
-agent_service = AgentService(
-    llm_registry=llm_registry,
+# 💾 LLM responses on disk, shared by worker processes; only models at temperature 0 use it
+response_cache = ResponseCache(
+    path=LLM_CACHE_PATH,
+    max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024
+) if LLM_CACHE_ENABLED == "True" else None
+
+# 📼 Recorded LLM and embedding answers, written with LLM_MODE=record and answered from with LLM_MODE=replay
+llm_recording = LLMRecording(LLM_RECORDING_PATH) if LLM_MODE in ("record", "replay") else None
+
+# 🔄 Graph write epoch, bumped by the ETL, and the query result cache it invalidates
+graph_epoch = GraphEpoch(
     driver=driver,
     database=NEO4J_DATABASE,
-    embedder=embedder
+    async_driver=async_driver,
+    check_interval=GRAPH_EPOCH_CHECK_SECONDS
+)
+result_cache = ResultCache(
+    graph_epoch=graph_epoch,
+    max_entries=RESULT_CACHE_MAX_ENTRIES,
+    max_bytes=RESULT_CACHE_MAX_MB * 1024 * 1024
+) if RESULT_CACHE_ENABLED == "True" else None
+
+# 📊 Graph schema saved to disk; startup uses the saved copy and a background task refreshes it when the graph's shape changes
+schema_cache = SchemaCache(
+    driver=driver,
+    database=NEO4J_DATABASE,
+    path=SCHEMA_CACHE_PATH,
+    refresh_interval=SCHEMA_REFRESH_SECONDS
+) if SCHEMA_CACHE_ENABLED == "True" else None
+
+# 🛡️ Limits on generated Cypher; a 0 switches the individual limit off
+cypher_guardrails = CypherGuardrails(
+    timeout_seconds=CYPHER_TIMEOUT_SECONDS or None,
+    fetch_size=CYPHER_FETCH_SIZE,
+    max_rows=CYPHER_MAX_ROWS or None,
+    auto_limit=CYPHER_AUTO_LIMIT or None,
+    max_estimated_rows=CYPHER_MAX_ESTIMATED_ROWS or None
+) if CYPHER_GUARDRAILS_ENABLED == "True" else None
+
+# 🔌 Shared LLM client layer: pooled connections, rate limits, retries and circuit breaker
+llm_client_layer = LLMClientLayer(
+    requests_per_minute=LLM_REQUESTS_PER_MINUTE or None,
+    tokens_per_minute=LLM_TOKENS_PER_MINUTE or None,
+    max_retries=LLM_MAX_RETRIES,
+    failure_threshold=LLM_CIRCUIT_FAILURES,
+    reset_seconds=LLM_CIRCUIT_RESET_SECONDS,
+    max_connections=LLM_MAX_CONNECTIONS
+)
+
+# 🕸️ Agent Service, built by the background warmup once Neo4j answers; requests get 503 until then
+llm_registry: Optional[LLMRegistry] = None
+agent_service: Optional[AgentService] = None
+readiness = Readiness(["neo4j", "llm", "agent"])
+
+
+def build_agent_service(llm_registry: LLMRegistry, embedder: Embedder) -> AgentService:
+    """Fetches the graph schema and loads the query examples, so it runs off the event loop"""
+    return AgentService(
+        llm_registry=llm_registry,
+        driver=driver,
+        async_driver=async_driver,
+        database=NEO4J_DATABASE,
+        embedder=embedder,
+        llm_timeout=LLM_TIMEOUT,
+        max_llm_workers=LLM_MAX_WORKERS,
+        semantic_cache=semantic_cache,
+        cypher_cache=cypher_cache,
+        result_cache=result_cache,
+        graph_epoch=graph_epoch,
+        static_validation=STATIC_VALIDATION_ENABLED == "True",
+        static_valid=STATIC_VALID_ENABLED == "True",
+        result_token_budget=RESULT_TOKEN_BUDGET,
+        cypher_guardrails=cypher_guardrails,
+        schema_cache=schema_cache,
+        examples_top_k=EXAMPLES_TOP_K or None,
+        schema_pruning=SCHEMA_PRUNING_ENABLED == "True"
+    )
+
+
+def build_llms():
+    # 🧠 LLM Registry and embedder
+    # An unset replay latency replays each call's recorded latency
+    replay_latency = float(LLM_REPLAY_LATENCY_SECONDS) if LLM_REPLAY_LATENCY_SECONDS else None
+    registry = LLMRegistry(
+        model_name=MODEL_NAME,
+        temperature=TEMPERATURE,
+        client_layer=llm_client_layer,
+        response_cache=response_cache,
+        roles=LLM_ROLE_MODELS,
+        hedge=ModelConfig.parse(HEDGE_MODEL, TEMPERATURE) if HEDGE_MODEL else None,
+        hedge_roles=[role.strip() for role in HEDGE_ROLES.split(",") if role.strip()],
+        hedge_options={
+            "percentile": HEDGE_PERCENTILE,
+            "min_delay": HEDGE_MIN_DELAY_SECONDS,
+            "max_delay": HEDGE_MAX_DELAY_SECONDS
+        },
+        mode=LLM_MODE,
+        recording=llm_recording,
+        replay_latency=replay_latency
+    )
+    # Replayed and fake embeddings need no OpenAI key, so the real embedder is only built when it is called
+    embedder = OpenAIEmbeddings(model=TEXT_EMBEDDING_MODEL) if LLM_MODE in ("live", "record") else None
+    if LLM_MODE != "live":
+        embedder = RecordReplayEmbedder(LLM_MODE, llm_recording, embedder, latency=replay_latency)
+    return registry, embedder
+
+
+async def warm_up() -> None:
+    global llm_registry, agent_service
+    retry = {"retry_seconds": WARMUP_RETRY_SECONDS, "max_retry_seconds": WARMUP_MAX_RETRY_SECONDS}
+
+    await warm_step(readiness, "neo4j", async_driver.verify_connectivity, **retry)
+    registry, embedder = await warm_step(readiness, "llm", lambda: asyncio.to_thread(build_llms), **retry)
+    llm_registry = registry
+    agent_service = await warm_step(
+        readiness, "agent", lambda: asyncio.to_thread(build_agent_service, registry, embedder), **retry
+    )
+
+    if schema_cache is not None:
+        await schema_cache.watch()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global agent_service
+    warmup = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        warmup.cancel()
+        await asyncio.gather(warmup, return_exceptions=True)
+        if agent_service is not None:
+            agent_service.llm_executor.shutdown(wait=False, cancel_futures=True)
+            agent_service = None
+        await llm_client_layer.aclose()
+        if llm_recording is not None:
+            await asyncio.to_thread(llm_recording.flush)
+        TRACER.shutdown()
+        await async_driver.close()
+        driver.close()
+
+
+def require_agent() -> AgentService:
+    if agent_service is None:
+        raise HTTPException(status_code=503, detail="Service is warming up", headers={"Retry-After": "5"})
+    return agent_service
+
+# 💬 Conversation sessions; set SESSION_STORE_URL to a redis:// URL to share them between workers
+session_store = RedisSessionStore(
+    url=SESSION_STORE_URL,
+    ttl_seconds=SESSION_TTL_SECONDS
+) if SESSION_STORE_URL else InMemorySessionStore(
+    max_sessions=SESSION_MAX_ENTRIES,
+    ttl_seconds=SESSION_TTL_SECONDS
+)
+
+# 🧭 Request tracing; spans are only recorded when an exporter is set or a request asks for ?debug=timing
+if TRACE_JSONL_PATH:
+    TRACER.add_exporter(JsonlSpanExporter(TRACE_JSONL_PATH))
+if OTEL_EXPORTER_OTLP_ENDPOINT:
+    # The OTLP exporter reads OTEL_EXPORTER_OTLP_* itself and appends /v1/traces
+    TRACER.add_exporter(OtlpSpanExporter())
+
+# 📈 Metrics; cache and evaluation counters are read when /metrics is scraped
+register_cache("semantic", semantic_cache)
+register_cache("cypher", cypher_cache)
+register_cache("result", result_cache)
+register_cache("llm_response", response_cache)
+register_circuit("llm", llm_client_layer.breaker)
+METRICS.register_collector(
+    "agent_evaluation_decisions_total",
+    "Cypher evaluations by the tier that decided them",
+    "counter",
+    lambda: [({"tier": tier}, count) for tier, count in agent_service.evaluation_stats.snapshot()["counts"].items()] if agent_service else []
 )
 
 app = FastAPI(
     title="CBRE Neo4j Agentic RAG API",
     description="Real estate knowledge graph API for CBRE using Neo4j and agentic RAG",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+def state_to_response(state: MultiTurnState, session_id: Optional[str] = None) -> dict:
+    return {
+        "session_id": session_id,
+        "question": state.current_question,
+        "needs_clarification": state.needs_clarification,
+        "clarification_request": state.clarification_request,
+        "results": state.results,
+        "llm_only_response": state.llm_only_response,
+        "formatted_response": state.formatted_response,
+        "cypher_generated": state.cypher_generated,
+        "records_found": state.records_found,
+        "turn_number": state.turn_number,
+        "conversation_history": state.conversation_history,
+        "cache_hit": state.cache_hit,
+        "evaluation_tier": state.evaluation_tier,
+        "results_truncated": state.results_truncated
+    }
+
+
+def with_timing(response: dict, trace) -> dict:
+    if trace is not None:
+        response["timing"] = {"trace_id": trace.trace_id, "spans": trace.waterfall()}
+    return response
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
 # 🚨 REST Endpoints
 @app.post("/ask")
-def ask_agent(request: AskRequest):
-    """Initial question endpoint - starts a new conversation"""
+async def ask_agent(request: AskRequest, debug: Optional[str] = None):
+    """Initial question endpoint - starts a new conversation; ?debug=timing adds the span waterfall"""
+    service = require_agent()
     try:
         print(f"➡️ Received question: {request.question}")
-        state = agent_service.run(request.question)
+        with TRACER.trace("POST /ask", force=debug == "timing") as trace:
+            state = await service.arun(request.question)
+            session_id = await session_store.acreate(state)
         
-        return {
-            "question": state.current_question,
-            "needs_clarification": state.needs_clarification,
-            "clarification_request": state.clarification_request,
-            "results": state.results,
-            "llm_only_response": state.llm_only_response,
-            "formatted_response": state.formatted_response,
-            "cypher_generated": state.cypher_generated,
-            "records_found": state.records_found,
-            "turn_number": state.turn_number,
-            "conversation_history": state.conversation_history
-        }
+        return with_timing(state_to_response(state, session_id), trace if debug == "timing" else None)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(LLM_CIRCUIT_RESET_SECONDS))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/ask/stream")
+async def ask_agent_stream(request: AskRequest):
+    """Streaming question endpoint - sends Server-Sent Events as each stage of the agent completes"""
+    print(f"➡️ Received streaming question: {request.question}")
+    service = require_agent()
+
+    async def event_stream():
+        try:
+            async for event in service.astream(request.question):
+                if event["event"] == "done":
+                    session_id = await session_store.acreate(event["data"])
+                    yield sse_event("done", state_to_response(event["data"], session_id))
+                else:
+                    yield sse_event(event["event"], event["data"])
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/ask/batch")
+async def ask_agent_batch(request: BatchAskRequest):
+    """Batch endpoint - answers many questions with bounded concurrency; one failing question does not fail the batch"""
+    print(f"➡️ Received batch of {len(request.questions)} questions")
+    if len(request.questions) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=413, detail=f"A batch can hold at most {BATCH_MAX_QUESTIONS} questions")
+    service = require_agent()
+
+    max_concurrency = min(request.max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+
+    async def batch_item(index: int, result) -> dict:
+        if isinstance(result, Exception):
+            return {"index": index, "question": request.questions[index], "error": str(result)}
+        session_id = await session_store.acreate(result)
+        return {"index": index, **state_to_response(result, session_id)}
+
+    if not request.stream:
+        results = await service.arun_many(request.questions, max_concurrency)
+        return {"results": [await batch_item(i, result) for i, result in enumerate(results)]}
+
+    async def event_stream():
+        try:
+            async for index, result in service.astream_many(request.questions, max_concurrency):
+                yield sse_event("result", await batch_item(index, result))
+            yield sse_event("done", {"count": len(request.questions)})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/clarify")
-def clarify_question(request: ClarificationRequest):
-    """Clarification endpoint - continues conversation with additional context"""
+async def clarify_question(request: ClarificationRequest, debug: Optional[str] = None):
+    """Clarification endpoint - continues conversation with additional context; ?debug=timing adds the span waterfall"""
+    print(f"➡️ Received clarification: {request.clarification}")
+    service = require_agent()
+
+    if request.session_id:
+        previous_state = await session_store.aget(request.session_id)
+        if previous_state is None:
+            raise HTTPException(status_code=404, detail=f"Unknown or expired session: {request.session_id}")
+        session_id = request.session_id
+    elif not request.previous_state:
+        raise HTTPException(status_code=422, detail="Either session_id or previous_state is required")
+
     try:
-        print(f"➡️ Received clarification: {request.clarification}")
-        print(f"➡️ Previous state: {request.previous_state}")
-        
-        # Reconstruct the previous state
-        previous_state = MultiTurnState(**request.previous_state)
-        
-        # Add clarification to conversation
-        updated_state = agent_service.add_to_conversation(previous_state, request.clarification)
-        
-        return {
-            "question": updated_state.current_question,
-            "needs_clarification": updated_state.needs_clarification,
-            "clarification_request": updated_state.clarification_request,
-            "results": updated_state.results,
-            "llm_only_response": updated_state.llm_only_response,
-            "formatted_response": updated_state.formatted_response,
-            "cypher_generated": updated_state.cypher_generated,
-            "records_found": updated_state.records_found,
-            "turn_number": updated_state.turn_number,
-            "conversation_history": updated_state.conversation_history
-        }
+        if not request.session_id:
+            # Older clients echo the previous response, which names the question "question"
+            previous = dict(request.previous_state)
+            previous.setdefault("current_question", previous.get("question"))
+            previous_state = MultiTurnState(**previous)
+            session_id = None
+
+        with TRACER.trace("POST /clarify", force=debug == "timing") as trace:
+            # Add clarification to conversation
+            updated_state = await service.aadd_to_conversation(previous_state, request.clarification)
+
+            if session_id:
+                await session_store.aput(session_id, updated_state)
+            else:
+                session_id = await session_store.acreate(updated_state)
+
+        return with_timing(state_to_response(updated_state, session_id), trace if debug == "timing" else None)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(LLM_CIRCUIT_RESET_SECONDS))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: node latency, LLM calls and tokens per adapter, Neo4j timings and cache hit rates"""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/evaluation/stats")
+async def evaluation_stats():
+    """How often each evaluation tier decided, and how many LLM calls the static checks saved"""
+    return require_agent().evaluation_stats.snapshot()
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe - the process is up and serving, whether or not warmup has finished"""
+    return {"status": "ok"}
 
 
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe - 200 once Neo4j answers and the schema, examples and LLMs are loaded, 503 before that"""
+    status = readiness.snapshot()
+    status["ready"] = status["ready"] and agent_service is not None
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
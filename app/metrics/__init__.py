@@ -0,0 +1,18 @@
+from .metrics import MetricsRegistry, Counter, Histogram
+from .agent_metrics import (
+    REGISTRY,
+    NODE_SECONDS,
+    LLM_CALLS,
+    LLM_SECONDS,
+    LLM_TOKENS,
+    NEO4J_SECONDS,
+    NEO4J_RECORDS,
+    SCHEMA_TOKENS_SAVED,
+    LLM_RETRIES,
+    LLM_HEDGES,
+    LLM_THROTTLE_SECONDS,
+    record_llm_call,
+    timed_node,
+    register_cache,
+    register_circuit,
+)
@@ -0,0 +1,128 @@
+import asyncio
+import inspect
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from ..tracing import TRACER
+from ..utils.tokens import estimate_tokens
+from .metrics import MetricsRegistry, Sample
+
+REGISTRY = MetricsRegistry()
+
+NODE_SECONDS = REGISTRY.histogram(
+    "agent_node_duration_seconds", "Time spent in each LangGraph node", ["node"]
+)
+LLM_CALLS = REGISTRY.counter(
+    "agent_llm_calls_total", "LLM calls by adapter and outcome (ok, error, cancelled)", ["adapter", "outcome"]
+)
+LLM_SECONDS = REGISTRY.histogram(
+    "agent_llm_call_duration_seconds", "LLM call latency by adapter", ["adapter"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "agent_llm_tokens_total", "Prompt and completion tokens by adapter, as reported by the provider or estimated", ["adapter", "kind"]
+)
+NEO4J_SECONDS = REGISTRY.histogram(
+    "agent_neo4j_query_duration_seconds", "Neo4j execution time of generated Cypher (result cache misses only)"
+)
+NEO4J_RECORDS = REGISTRY.histogram(
+    "agent_neo4j_records_returned", "Records returned per generated Cypher query",
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+)
+SCHEMA_TOKENS_SAVED = REGISTRY.histogram(
+    "agent_schema_tokens_saved_ratio", "Share of schema tokens that question-aware pruning removed from the Cypher prompt",
+    buckets=(0, 0.1, 0.25, 0.5, 0.75, 0.9, 1)
+)
+LLM_RETRIES = REGISTRY.counter(
+    "agent_llm_retries_total", "LLM calls retried by the client layer, by reason (throttled, transient)", ["reason"]
+)
+LLM_HEDGES = REGISTRY.counter(
+    "agent_llm_hedges_total", "Hedged LLM calls by adapter and which backend answered (primary, secondary, not_hedged)", ["adapter", "winner"]
+)
+LLM_THROTTLE_SECONDS = REGISTRY.histogram(
+    "agent_llm_throttle_wait_seconds", "Time LLM calls waited for the client-side rate limiter"
+)
+
+
+def record_llm_call(
+    adapter: str,
+    started: float,
+    prompt: str,
+    completion: Optional[Any] = None,
+    outcome: str = "ok",
+    usage: Optional[Dict[str, int]] = None
+) -> Tuple[int, int]:
+    """Record one LLM call that started at `started` (a time.perf_counter() reading); returns its prompt and completion tokens.
+
+    Token counts come from the provider's `usage` when there is one, else from a character estimate,
+    so recording a call never runs a tokenizer on the request path.
+    """
+    LLM_SECONDS.observe(time.perf_counter() - started, adapter)
+    LLM_CALLS.inc(adapter, outcome)
+    if usage:
+        prompt_tokens, completion_tokens = usage["prompt"], usage["completion"]
+    else:
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(getattr(completion, "content", completion)) if completion is not None else 0
+    LLM_TOKENS.inc(adapter, "prompt", amount=prompt_tokens)
+    LLM_TOKENS.inc(adapter, "completion", amount=completion_tokens)
+    return prompt_tokens, completion_tokens
+
+
+def timed_node(node: str, func: Callable) -> Callable:
+    """Wrap a LangGraph node so its latency lands in agent_node_duration_seconds and the request trace"""
+    # RunnableLambda only hands over the config when the function asks for it
+    takes_config = "config" in inspect.signature(func).parameters
+
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def timed(state, config):
+            started = time.perf_counter()
+            try:
+                with TRACER.span(f"node.{node}"):
+                    return await (func(state, config) if takes_config else func(state))
+            finally:
+                NODE_SECONDS.observe(time.perf_counter() - started, node)
+    else:
+        @wraps(func)
+        def timed(state, config):
+            started = time.perf_counter()
+            try:
+                with TRACER.span(f"node.{node}"):
+                    return func(state, config) if takes_config else func(state)
+            finally:
+                NODE_SECONDS.observe(time.perf_counter() - started, node)
+
+    # Drop the wrapped signature so RunnableLambda sees (state, config)
+    del timed.__wrapped__
+    return timed
+
+
+def register_cache(name: str, cache: Optional[Any], registry: MetricsRegistry = REGISTRY) -> None:
+    """Expose a cache's own hits/misses counters; they are read on scrape, so lookups pay nothing extra"""
+    if cache is None:
+        return
+
+    def requests() -> Iterable[Sample]:
+        yield {"cache": name, "result": "hit"}, cache.hits
+        yield {"cache": name, "result": "miss"}, cache.misses
+
+    def hit_ratio() -> Iterable[Sample]:
+        total = cache.hits + cache.misses
+        yield {"cache": name}, cache.hits / total if total else 0.0
+
+    registry.register_collector("agent_cache_requests_total", "Cache lookups by cache and result", "counter", requests)
+    registry.register_collector("agent_cache_hit_ratio", "Share of cache lookups that hit", "gauge", hit_ratio)
+
+
+def register_circuit(name: str, breaker: Optional[Any], registry: MetricsRegistry = REGISTRY) -> None:
+    """Expose a circuit breaker's state as 1 for the current state and 0 for the others"""
+    if breaker is None:
+        return
+
+    def states() -> Iterable[Sample]:
+        current = breaker.state
+        for state in ("closed", "open", "half_open"):
+            yield {"circuit": name, "state": state}, 1.0 if state == current else 0.0
+
+    registry.register_collector("agent_llm_circuit_state", "LLM circuit breaker state", "gauge", states)
@@ -0,0 +1,168 @@
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[Dict[str, str], float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labels: Dict[str, str], extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels.items()]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _le(bound) -> str:
+    return f'le="{bound}"'
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter; `inc` takes the label values positionally, in `labelnames` order"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(dict(zip(self.labelnames, labels)))} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+
+class Histogram:
+    """Bucketed distribution; `observe` only bumps one bucket, cumulative counts are built when rendering"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # Per label set: [count per bucket..., count above the last bucket, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    def count(self, *labels: str) -> int:
+        row = self._values.get(labels)
+        return int(sum(row[:-1])) if row else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(row)) for labels, row in self._values.items()]
+
+        lines = []
+        for labels, row in values:
+            label_map = dict(zip(self.labelnames, labels))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(label_map, _le(bound))} {_format_value(cumulative)}")
+            cumulative += row[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_format_labels(label_map, _le('+Inf'))} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(label_map)} {_format_value(row[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(label_map)} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format.
+
+    Values that already live elsewhere, like cache hit counters, are read through collectors at scrape
+    time instead of being mirrored on every request.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Tuple[str, str, str, Callable[[], Iterable[Sample]]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        collect: Callable[[], Iterable[Sample]]
+    ) -> None:
+        """Add a metric computed on scrape; `collect` returns `(labels, value)` samples"""
+        self._collectors.append((name, documentation, metric_type, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+
+        collected: Dict[str, Tuple[str, str, List[Sample]]] = {}
+        for name, documentation, metric_type, collect in self._collectors:
+            try:
+                samples = list(collect())
+            except Exception as e:
+                print(f"⚠️ [metrics] Collector for {name} failed: {e}")
+                continue
+            collected.setdefault(name, (documentation, metric_type, []))[2].extend(samples)
+        for name, (documentation, metric_type, samples) in collected.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
@@ -1 +1 @@
-from .type import RoutingDecision, AppState, RetrieverOutput, RetrieverResultItem, AskRequest, Text2CypherRetrieverOutput, MultiTurnState, ClarificationRequest
\ No newline at end of file
+from .type import RoutingDecision, AppState, RetrieverOutput, RetrieverResultItem, AskRequest, BatchAskRequest, Text2CypherRetrieverOutput, MultiTurnState, ClarificationRequest
\ No newline at end of file
@@ -14,6 +14,9 @@ class RoutingDecision(BaseModel):
 class Text2CypherRetrieverOutput(BaseModel):
     cypher: str
     results: List[RetrieverResultItem]
+    # From the guardrail EXPLAIN; None when no plan check ran (result cache hit, check disabled)
+    estimated_rows: Optional[float] = None
+    plan_notifications: Optional[List[Dict[str, Any]]] = None
 
 
 class RetrieverOutput(BaseModel):
@@ -38,6 +41,9 @@ class MultiTurnState(BaseModel):
     results: Optional[Text2CypherRetrieverOutput] = None
     cypher_generated: Optional[str] = None
     records_found: int = 0
+
+    # Set when the row cap stopped reading results early
+    results_truncated: bool = False
     
     # Error handling
     error_message: Optional[str] = None
@@ -45,16 +51,32 @@ class MultiTurnState(BaseModel):
     # Clarification logic
     needs_clarification: bool = False
     clarification_request: Optional[str] = None
+
+    # Which evaluation tier decided: "static", "llm" or "skipped"
+    evaluation_tier: Optional[str] = None
     
     # Response formatting
     formatted_response: Optional[str] = None
     llm_only_response: Optional[str] = None
 
+    # Set when the answer was served from the semantic cache
+    cache_hit: bool = False
+
 
 class AskRequest(BaseModel):
     question: str
 
 
+class BatchAskRequest(BaseModel):
+    questions: List[str]
+    # Defaults to BATCH_MAX_CONCURRENCY; capped by it as well
+    max_concurrency: Optional[int] = None
+    # Send each result as a Server-Sent Event as soon as it is ready instead of one JSON body
+    stream: bool = False
+
+
 class ClarificationRequest(BaseModel):
     clarification: str
-    previous_state: Dict[str, Any]
+    session_id: Optional[str] = None
+    # Deprecated: clients used to send the whole previous response back, use session_id instead
+    previous_state: Optional[Dict[str, Any]] = None
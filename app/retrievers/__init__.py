@@ -1,2 +1,7 @@
+from .cypher_guard import CypherGuardrails, CypherGuardrailError, PlanSummary
+from .example_selector import ExampleSelector
+from .schema_pruner import SchemaPruner
+from .cypher_validator import CypherValidator, CypherValidation, EvaluationTierStats
 from .text2cypher_builder import Text2CypherRetrieverBuilder
-from .vector_builder import VectorRetrieverBuilder
\ No newline at end of file
+from .text2cypher_retriever import StagedText2CypherRetriever
+from .vector_builder import VectorRetrieverBuilder
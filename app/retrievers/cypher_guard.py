@@ -0,0 +1,135 @@
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+import neo4j
+from neo4j import AsyncDriver, Driver, Record
+from neo4j_graphrag.exceptions import Text2CypherRetrievalError
+
+from ..tracing import TRACER
+from .cypher_validator import AGGREGATION, STRING_LITERAL
+
+RETURN_KEYWORD = re.compile(r"\bRETURN\b", re.IGNORECASE)
+LIMIT_KEYWORD = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+UNION_KEYWORD = re.compile(r"\bUNION\b", re.IGNORECASE)
+
+
+class CypherGuardrailError(Text2CypherRetrievalError):
+    """Generated Cypher refused before it reached the database"""
+
+
+@dataclass
+class PlanSummary:
+    """What the guardrail EXPLAIN learned, passed on so the query is not explained a second time"""
+    estimated_rows: float
+    notifications: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class CypherGuardrails:
+    """Execution limits for generated Cypher.
+
+    Queries run in read transactions with a server-side timeout and a lazy `fetch_size`, and stop
+    consuming once `max_rows` records have arrived. List queries without a LIMIT get `auto_limit`
+    appended, and queries whose EXPLAIN plan estimates more than `max_estimated_rows` are refused.
+    Set any limit to None to turn it off.
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: Optional[float] = 30.0,
+        fetch_size: int = 1000,
+        max_rows: Optional[int] = 5000,
+        auto_limit: Optional[int] = 1000,
+        max_estimated_rows: Optional[float] = 1_000_000
+    ):
+        self.timeout_seconds = timeout_seconds
+        self.fetch_size = fetch_size
+        self.max_rows = max_rows
+        self.auto_limit = auto_limit
+        self.max_estimated_rows = max_estimated_rows
+
+    def rewrite(self, cypher: str) -> str:
+        """Append LIMIT to a single list query that has no aggregation and no limit of its own"""
+        if not self.auto_limit:
+            return cypher
+
+        query = STRING_LITERAL.sub("''", cypher)
+        returns = list(RETURN_KEYWORD.finditer(query))
+        if not returns or UNION_KEYWORD.search(query):
+            return cypher
+
+        # Only the final RETURN decides the row count; a brace after it means it sits in a subquery
+        tail = query[returns[-1].end():]
+        if "}" in tail or ";" in tail.rstrip().rstrip(";") or LIMIT_KEYWORD.search(tail) or AGGREGATION.search(tail):
+            return cypher
+
+        return f"{cypher.rstrip().rstrip(';').rstrip()}\nLIMIT {self.auto_limit}"
+
+    def check_plan(self, driver: Driver, database: Optional[str], cypher: str) -> Optional[PlanSummary]:
+        """EXPLAIN the query and refuse it if the plan is too large; None when the plan check is off"""
+        if self.max_estimated_rows is None:
+            return None
+        with TRACER.span("neo4j.explain", purpose="guardrails") as span:
+            _, summary, _ = driver.execute_query(
+                f"EXPLAIN {cypher}",
+                database_=database,
+                routing_=neo4j.RoutingControl.READ
+            )
+            return self._reject_large_plan(span, summary)
+
+    async def acheck_plan(self, driver: AsyncDriver, database: Optional[str], cypher: str) -> Optional[PlanSummary]:
+        if self.max_estimated_rows is None:
+            return None
+        with TRACER.span("neo4j.explain", purpose="guardrails") as span:
+            _, summary, _ = await driver.execute_query(
+                f"EXPLAIN {cypher}",
+                database_=database,
+                routing_=neo4j.RoutingControl.READ
+            )
+            return self._reject_large_plan(span, summary)
+
+    def _reject_large_plan(self, span, summary) -> PlanSummary:
+        estimated = self.estimated_rows(summary.plan)
+        if span is not None:
+            span.set(estimated_rows=estimated)
+        if estimated > self.max_estimated_rows:
+            print(f"🛑 [cypher_guard] Refusing query, planner estimates {estimated:,.0f} rows")
+            raise CypherGuardrailError(
+                f"Query plan estimates {estimated:,.0f} rows, above the limit of {self.max_estimated_rows:,.0f}"
+            )
+        return PlanSummary(estimated_rows=estimated, notifications=list(summary.notifications or []))
+
+    @staticmethod
+    def estimated_rows(plan: Optional[Dict[str, Any]]) -> float:
+        """Largest row estimate of any operator in an EXPLAIN plan"""
+        if not plan:
+            return 0.0
+        args = plan.get("args") or {}
+        children = plan.get("children") or []
+        return max([float(args.get("EstimatedRows", 0) or 0)] + [CypherGuardrails.estimated_rows(c) for c in children])
+
+    def execute(self, driver: Driver, database: Optional[str], cypher: str) -> Tuple[List[Record], bool]:
+        """Run the query read-only and return its records and whether the row cap cut them short"""
+        with driver.session(database=database, default_access_mode=neo4j.READ_ACCESS, fetch_size=self.fetch_size) as session:
+            return session.execute_read(neo4j.unit_of_work(timeout=self.timeout_seconds)(self._read), cypher)
+
+    async def aexecute(self, driver: AsyncDriver, database: Optional[str], cypher: str) -> Tuple[List[Record], bool]:
+        async with driver.session(database=database, default_access_mode=neo4j.READ_ACCESS, fetch_size=self.fetch_size) as session:
+            return await session.execute_read(neo4j.unit_of_work(timeout=self.timeout_seconds)(self._aread), cypher)
+
+    def _read(self, tx: neo4j.ManagedTransaction, cypher: str) -> Tuple[List[Record], bool]:
+        result = tx.run(cypher)
+        records = list(islice(result, self.max_rows)) if self.max_rows is not None else list(result)
+        truncated = self.max_rows is not None and result.peek() is not None
+        # Commit discards whatever the server still holds instead of streaming it to us
+        return records, truncated
+
+    async def _aread(self, tx: neo4j.AsyncManagedTransaction, cypher: str) -> Tuple[List[Record], bool]:
+        result = await tx.run(cypher)
+        records: List[Record] = []
+        async for record in result:
+            if self.max_rows is not None and len(records) >= self.max_rows:
+                return records, True
+            records.append(record)
+        return records, False
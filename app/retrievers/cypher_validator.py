@@ -0,0 +1,315 @@
+import asyncio
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+import neo4j
+from neo4j import AsyncDriver, Driver
+
+from ..tracing import TRACER
+
+STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+NODE_PATTERN = re.compile(r"\(\s*(\w*)\s*((?::\s*`?[\w ]+?`?\s*)+)[\s{)]")
+REL_PATTERN = re.compile(r"\[\s*(\w*)\s*:\s*([`\w|:!&]+)")
+PROPERTY_ACCESS = re.compile(r"\b([A-Za-z_]\w*)\.`?(\w+)`?")
+AGGREGATION = re.compile(r"\b(count|sum|avg|min|max|collect|percentileCont|percentileDisc|stDev)\s*\(", re.IGNORECASE)
+RETURN_CLAUSE = re.compile(r"\bRETURN\b(.*)$", re.IGNORECASE | re.DOTALL)
+
+AGGREGATE_QUESTION_HINTS = ("how many", "number of", "count", "total", "average", "sum of", "mean ")
+LIST_QUESTION_HINTS = ("list", "show", "which", "find", "what are", "give me")
+
+WORD = re.compile(r"[a-z]+")
+NUMBER = re.compile(r"(?<![\w.,])(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(%|percent)?")
+LESS_HINTS = ("below", "under", "less than", "lower than", "fewer than", "smaller than", "cheaper than", "at most", "up to")
+MORE_HINTS = ("above", "over", "more than", "greater than", "higher than", "larger than", "at least", "exceed")
+# Question wording and the Cypher that answers it
+AGGREGATE_HINTS = (
+    (("average", "mean "), ("avg(",)),
+    (("how many", "number of"), ("count(",)),
+    (("total", "sum of"), ("sum(", "count(")),
+    (("highest", "maximum", "largest"), ("max(", "order by")),
+    (("lowest", "minimum", "smallest"), ("min(", "order by")),
+)
+# Question words that never name data, so the query does not have to mention them
+STOP_WORDS = frozenset("""
+    a about all an and any are as at be been by can data details do does each every find for from get give
+    have has how i in info information is it list many me much my of on or our per please show than
+    that the their them there these this those to us was we were what when where which who whose with
+    you your below under less lower fewer smaller cheaper most above over more greater higher larger
+    least exceed between top bottom average mean total sum number count highest maximum largest
+    lowest minimum smallest percent
+""".split())
+
+# EXPLAIN notifications that mean the query does not fit the graph
+SCHEMA_NOTIFICATIONS = ("UnknownLabelWarning", "UnknownRelationshipTypeWarning", "UnknownPropertyKeyWarning")
+
+
+@dataclass
+class CypherValidation:
+    """Outcome of the static checks; `verdict` is None when the LLM evaluator has to decide"""
+    verdict: Optional[str]
+    reasons: List[str] = field(default_factory=list)
+
+
+class EvaluationTierStats:
+    """Counts which evaluation tier settled each request, and the static tier's verdicts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"static": 0, "llm": 0, "skipped": 0}
+        self.static_verdicts = {"VALID": 0, "NEEDS_CLARIFICATION": 0, "NO_RESULTS": 0}
+
+    def record(self, tier: str, verdict: Optional[str] = None) -> None:
+        with self._lock:
+            self.counts[tier] = self.counts.get(tier, 0) + 1
+            if tier == "static" and verdict is not None:
+                self.static_verdicts[verdict] = self.static_verdicts.get(verdict, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self.counts)
+            verdicts = dict(self.static_verdicts)
+        evaluated = counts["static"] + counts["llm"]
+        # Empty results are cheap to spot, so report the queries with rows separately
+        with_rows = evaluated - verdicts["NO_RESULTS"]
+        saved_with_rows = counts["static"] - verdicts["NO_RESULTS"]
+        return {
+            "counts": counts,
+            "static_verdicts": verdicts,
+            "llm_calls_saved": counts["static"],
+            "llm_calls_saved_with_rows": saved_with_rows,
+            "static_decision_rate": counts["static"] / evaluated if evaluated else 0.0,
+            "static_decision_rate_with_rows": saved_with_rows / with_rows if with_rows else 0.0
+        }
+
+
+class CypherValidator:
+    """Deterministic checks that settle the clear-cut evaluations without an LLM call.
+
+    A query with no records is NO_RESULTS. A query that EXPLAIN flags, or that references labels,
+    relationship types or properties missing from the schema, NEEDS_CLARIFICATION. A schema-clean query
+    with no EXPLAIN warnings is VALID when it also accounts for the question: every term of the question
+    appears in the query, its filter values, numbers, comparisons and aggregates come from the question,
+    and it returns something the question asks about. Anything short of that is left to the LLM
+    evaluator, with the reasons. `static_valid=False` keeps VALID for the LLM alone.
+    """
+
+    def __init__(
+        self,
+        driver: Driver,
+        database: Optional[str],
+        structured_schema: Optional[Dict[str, Any]] = None,
+        async_driver: Optional[AsyncDriver] = None,
+        static_valid: bool = True
+    ):
+        self.driver = driver
+        self.database = database
+        self.async_driver = async_driver
+        self.structured_schema = structured_schema
+        self.static_valid = static_valid
+
+    def validate(
+        self,
+        question: str,
+        cypher: str,
+        records_found: int,
+        notifications: Optional[List[Dict[str, Any]]] = None
+    ) -> CypherValidation:
+        """Judge the query; `notifications` from an EXPLAIN that already ran save running another"""
+        if records_found == 0:
+            return CypherValidation("NO_RESULTS", ["query returned no records"])
+
+        try:
+            if notifications is None:
+                notifications = self._explain(cypher)
+        except Exception as e:
+            return CypherValidation(None, [f"EXPLAIN failed: {e}"])
+        return self._judge(question, cypher, records_found, notifications)
+
+    async def avalidate(
+        self,
+        question: str,
+        cypher: str,
+        records_found: int,
+        notifications: Optional[List[Dict[str, Any]]] = None
+    ) -> CypherValidation:
+        if records_found == 0:
+            return CypherValidation("NO_RESULTS", ["query returned no records"])
+
+        try:
+            if notifications is None:
+                notifications = await self._aexplain(cypher)
+        except Exception as e:
+            return CypherValidation(None, [f"EXPLAIN failed: {e}"])
+        return self._judge(question, cypher, records_found, notifications)
+
+    def _explain(self, cypher: str) -> List[Dict[str, Any]]:
+        with TRACER.span("neo4j.explain"):
+            _, summary, _ = self.driver.execute_query(
+                f"EXPLAIN {cypher}",
+                database_=self.database,
+                routing_=neo4j.RoutingControl.READ
+            )
+        return summary.notifications or []
+
+    async def _aexplain(self, cypher: str) -> List[Dict[str, Any]]:
+        if self.async_driver is None:
+            return await asyncio.to_thread(self._explain, cypher)
+        with TRACER.span("neo4j.explain"):
+            _, summary, _ = await self.async_driver.execute_query(
+                f"EXPLAIN {cypher}",
+                database_=self.database,
+                routing_=neo4j.RoutingControl.READ
+            )
+        return summary.notifications or []
+
+    def _judge(self, question: str, cypher: str, records_found: int, notifications: List[Dict[str, Any]]) -> CypherValidation:
+        problems = [
+            n.get("description") or n.get("title", "")
+            for n in notifications
+            if any(code in n.get("code", "") for code in SCHEMA_NOTIFICATIONS)
+        ]
+        problems += self.schema_problems(cypher)
+        if problems:
+            return CypherValidation("NEEDS_CLARIFICATION", problems)
+
+        if not self.static_valid:
+            return CypherValidation(None, ["query fits the schema, intent is left to the LLM"])
+
+        reasons = [
+            f"EXPLAIN warning: {n.get('description') or n.get('title', '')}"
+            for n in notifications
+            if n.get("severity") == "WARNING"
+        ]
+        if self.structured_schema is None:
+            reasons.append("no schema available to check against")
+        shape_problem = self.shape_problem(question, cypher, records_found)
+        if shape_problem:
+            reasons.append(shape_problem)
+        reasons += self.intent_problems(question, cypher)
+        if reasons:
+            return CypherValidation(None, reasons)
+        return CypherValidation("VALID", ["query fits the schema and accounts for every term of the question"])
+
+    def schema_problems(self, cypher: str) -> List[str]:
+        """Labels, relationship types and properties used by the query that the schema does not know"""
+        if not self.structured_schema:
+            return []
+
+        node_props: Dict[str, List[Dict[str, Any]]] = self.structured_schema.get("node_props", {})
+        rel_props: Dict[str, List[Dict[str, Any]]] = self.structured_schema.get("rel_props", {})
+        rel_types = {r["type"] for r in self.structured_schema.get("relationships", [])} | set(rel_props)
+
+        query = STRING_LITERAL.sub("''", cypher)
+        problems: List[str] = []
+        bindings: Dict[str, Set[str]] = {}
+
+        for variable, labels in NODE_PATTERN.findall(query):
+            names = {label.strip(" `") for label in labels.split(":") if label.strip(" `")}
+            for label in names - set(node_props):
+                problems.append(f"unknown label :{label}")
+            if variable:
+                bindings.setdefault(variable, set()).update({f"node:{n}" for n in names})
+
+        for variable, types in REL_PATTERN.findall(query):
+            names = {t.strip(" `!") for t in re.split(r"[|:&]", types) if t.strip(" `!")}
+            for rel_type in names - rel_types:
+                problems.append(f"unknown relationship type :{rel_type}")
+            if variable:
+                bindings.setdefault(variable, set()).update({f"rel:{n}" for n in names})
+
+        for variable, prop in PROPERTY_ACCESS.findall(query):
+            if variable not in bindings:
+                continue
+            known = None
+            for binding in bindings[variable]:
+                kind, name = binding.split(":", 1)
+                props = node_props.get(name) if kind == "node" else rel_props.get(name, [] if name in rel_types else None)
+                if props is not None:
+                    known = (known or set()) | {p["property"] for p in props}
+            # Variables bound only to unknown labels have already been reported
+            if known is not None and prop not in known:
+                problems.append(f"unknown property {variable}.{prop}")
+
+        return list(dict.fromkeys(problems))
+
+    @staticmethod
+    def shape_problem(question: str, cypher: str, records_found: int) -> Optional[str]:
+        """Describe a mismatch between what the question asks for and what the query returns"""
+        question = question.lower()
+        return_clause = RETURN_CLAUSE.search(STRING_LITERAL.sub("''", cypher))
+        aggregates = bool(return_clause and AGGREGATION.search(return_clause.group(1)))
+
+        if any(hint in question for hint in AGGREGATE_QUESTION_HINTS):
+            if not aggregates and records_found > 1:
+                return "question asks for an aggregate but the query returns individual rows"
+        elif any(question.startswith(hint) or f" {hint} " in f" {question} " for hint in LIST_QUESTION_HINTS):
+            if aggregates and records_found == 1:
+                return "question asks for a list but the query returns a single aggregate"
+
+        return None
+
+    @staticmethod
+    def intent_problems(question: str, cypher: str) -> List[str]:
+        """Ways the query may answer a different question than the one asked"""
+        question_text = question.lower()
+        query = STRING_LITERAL.sub("''", cypher)
+        query_text = query.lower()
+        literals = [literal[1:-1] for literal in STRING_LITERAL.findall(cypher) if len(literal) > 2]
+        question_terms = _terms(question)
+        query_terms = _terms(query) | {term for literal in literals for term in _terms(literal)}
+        problems: List[str] = []
+
+        missing = sorted({term for term in question_terms if term not in STOP_WORDS} - query_terms)
+        if missing:
+            problems.append(f"the query does not use {', '.join(missing)} from the question")
+
+        for literal in literals:
+            if not _terms(literal) <= question_terms:
+                problems.append(f"filter value '{literal}' is not in the question")
+
+        query_numbers = {float(n.replace(",", "")) for n, _ in NUMBER.findall(query)}
+        for number, percent in NUMBER.findall(question_text):
+            value = float(number.replace(",", ""))
+            candidates = {value, value / 100} if percent else {value}
+            if not candidates & query_numbers:
+                problems.append(f"the query does not use {number}{percent} from the question")
+
+        operators = re.sub(r"<-|->|<>", " ", query)
+        asks_less = any(hint in question_text for hint in LESS_HINTS)
+        asks_more = any(hint in question_text for hint in MORE_HINTS)
+        if asks_less and not asks_more and ">" in operators and "<" not in operators:
+            problems.append("question asks for lower values but the query compares with >")
+        if asks_more and not asks_less and "<" in operators and ">" not in operators:
+            problems.append("question asks for higher values but the query compares with <")
+
+        for hints, answers in AGGREGATE_HINTS:
+            if any(hint in question_text for hint in hints) and not any(answer in query_text for answer in answers):
+                problems.append(f"question asks for '{next(h for h in hints if h in question_text).strip()}' but the query has no {answers[0]})")
+
+        return_clause = RETURN_CLAUSE.search(query)
+        returned = _terms(return_clause.group(1)) if return_clause else set()
+        # A returned variable stands for its labels, e.g. `RETURN p` for "which properties"
+        for variable, labels in NODE_PATTERN.findall(query):
+            if variable and return_clause and re.search(rf"\b{variable}\b", return_clause.group(1)):
+                returned |= _terms(labels)
+        if not returned & question_terms:
+            problems.append("the query returns nothing the question asks about")
+
+        return problems
+
+
+def _terms(text: str) -> Set[str]:
+    """Lowercase words of a question or query, identifiers split and plurals folded to the singular"""
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text).replace("_", " ").lower()
+    terms = set()
+    for word in WORD.findall(text):
+        if word.endswith("ies") and len(word) > 4:
+            word = word[:-3] + "y"
+        elif word.endswith(("sses", "xes")):
+            word = word[:-2]
+        elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+            word = word[:-1]
+        terms.add(word)
+    return terms
@@ -0,0 +1,50 @@
+from typing import List, Optional
+
+import numpy as np
+from neo4j_graphrag.embeddings.base import Embedder
+
+from ..tracing import TRACER
+from ..utils.embedding_cache import embed_texts, normalize
+
+
+def example_input(example: str) -> str:
+    """The question part of a formatted "User: ...\\nCypher: ..." example"""
+    return example.split("\nCypher:", 1)[0].removeprefix("User:").strip()
+
+
+class ExampleSelector:
+    """Picks the few-shot examples whose questions are closest to the current one.
+
+    Example questions are embedded once into a normalized float32 matrix, which is saved under
+    `cache_dir` keyed by a hash of the examples and the embedding model, so restarts and replicas
+    reuse it. Selection is one matrix-vector product, so the library can grow to thousands of
+    examples while each prompt carries only `k`.
+    """
+
+    def __init__(
+        self,
+        examples: List[str],
+        embedder: Embedder,
+        k: int = 5,
+        cache_dir: Optional[str] = ".cache",
+        max_workers: int = 8
+    ):
+        self.examples = examples
+        self.embedder = embedder
+        self.k = k
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.matrix = embed_texts([example_input(e) for e in examples], embedder, cache_dir, "examples", max_workers)
+
+    def select(self, question: str) -> List[str]:
+        with TRACER.span("examples.select", examples=len(self.examples), k=self.k):
+            return self.select_by_vector(self.embedder.embed_query(question))
+
+    def select_by_vector(self, vector: np.ndarray) -> List[str]:
+        if len(self.examples) <= self.k:
+            return list(self.examples)
+
+        scores = self.matrix @ normalize(vector)
+        top = np.argpartition(-scores, self.k - 1)[:self.k]
+        # Most similar last, so the closest example sits right above the question in the prompt
+        return [self.examples[i] for i in top[np.argsort(scores[top])]]
@@ -0,0 +1,94 @@
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+from neo4j_graphrag.embeddings.base import Embedder
+
+from ..utils.embedding_cache import embed_texts, normalize
+
+
+def _words(name: str) -> str:
+    return name.replace("_", " ").lower()
+
+
+class SchemaPruner:
+    """Cuts the structured schema down to the part a question is about.
+
+    Labels, relationship patterns and `Label.property` pairs are embedded once. For a question, the
+    `top_labels` closest labels are the seeds. The label adjacency graph adds their 1-hop
+    neighbours, so traversals out of the seeds stay writable, and the `top_relationships` closest
+    patterns are kept with both endpoints. Seeds keep all their properties, other labels only their
+    `neighbour_properties` closest ones.
+    """
+
+    def __init__(
+        self,
+        structured_schema: Dict[str, Any],
+        embedder: Embedder,
+        top_labels: int = 3,
+        top_relationships: int = 3,
+        neighbour_properties: int = 5,
+        cache_dir: Optional[str] = ".cache"
+    ):
+        self.structured_schema = structured_schema
+        self.embedder = embedder
+        self.top_labels = top_labels
+        self.top_relationships = top_relationships
+        self.neighbour_properties = neighbour_properties
+
+        self.node_props: Dict[str, List[Dict[str, Any]]] = structured_schema.get("node_props", {})
+        self.relationships: List[Dict[str, str]] = structured_schema.get("relationships", [])
+        # Labels without properties only show up as relationship endpoints
+        self.labels = sorted(set(self.node_props) | {r[end] for r in self.relationships for end in ("start", "end")})
+
+        self.adjacency: Dict[str, Set[str]] = {label: set() for label in self.labels}
+        for rel in self.relationships:
+            self.adjacency.setdefault(rel["start"], set()).add(rel["end"])
+            self.adjacency.setdefault(rel["end"], set()).add(rel["start"])
+
+        self.properties = [(label, p["property"]) for label in self.labels for p in self.node_props.get(label, [])]
+        texts = (
+            [f"{_words(label)}: {', '.join(_words(p['property']) for p in self.node_props.get(label, []))}" for label in self.labels]
+            + [f"{_words(r['start'])} {_words(r['type'])} {_words(r['end'])}" for r in self.relationships]
+            + [f"{_words(label)} {_words(prop)}" for label, prop in self.properties]
+        )
+        matrix = embed_texts(texts, embedder, cache_dir, "schema")
+        n_labels, n_rels = len(self.labels), len(self.relationships)
+        self.label_matrix = matrix[:n_labels]
+        self.rel_matrix = matrix[n_labels:n_labels + n_rels]
+        self.property_matrix = matrix[n_labels + n_rels:]
+
+    def prune(self, vector) -> Dict[str, Any]:
+        """Structured schema restricted to the labels relevant to the question embedding `vector`"""
+        if len(self.labels) <= self.top_labels:
+            return self.structured_schema
+
+        vector = normalize(vector)
+        label_scores = self.label_matrix @ vector
+        seeds = {self.labels[i] for i in np.argsort(-label_scores)[:self.top_labels]}
+        neighbours = {n for seed in seeds for n in self.adjacency.get(seed, ())}
+        matched_rels = set()
+        if self.relationships:
+            rel_scores = self.rel_matrix @ vector
+            matched_rels = set(np.argsort(-rel_scores)[:self.top_relationships].tolist())
+            for i in matched_rels:
+                neighbours.update((self.relationships[i]["start"], self.relationships[i]["end"]))
+        neighbours -= seeds
+        property_scores = dict(zip(self.properties, self.property_matrix @ vector)) if self.properties else {}
+
+        node_props = {}
+        for label in self.node_props:
+            if label in seeds:
+                node_props[label] = self.node_props[label]
+            elif label in neighbours:
+                ranked = sorted(self.node_props[label], key=lambda p: -property_scores.get((label, p["property"]), 0.0))
+                node_props[label] = ranked[:self.neighbour_properties]
+
+        relationships = [r for i, r in enumerate(self.relationships)
+                         if i in matched_rels or r["start"] in seeds or r["end"] in seeds]
+        kept_types = {r["type"] for r in relationships}
+        return {
+            **self.structured_schema,
+            "node_props": node_props,
+            "rel_props": {t: props for t, props in self.structured_schema.get("rel_props", {}).items() if t in kept_types},
+            "relationships": relationships
+        }
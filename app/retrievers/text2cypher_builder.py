@@ -1,9 +1,15 @@
-from neo4j import Driver, Record
+from typing import Any, Dict, Optional
+from neo4j_graphrag.embeddings.base import Embedder
+from neo4j import AsyncDriver, Driver, Record
 from neo4j_graphrag.types import RetrieverResultItem
-from neo4j_graphrag.schema import get_schema
-from neo4j_graphrag.retrievers import Text2CypherRetriever
+from neo4j_graphrag.schema import format_schema, get_structured_schema
 from neo4j_graphrag.llm import LLMInterface
 from ..utils.query_examples import load_query_examples
+from .text2cypher_retriever import StagedText2CypherRetriever
+from ..cache import CypherCache, ResultCache, SchemaCache, SchemaSnapshot, without_graph_meta
+from .cypher_guard import CypherGuardrails
+from .example_selector import ExampleSelector
+from .schema_pruner import SchemaPruner
 
 PROMPT_TEMPLATE = """
 You are a Cypher-generating expert for a CBRE real estate Neo4j graph.
@@ -32,22 +38,55 @@ Instructions:
 """
 
 class Text2CypherRetrieverBuilder:
-    def __init__(self, driver: Driver, database: str, llm: LLMInterface, examples_file: str = "query_examples.yml"):
+    def __init__(
+        self,
+        driver: Driver,
+        database: str,
+        llm: LLMInterface,
+        examples_file: str = "query_examples.yml",
+        async_driver: Optional[AsyncDriver] = None,
+        cypher_cache: Optional[CypherCache] = None,
+        result_cache: Optional[ResultCache] = None,
+        guardrails: Optional[CypherGuardrails] = None,
+        schema_cache: Optional[SchemaCache] = None,
+        embedder: Optional[Embedder] = None,
+        examples_top_k: Optional[int] = None,
+        examples_cache_dir: Optional[str] = ".cache",
+        schema_pruning: bool = False
+    ):
         self.driver = driver
         self.database = database
         self.llm = llm
         self.examples_file = examples_file
-
-    def build(self) -> Text2CypherRetriever:
+        self.async_driver = async_driver
+        self.cypher_cache = cypher_cache
+        self.result_cache = result_cache
+        self.guardrails = guardrails
+        self.schema_cache = schema_cache
+        self.embedder = embedder
+        self.examples_top_k = examples_top_k
+        self.examples_cache_dir = examples_cache_dir
+        self.schema_pruning = schema_pruning
+        self.structured_schema: Optional[Dict[str, Any]] = None
+
+    def build(self) -> StagedText2CypherRetriever:
         schema = self._load_schema()
-        prompt_template = self._build_prompt(schema)
+        schema_pruner = self._build_schema_pruner(self.structured_schema)
+        prompt_template = self._build_prompt(schema, pruned=schema_pruner is not None)
         examples = self._get_examples()
         
         print(f"📊 Schema loaded: {len(schema)} characters")
         print(f"📝 Examples loaded: {len(examples)} examples")
 
-        retriever = Text2CypherRetriever(
+        retriever = StagedText2CypherRetriever(
             driver=self.driver,
+            async_driver=self.async_driver,
+            cypher_cache=self.cypher_cache,
+            result_cache=self.result_cache,
+            structured_schema=self.structured_schema,
+            guardrails=self.guardrails,
+            example_selector=self._build_example_selector(examples),
+            schema_pruner=schema_pruner,
             llm=self.llm,
             neo4j_schema=schema,
             neo4j_database=self.database,
@@ -56,6 +95,9 @@ class Text2CypherRetrieverBuilder:
             result_formatter=self._format_result
         )
 
+        if self.schema_cache is not None:
+            self.schema_cache.subscribe(lambda snapshot: self._swap_schema(retriever, snapshot))
+
         print("\n🔎 Text2CypherRetriever Summary")
         print("────────────────────────────────────────")
         print("🔤 LLM type:", type(retriever.llm))
@@ -72,11 +114,30 @@ class Text2CypherRetrieverBuilder:
         return retriever
 
     def _load_schema(self) -> str:
-        return get_schema(self.driver, database=self.database)
+        if self.schema_cache is not None:
+            snapshot = self.schema_cache.get()
+            self.structured_schema = snapshot.structured_schema
+            return snapshot.schema
+
+        # Keep the structured form around so the generated Cypher can be checked against it
+        self.structured_schema = without_graph_meta(get_structured_schema(self.driver, database=self.database))
+        return format_schema(self.structured_schema, is_enhanced=False)
+
+    def _swap_schema(self, retriever: StagedText2CypherRetriever, snapshot: SchemaSnapshot) -> None:
+        self.structured_schema = snapshot.structured_schema
+        schema_pruner = self._build_schema_pruner(snapshot.structured_schema)
+        retriever.swap_schema(
+            snapshot.schema,
+            self._build_prompt(snapshot.schema, pruned=schema_pruner is not None),
+            snapshot.structured_schema,
+            schema_pruner
+        )
+        print(f"📊 Schema swapped: {len(snapshot.schema)} characters")
 
-    def _build_prompt(self, schema: str) -> str:
+    def _build_prompt(self, schema: str, pruned: bool = False) -> str:
+        # A pruned prompt keeps the {schema} slot open; the retriever fills it per question
         return PROMPT_TEMPLATE.format(
-            schema=schema.replace("{", "[").replace("}", "]"),
+            schema="{schema}" if pruned else schema.replace("{", "[").replace("}", "]"),
             examples="{examples}",
             query_text="{query_text}"
         )
@@ -102,6 +163,25 @@ class Text2CypherRetrieverBuilder:
         
         return examples
 
+    def _build_example_selector(self, examples: list[str]) -> Optional[ExampleSelector]:
+        """Select the top-k examples per question instead of sending all of them; None keeps them all"""
+        if not self.examples_top_k or self.embedder is None or len(examples) <= self.examples_top_k:
+            return None
+        try:
+            return ExampleSelector(examples, self.embedder, k=self.examples_top_k, cache_dir=self.examples_cache_dir)
+        except Exception as e:
+            print(f"⚠️ Could not embed query examples, every prompt will carry all {len(examples)}: {e}")
+            return None
+
+    def _build_schema_pruner(self, structured_schema: Optional[Dict[str, Any]]) -> Optional[SchemaPruner]:
+        if not self.schema_pruning or self.embedder is None or not structured_schema:
+            return None
+        try:
+            return SchemaPruner(structured_schema, self.embedder, cache_dir=self.examples_cache_dir)
+        except Exception as e:
+            print(f"⚠️ Could not embed the schema, every prompt will carry all of it: {e}")
+            return None
+
     def _format_result(self, record: Record) -> RetrieverResultItem:
         """Format the result into RetrieverResultItem."""
         content = " | ".join(f"{k}: {v}" for k, v in record.items())
@@ -0,0 +1,335 @@
+import asyncio
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+import neo4j
+from neo4j import AsyncDriver, Record
+from neo4j.exceptions import CypherSyntaxError
+from neo4j_graphrag.exceptions import SearchValidationError, Text2CypherRetrievalError
+from neo4j_graphrag.generation.prompts import Text2CypherTemplate
+from neo4j_graphrag.retrievers import Text2CypherRetriever
+from neo4j_graphrag.retrievers.text2cypher import extract_cypher
+from neo4j_graphrag.schema import format_schema
+from neo4j_graphrag.types import RawSearchResult, Text2CypherSearchModel
+from pydantic import ValidationError
+
+from ..cache import CypherCache, ResultCache
+from ..metrics import NEO4J_RECORDS, NEO4J_SECONDS, SCHEMA_TOKENS_SAVED, record_llm_call
+from ..tracing import TRACER, Span
+from ..utils.tokens import estimate_tokens
+from .cypher_guard import CypherGuardrails, PlanSummary
+from .example_selector import ExampleSelector
+from .schema_pruner import SchemaPruner
+
+
+class StagedText2CypherRetriever(Text2CypherRetriever):
+    """Text2CypherRetriever with Cypher generation and execution exposed as separate sync and async stages"""
+
+    def __init__(
+        self,
+        *args,
+        async_driver: Optional[AsyncDriver] = None,
+        cypher_cache: Optional[CypherCache] = None,
+        result_cache: Optional[ResultCache] = None,
+        structured_schema: Optional[Dict[str, Any]] = None,
+        guardrails: Optional[CypherGuardrails] = None,
+        example_selector: Optional[ExampleSelector] = None,
+        schema_pruner: Optional[SchemaPruner] = None,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.async_driver = async_driver
+        self.cypher_cache = cypher_cache
+        self.result_cache = result_cache
+        self.structured_schema = structured_schema
+        self.guardrails = guardrails
+        self.example_selector = example_selector
+        self.schema_pruner = schema_pruner
+        self._schema_tokens: Tuple[Optional[str], int] = (None, 0)
+
+    def swap_schema(
+        self,
+        schema: str,
+        custom_prompt: str,
+        structured_schema: Optional[Dict[str, Any]],
+        schema_pruner: Optional[SchemaPruner] = None
+    ) -> None:
+        """Point later generations at a new schema; the rendered prompt is replaced in one assignment"""
+        self.structured_schema = structured_schema
+        self.schema_pruner = schema_pruner
+        self.neo4j_schema = schema
+        self.custom_prompt = custom_prompt
+
+    def build_prompt(self, query_text: str, prompt_params: Optional[Dict[str, Any]] = None) -> str:
+        """Render the Cypher generation prompt exactly as Text2CypherRetriever does"""
+        prompt_params = dict(prompt_params or {})
+        examples = prompt_params.pop("examples", None) or ("\n".join(self.examples) if self.examples else "")
+        schema = prompt_params.pop("schema", None) or self.neo4j_schema
+
+        return Text2CypherTemplate(template=self.custom_prompt).format(
+            schema=schema,
+            examples=examples,
+            query_text=query_text,
+            **prompt_params
+        )
+
+    def question_prompt_params(
+        self,
+        query_text: str,
+        prompt_params: Optional[Dict[str, Any]] = None,
+        query_vector: Optional[List[float]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Fill in the examples and schema picked for this question, embedding it once for both
+        unless the caller already has its `query_vector`"""
+        params = dict(prompt_params or {})
+        select_examples = self.example_selector is not None and not params.get("examples")
+        prune_schema = self.schema_pruner is not None and not params.get("schema")
+        if not (select_examples or prune_schema):
+            return prompt_params
+
+        with TRACER.span("prompt.select_context") as span:
+            vector = query_vector
+            if vector is None:
+                embedder = (self.example_selector or self.schema_pruner).embedder
+                vector = embedder.embed_query(query_text)
+            if select_examples:
+                params["examples"] = "\n".join(self.example_selector.select_by_vector(vector))
+            if prune_schema:
+                params["schema"] = self._pruned_schema(vector, span)
+        return params
+
+    def _pruned_schema(self, vector: List[float], span: Optional[Span]) -> str:
+        schema = format_schema(self.schema_pruner.prune(vector), is_enhanced=False)
+        full_tokens = self._full_schema_tokens()
+        pruned_tokens = estimate_tokens(schema)
+        saved = 1 - pruned_tokens / full_tokens if full_tokens else 0.0
+        SCHEMA_TOKENS_SAVED.observe(max(saved, 0.0))
+        if span is not None:
+            span.set(schema_tokens=pruned_tokens, full_schema_tokens=full_tokens)
+        print(f"✂️ [schema_pruner] Schema {full_tokens:,} -> {pruned_tokens:,} tokens ({saved:.0%} smaller)")
+        # Same brace escaping the full schema gets when it is baked into the prompt template
+        return schema.replace("{", "[").replace("}", "]")
+
+    def _full_schema_tokens(self) -> int:
+        schema, tokens = self._schema_tokens
+        if schema is not self.neo4j_schema:
+            schema = self.neo4j_schema
+            tokens = estimate_tokens(schema)
+            self._schema_tokens = (schema, tokens)
+        return tokens
+
+    def generate_cypher(
+        self,
+        query_text: str,
+        prompt_params: Optional[Dict[str, Any]] = None,
+        query_vector: Optional[List[float]] = None
+    ) -> str:
+        prompt_params = self.question_prompt_params(query_text, prompt_params, query_vector)
+        prompt = self.build_prompt(query_text, prompt_params)
+        with TRACER.span("llm.neo4j.generate_cypher") as span:
+            started = time.perf_counter()
+            try:
+                llm_result = self.llm.invoke(prompt)
+            except Exception:
+                self._record_generation(span, started, prompt, None, "error")
+                raise
+            self._record_generation(span, started, prompt, llm_result.content)
+        return extract_cypher(llm_result.content)
+
+    async def agenerate_cypher(
+        self,
+        query_text: str,
+        prompt_params: Optional[Dict[str, Any]] = None,
+        query_vector: Optional[List[float]] = None
+    ) -> str:
+        if self.example_selector is not None or self.schema_pruner is not None:
+            prompt_params = await asyncio.to_thread(self.question_prompt_params, query_text, prompt_params, query_vector)
+        prompt = self.build_prompt(query_text, prompt_params)
+        with TRACER.span("llm.neo4j.generate_cypher") as span:
+            started = time.perf_counter()
+            try:
+                llm_result = await self.llm.ainvoke(prompt)
+            except Exception:
+                self._record_generation(span, started, prompt, None, "error")
+                raise
+            self._record_generation(span, started, prompt, llm_result.content)
+        return extract_cypher(llm_result.content)
+
+    def _record_generation(self, span: Optional[Span], started: float, prompt: str, completion: Optional[str], outcome: str = "ok") -> None:
+        # Cypher generation calls the neo4j-graphrag LLM directly, so it is reported here under its role
+        prompt_tokens, completion_tokens = record_llm_call("cypher_generation", started, prompt, completion, outcome)
+        if span is not None:
+            span.set(outcome=outcome, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def execute_cypher(self, cypher: str) -> List[Record]:
+        return self._run_cypher(cypher)[0]
+
+    async def aexecute_cypher(self, cypher: str) -> List[Record]:
+        return (await self._arun_cypher(cypher))[0]
+
+    def prepare_cypher(self, cypher: str) -> str:
+        """Apply the guardrail rewrite (auto-LIMIT) to generated Cypher before it runs"""
+        if self.guardrails is None:
+            return cypher
+        guarded = self.guardrails.rewrite(cypher)
+        if guarded != cypher:
+            print(f"🛡️ [cypher_guard] Added LIMIT {self.guardrails.auto_limit} to unbounded query")
+        return guarded
+
+    def _run_cypher(self, cypher: str) -> Tuple[List[Record], bool, Optional[PlanSummary]]:
+        """Records, whether the row cap cut them short, and the guardrail EXPLAIN summary if one ran"""
+        with TRACER.span("neo4j.execute") as span:
+            epoch = None
+            if self.result_cache is not None:
+                epoch = self.result_cache.validate()
+                cached = self.result_cache.get(cypher)
+                if cached is not None:
+                    print(f"⚡ [result_cache] Serving cached results for graph epoch {epoch}")
+                    truncated = self._cached_truncation(cached)
+                    self._record_execution(span, cached, result_cache_hit=True, truncated=truncated)
+                    return cached, truncated, None
+
+            started = time.perf_counter()
+            plan = None
+            if self.guardrails is not None:
+                plan = self.guardrails.check_plan(self.driver, self.neo4j_database, cypher)
+                records, truncated = self.guardrails.execute(self.driver, self.neo4j_database, cypher)
+            else:
+                records, _, _ = self.driver.execute_query(
+                    query_=cypher,
+                    database_=self.neo4j_database,
+                    routing_=neo4j.RoutingControl.READ
+                )
+                truncated = False
+            NEO4J_SECONDS.observe(time.perf_counter() - started)
+
+            if self.result_cache is not None:
+                self.result_cache.put(cypher, None, records, epoch)
+            self._record_execution(span, records, result_cache_hit=False, truncated=truncated)
+            return records, truncated, plan
+
+    async def _arun_cypher(self, cypher: str) -> Tuple[List[Record], bool, Optional[PlanSummary]]:
+        if self.async_driver is None:
+            # No async driver configured, keep the event loop free by running the sync driver in a thread
+            return await asyncio.to_thread(self._run_cypher, cypher)
+
+        with TRACER.span("neo4j.execute") as span:
+            epoch = None
+            if self.result_cache is not None:
+                epoch = await self.result_cache.avalidate()
+                cached = self.result_cache.get(cypher)
+                if cached is not None:
+                    print(f"⚡ [result_cache] Serving cached results for graph epoch {epoch}")
+                    truncated = self._cached_truncation(cached)
+                    self._record_execution(span, cached, result_cache_hit=True, truncated=truncated)
+                    return cached, truncated, None
+
+            started = time.perf_counter()
+            plan = None
+            if self.guardrails is not None:
+                plan = await self.guardrails.acheck_plan(self.async_driver, self.neo4j_database, cypher)
+                records, truncated = await self.guardrails.aexecute(self.async_driver, self.neo4j_database, cypher)
+            else:
+                records, _, _ = await self.async_driver.execute_query(
+                    query_=cypher,
+                    database_=self.neo4j_database,
+                    routing_=neo4j.RoutingControl.READ
+                )
+                truncated = False
+            NEO4J_SECONDS.observe(time.perf_counter() - started)
+
+            if self.result_cache is not None:
+                self.result_cache.put(cypher, None, records, epoch)
+            self._record_execution(span, records, result_cache_hit=False, truncated=truncated)
+            return records, truncated, plan
+
+    def _cached_truncation(self, records: List[Record]) -> bool:
+        # The cache keeps rows only; a result that filled the row cap was cut short when it ran
+        max_rows = self.guardrails.max_rows if self.guardrails is not None else None
+        return max_rows is not None and len(records) >= max_rows
+
+    @staticmethod
+    def _record_execution(span: Optional[Span], records: List[Record], result_cache_hit: bool, truncated: bool = False) -> None:
+        if truncated:
+            print(f"✂️ [cypher_guard] Stopped reading after {len(records)} rows")
+        if span is not None:
+            span.set(records=len(records), result_cache_hit=result_cache_hit, truncated=truncated)
+
+    def get_search_results(
+        self,
+        query_text: str,
+        prompt_params: Optional[Dict[str, Any]] = None,
+        query_vector: Optional[List[float]] = None
+    ) -> RawSearchResult:
+        """Generate (or reuse) Cypher for the question and run it; `query_vector` is the question's
+        embedding if the caller already has one"""
+        query_text = self._validate_query_text(query_text)
+        cypher = self._cached_cypher(query_text, prompt_params)
+        cache_hit = cypher is not None
+        try:
+            if not cache_hit:
+                cypher = self.generate_cypher(query_text, prompt_params, query_vector)
+            executed = self.prepare_cypher(cypher)
+            records, truncated, plan = self._run_cypher(executed)
+        except Exception as e:
+            self._handle_execution_error(query_text, cache_hit, e)
+            raise
+
+        self._remember_cypher(query_text, prompt_params, cypher, cache_hit)
+        NEO4J_RECORDS.observe(len(records))
+        return RawSearchResult(
+            records=records,
+            metadata={"cypher": executed, "cypher_cache_hit": cache_hit, "truncated": truncated, "plan": plan}
+        )
+
+    async def aget_search_results(
+        self,
+        query_text: str,
+        prompt_params: Optional[Dict[str, Any]] = None,
+        query_vector: Optional[List[float]] = None
+    ) -> RawSearchResult:
+        query_text = self._validate_query_text(query_text)
+        cypher = self._cached_cypher(query_text, prompt_params)
+        cache_hit = cypher is not None
+        try:
+            if not cache_hit:
+                cypher = await self.agenerate_cypher(query_text, prompt_params, query_vector)
+            executed = self.prepare_cypher(cypher)
+            records, truncated, plan = await self._arun_cypher(executed)
+        except Exception as e:
+            self._handle_execution_error(query_text, cache_hit, e)
+            raise
+
+        self._remember_cypher(query_text, prompt_params, cypher, cache_hit)
+        NEO4J_RECORDS.observe(len(records))
+        return RawSearchResult(
+            records=records,
+            metadata={"cypher": executed, "cypher_cache_hit": cache_hit, "truncated": truncated, "plan": plan}
+        )
+
+    def _cached_cypher(self, query_text: str, prompt_params: Optional[Dict[str, Any]]) -> Optional[str]:
+        # Callers overriding the prompt get a fresh generation, the cache key only covers question and schema
+        if self.cypher_cache is None or prompt_params:
+            return None
+        cypher = self.cypher_cache.get(query_text, self.neo4j_schema)
+        if cypher is not None:
+            print(f"⚡ [cypher_cache] Reusing generated Cypher for: {query_text}")
+        return cypher
+
+    def _remember_cypher(self, query_text: str, prompt_params: Optional[Dict[str, Any]], cypher: str, cache_hit: bool) -> None:
+        if self.cypher_cache is not None and not prompt_params and not cache_hit:
+            self.cypher_cache.put(query_text, self.neo4j_schema, cypher)
+
+    def _handle_execution_error(self, query_text: str, cache_hit: bool, error: Exception) -> None:
+        # A cached query that no longer runs must not be served again
+        if cache_hit:
+            self.cypher_cache.discard(query_text, self.neo4j_schema)
+        if isinstance(error, CypherSyntaxError):
+            raise Text2CypherRetrievalError(f"Failed to get search result: {error.message}") from error
+
+    @staticmethod
+    def _validate_query_text(query_text: str) -> str:
+        try:
+            return Text2CypherSearchModel(query_text=query_text).query_text
+        except ValidationError as e:
+            raise SearchValidationError(e.errors()) from e
@@ -2,9 +2,10 @@ import json
 from typing import Optional, Dict, Any
 from neo4j import Driver
 
-from neo4j_graphrag.schema import get_schema
+from neo4j_graphrag.schema import format_schema, get_structured_schema
 from neo4j_graphrag.indexes import retrieve_fulltext_index_info
 
+from ..cache import SchemaCache, without_graph_meta
 from ..llm import BaseLLMAdapter
 from ..pydantictypes import RoutingDecision
 
@@ -15,13 +16,20 @@ class RetrieverRouter:
         llm: BaseLLMAdapter,
         driver: Driver,
         database: str,
-        fulltext_index_config: Optional[Dict[str, Any]] = None
+        fulltext_index_config: Optional[Dict[str, Any]] = None,
+        schema_cache: Optional[SchemaCache] = None
     ):
         self.llm = llm
         self.driver = driver
         self.database = database
 
-        self.neo4j_schema = get_schema(driver, is_enhanced=True, database=self.database)
+        # The enhanced schema samples property values; an enhanced SchemaCache keeps it across restarts
+        if schema_cache is not None:
+            self.neo4j_schema = schema_cache.get().schema
+            schema_cache.subscribe(lambda snapshot: setattr(self, "neo4j_schema", snapshot.schema))
+        else:
+            structured_schema = get_structured_schema(driver, is_enhanced=True, database=self.database)
+            self.neo4j_schema = format_schema(without_graph_meta(structured_schema), is_enhanced=True)
         self.vector_index_infos = self._list_vector_indexes()
 
         self.fulltext_index_info = (
@@ -0,0 +1 @@
+from .session_store import SessionStore, InMemorySessionStore, RedisSessionStore
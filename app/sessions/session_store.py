@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from ..pydantictypes import MultiTurnState
+
+
+class SessionStore(ABC):
+    """Keeps the latest state of each conversation server-side so /clarify only needs a session id"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[MultiTurnState]:
+        """Return the session's latest state, or None if it is unknown or expired"""
+        pass
+
+    @abstractmethod
+    def put(self, session_id: str, state: MultiTurnState) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        pass
+
+    def create(self, state: MultiTurnState) -> str:
+        session_id = uuid.uuid4().hex
+        self.put(session_id, state)
+        return session_id
+
+    async def aget(self, session_id: str) -> Optional[MultiTurnState]:
+        """Async variant of get; backends without native async support run get in a worker thread"""
+        return await asyncio.to_thread(self.get, session_id)
+
+    async def aput(self, session_id: str, state: MultiTurnState) -> None:
+        await asyncio.to_thread(self.put, session_id, state)
+
+    async def acreate(self, state: MultiTurnState) -> str:
+        session_id = uuid.uuid4().hex
+        await self.aput(session_id, state)
+        return session_id
+
+    @staticmethod
+    def _compact(state: MultiTurnState) -> MultiTurnState:
+        # Retrieved records are only needed for the answer already sent, not to continue the conversation
+        return state.model_copy(update={"results": None}, deep=True)
+
+
+class InMemorySessionStore(SessionStore):
+    """Bounded per-process store; sessions expire `ttl_seconds` after their last use and the least
+    recently used session is evicted once `max_sessions` is reached"""
+
+    def __init__(self, max_sessions: int = 10_000, ttl_seconds: Optional[float] = 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Tuple[float, MultiTurnState]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[MultiTurnState]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if self.ttl_seconds is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._sessions[session_id]
+                return None
+            self._sessions[session_id] = (time.monotonic(), entry[1])
+            self._sessions.move_to_end(session_id)
+            return entry[1].model_copy(deep=True)
+
+    def put(self, session_id: str, state: MultiTurnState) -> None:
+        state = self._compact(state)
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+            self._sessions[session_id] = (time.monotonic(), state)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    # Everything is in memory, so the async variants never need a thread
+    async def aget(self, session_id: str) -> Optional[MultiTurnState]:
+        return self.get(session_id)
+
+    async def aput(self, session_id: str, state: MultiTurnState) -> None:
+        self.put(session_id, state)
+
+
+class RedisSessionStore(SessionStore):
+    """Store shared by every worker; Redis expires sessions after `ttl_seconds` without use and its
+    maxmemory policy handles eviction. Requires the `redis` package."""
+
+    def __init__(self, url: str, ttl_seconds: int = 3600, prefix: str = "genai:session:"):
+        try:
+            import redis
+            import redis.asyncio as aioredis
+        except ImportError as e:
+            raise ImportError("RedisSessionStore requires the redis package: poetry install --extras redis") from e
+
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self.async_client = aioredis.Redis.from_url(url)
+
+    def get(self, session_id: str) -> Optional[MultiTurnState]:
+        payload = self.client.getex(self._key(session_id), ex=self.ttl_seconds)
+        return MultiTurnState.model_validate_json(payload) if payload else None
+
+    def put(self, session_id: str, state: MultiTurnState) -> None:
+        self.client.set(self._key(session_id), self._compact(state).model_dump_json(), ex=self.ttl_seconds)
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self._key(session_id))
+
+    async def aget(self, session_id: str) -> Optional[MultiTurnState]:
+        payload = await self.async_client.getex(self._key(session_id), ex=self.ttl_seconds)
+        return MultiTurnState.model_validate_json(payload) if payload else None
+
+    async def aput(self, session_id: str, state: MultiTurnState) -> None:
+        await self.async_client.set(self._key(session_id), self._compact(state).model_dump_json(), ex=self.ttl_seconds)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
@@ -0,0 +1 @@
+from .warmup import Readiness, warm_step
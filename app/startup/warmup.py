@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+
+class Readiness:
+    """Status of each background warmup step, reported by the readiness probe"""
+
+    def __init__(self, steps: Iterable[str]):
+        self._lock = threading.Lock()
+        self._steps: Dict[str, Dict[str, Any]] = {step: {"status": "pending"} for step in steps}
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return all(step["status"] == "ok" for step in self._steps.values())
+
+    def running(self, step: str, attempt: int) -> None:
+        with self._lock:
+            self._steps[step].update(status="running", attempt=attempt)
+
+    def ok(self, step: str, seconds: float) -> None:
+        with self._lock:
+            self._steps[step] = {"status": "ok", "seconds": round(seconds, 3)}
+
+    def failed(self, step: str, error: Exception) -> None:
+        with self._lock:
+            self._steps[step].update(status="failed", error=f"{type(error).__name__}: {error}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = {name: dict(step) for name, step in self._steps.items()}
+        return {"ready": all(step["status"] == "ok" for step in steps.values()), "steps": steps}
+
+
+async def warm_step(
+    readiness: Readiness,
+    step: str,
+    func: Callable[[], Awaitable[Any]],
+    retry_seconds: float = 1.0,
+    max_retry_seconds: float = 30.0
+) -> Any:
+    """Run one warmup step until it succeeds, backing off between attempts"""
+    attempt = 0
+    delay = retry_seconds
+    while True:
+        attempt += 1
+        readiness.running(step, attempt)
+        started = time.perf_counter()
+        try:
+            result = await func()
+        except Exception as e:
+            readiness.failed(step, e)
+            print(f"⚠️ [warmup] {step} failed (attempt {attempt}), retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_retry_seconds)
+            continue
+
+        elapsed = time.perf_counter() - started
+        readiness.ok(step, elapsed)
+        print(f"✅ [warmup] {step} ready in {elapsed:.2f}s")
+        return result
@@ -0,0 +1,2 @@
+from .tracer import TRACER, Tracer, Trace, Span
+from .exporters import JsonlSpanExporter, OtlpSpanExporter
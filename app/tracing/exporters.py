@@ -0,0 +1,110 @@
+import json
+import queue
+import threading
+from typing import List, Optional
+
+from .tracer import Span, Trace
+
+
+class JsonlSpanExporter:
+    """Appends every finished span as one JSON line to a local file.
+
+    `export` only queues the trace. A background thread serializes whatever has queued up and appends
+    it in one write, so a request never waits on the disk. When `max_queue` traces are waiting, new
+    ones are dropped rather than blocking. `shutdown` writes what is left.
+    """
+
+    def __init__(self, path: str, max_queue: int = 10_000):
+        self.path = path
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=max_queue)
+        self._writer = threading.Thread(target=self._write_loop, name="jsonl-span-exporter", daemon=True)
+        self._writer.start()
+
+    def export(self, trace: Trace) -> None:
+        try:
+            # Spans are serialized later, so queue the ones finished by now
+            self._queue.put_nowait(list(trace.spans))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                print(f"⚠️ [tracing] Span writer is behind, dropped {self.dropped} traces so far")
+
+    def flush(self) -> None:
+        """Block until every trace queued so far is written"""
+        self._queue.join()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+    def _write_loop(self) -> None:
+        while True:
+            batch: List[Optional[List[Span]]] = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = "".join(
+                json.dumps(span.to_dict(), default=str) + "\n"
+                for spans in batch if spans is not None
+                for span in spans
+            )
+            try:
+                if lines:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(lines)
+            except OSError as e:
+                print(f"⚠️ [tracing] Could not write spans to {self.path}: {e}")
+            for _ in batch:
+                self._queue.task_done()
+            if None in batch:
+                return
+
+
+class OtlpSpanExporter:
+    """Replays finished traces into OpenTelemetry so an OTLP collector receives them.
+
+    Requires opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http; spans are batched and sent
+    from the SDK's background thread.
+    """
+
+    def __init__(self, endpoint: Optional[str] = None, service_name: str = "cbre-neo4j-genai"):
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            from opentelemetry import trace as otel_trace
+        except ImportError as e:
+            raise ImportError(
+                "OtlpSpanExporter requires opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http"
+            ) from e
+
+        self._otel_trace = otel_trace
+        self.provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        self.provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint) if endpoint else OTLPSpanExporter()))
+        self.tracer = self.provider.get_tracer("app.tracing")
+
+    def export(self, trace: Trace) -> None:
+        otel_spans = {}
+        # Parents start before their children, so they exist by the time a child needs its context
+        for span in sorted(trace.spans, key=lambda s: s.start_ns):
+            parent = otel_spans.get(span.parent_id)
+            context = self._otel_trace.set_span_in_context(parent) if parent is not None else None
+            otel_span = self.tracer.start_span(
+                span.name,
+                context=context,
+                start_time=span.start_ns,
+                attributes={k: v if isinstance(v, (str, bool, int, float)) else str(v) for k, v in span.attributes.items()}
+            )
+            if span.status == "error":
+                otel_span.set_status(self._otel_trace.Status(self._otel_trace.StatusCode.ERROR))
+            otel_spans[span.span_id] = otel_span
+
+        for span in trace.spans:
+            otel_spans[span.span_id].end(end_time=span.end_ns)
+
+    def shutdown(self) -> None:
+        self.provider.shutdown()
@@ -0,0 +1,197 @@
+import contextvars
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("agent_trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("agent_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class Trace:
+    """All spans recorded while handling one request; spans may finish on any thread or task"""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self._lock = threading.Lock()
+        self.spans: List[Span] = []
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def waterfall(self) -> List[Dict[str, Any]]:
+        """Spans ordered by start time, with offsets from the start of the trace and nesting depth"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        if not spans:
+            return []
+
+        origin = spans[0].start_ns
+        depth: Dict[str, int] = {}
+        rows = []
+        for span in spans:
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1 if span.parent_id else 0
+            rows.append({
+                "name": span.name,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "depth": depth[span.span_id],
+                "start_ms": round((span.start_ns - origin) / 1e6, 3),
+                "duration_ms": round(span.duration_ms, 3),
+                "status": span.status,
+                "attributes": span.attributes
+            })
+        return rows
+
+
+class Tracer:
+    """Request-scoped tracing built on contextvars.
+
+    The active trace and span follow asyncio tasks automatically; work handed to a thread pool keeps
+    them when it is submitted through `wrap` (LangGraph's own executors already copy the context).
+    Outside a trace every `span` call is a no-op, so tracing costs nothing unless an exporter is
+    configured or a request asks for its timing.
+    """
+
+    def __init__(self):
+        self.exporters: List[Any] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def add_exporter(self, exporter: Any) -> None:
+        self.exporters.append(exporter)
+
+    def shutdown(self) -> None:
+        """Let exporters that write in the background send what they still hold"""
+        for exporter in self.exporters:
+            if hasattr(exporter, "shutdown"):
+                exporter.shutdown()
+
+    @contextmanager
+    def trace(self, name: str, force: bool = False, **attributes: Any) -> Iterator[Optional[Trace]]:
+        """Start a trace for one request, or a child span when a trace is already running"""
+        current = _current_trace.get()
+        if current is not None:
+            with self.span(name, **attributes):
+                yield current
+            return
+        if not (force or self.enabled):
+            yield None
+            return
+
+        trace = Trace(name)
+        token = _current_trace.set(trace)
+        try:
+            with self.span(name, **attributes):
+                yield trace
+        finally:
+            _current_trace.reset(token)
+            self._export(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        trace = _current_trace.get()
+        span = self.begin(name, **attributes)
+        if span is None:
+            yield None
+            return
+
+        token = _current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            self.finish(span, trace, error)
+
+    def begin(self, name: str, **attributes: Any) -> Optional[Span]:
+        """Open a span without making it current, for work that cannot hold the context (async generators)"""
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        parent = _current_span.get()
+        return Span(
+            name=name,
+            trace_id=trace.trace_id,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start_ns=time.time_ns(),
+            attributes=attributes
+        )
+
+    def finish(self, span: Optional[Span], trace: Optional[Trace] = None, error: Optional[BaseException] = None) -> None:
+        if span is None:
+            return
+        if error is not None:
+            span.status = "error"
+            span.attributes["error"] = f"{type(error).__name__}: {error}"
+        span.end_ns = time.time_ns()
+        (trace or _current_trace.get()).add(span)
+
+    @staticmethod
+    def wrap(func: Callable) -> Callable:
+        """Bind `func` to the current trace context, for handing it to a thread pool"""
+        if _current_trace.get() is None:
+            return func
+        return _bind(contextvars.copy_context(), func)
+
+    @staticmethod
+    def current_trace() -> Optional[Trace]:
+        return _current_trace.get()
+
+    def _export(self, trace: Trace) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(trace)
+            except Exception as e:
+                print(f"⚠️ [tracing] {type(exporter).__name__} failed to export trace {trace.trace_id}: {e}")
+
+
+def _bind(context: contextvars.Context, func: Callable) -> Callable:
+    def run(*args, **kwargs):
+        return context.run(func, *args, **kwargs)
+    return run
+
+
+TRACER = Tracer()
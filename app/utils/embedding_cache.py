@@ -0,0 +1,55 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from neo4j_graphrag.embeddings.base import Embedder
+
+
+def embed_texts(
+    texts: List[str],
+    embedder: Embedder,
+    cache_dir: Optional[str] = None,
+    name: str = "texts",
+    max_workers: int = 8
+) -> np.ndarray:
+    """Embed `texts` into a row-normalized float32 matrix, reusing `cache_dir/<name>-<hash>.npy` when present.
+
+    The hash covers the texts and the embedding model, so any change to either re-embeds.
+    """
+    path = None
+    if cache_dir:
+        model = getattr(embedder, "model", None) or type(embedder).__name__
+        digest = hashlib.sha256("\x00".join([str(model), *texts]).encode("utf-8")).hexdigest()[:16]
+        path = os.path.join(cache_dir, f"{name}-{digest}.npy")
+        if os.path.exists(path):
+            matrix = np.load(path)
+            if matrix.shape[0] == len(texts):
+                print(f"⚡ [embedding_cache] Loaded {len(texts)} {name} embeddings from {path}")
+                return matrix
+
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        vectors = list(pool.map(embedder.embed_query, texts))
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1.0, norms)
+    print(f"🧮 [embedding_cache] Embedded {len(texts)} {name}")
+
+    if path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, matrix)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ [embedding_cache] Could not write {path}: {e}")
+    return matrix
+
+
+def normalize(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
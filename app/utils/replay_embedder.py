@@ -0,0 +1,64 @@
+import base64
+import hashlib
+import time
+from typing import Optional
+
+import numpy as np
+from neo4j_graphrag.embeddings.base import Embedder
+
+from ..cache.llm_recording import LLMRecording
+from ..llm.replay_adapter import ReplayMissError
+
+
+class RecordReplayEmbedder(Embedder):
+    """Embedder counterpart of RecordReplayLLMAdapter.
+
+    "record" embeds with `embedder` and saves the vectors, "replay" returns the recorded ones and
+    "fake" returns a unit vector seeded from the text, so equal texts always match. Replay waits
+    `latency` seconds, or the recorded time when `latency` is None; fake waits `latency` or nothing.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        recording: Optional[LLMRecording] = None,
+        embedder: Optional[Embedder] = None,
+        latency: Optional[float] = None,
+        dimensions: int = 1536
+    ):
+        if mode not in ("record", "replay", "fake"):
+            raise ValueError(f"Unknown embedding mode '{mode}'; expected record, replay or fake")
+        if mode == "record" and embedder is None:
+            raise ValueError("Recording needs the embedder to record")
+        self.mode = mode
+        self.recording = recording if recording is not None or mode == "fake" else LLMRecording()
+        self.embedder = embedder
+        self.latency = latency
+        self.dimensions = dimensions
+        # The embedding cache keys its files by model, so recorded and fake vectors never mix
+        self.model = f"{mode}:{getattr(embedder, 'model', None) or dimensions}"
+
+    def embed_query(self, text: str) -> list[float]:
+        if self.mode == "record":
+            started = time.monotonic()
+            vector = self.embedder.embed_query(text)
+            # float32 in base64 is about a third of the size of the JSON numbers
+            encoded = base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+            self.recording.put("embedding", text, encoded, time.monotonic() - started)
+            return vector
+
+        if self.mode == "fake":
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dimensions)
+            seconds = self.latency or 0.0
+            result = (vector / np.linalg.norm(vector)).tolist()
+        else:
+            entry = self.recording.get("embedding", text)
+            if entry is None:
+                raise ReplayMissError(f"No recorded embedding for text: {text.strip()[:80]!r}")
+            seconds = entry["s"] if self.latency is None else self.latency
+            result = np.frombuffer(base64.b64decode(entry["r"]), dtype=np.float32).tolist()
+
+        if seconds:
+            time.sleep(seconds)
+        return result
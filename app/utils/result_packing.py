@@ -0,0 +1,83 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from neo4j_graphrag.types import RetrieverResultItem
+
+from .tokens import count_tokens
+
+TOP_K_VALUES = 5
+
+
+def pack_records(
+    records: Sequence[RetrieverResultItem],
+    token_budget: Optional[int],
+    model: Optional[str] = None
+) -> str:
+    """Join record contents for a prompt without exceeding `token_budget` tokens.
+
+    Results that fit are returned exactly as before, one record per line. Larger results are cut
+    to the leading rows that fit, preceded by aggregates over every row (row count, min/max/mean
+    of numeric columns, most common values of the others), so the prompt size stays flat however
+    many rows the query returned. Counting stops at the budget, so the cost does not grow with
+    the result either.
+    """
+    if token_budget is None:
+        return "\n".join(r.content for r in records)
+
+    used = 0
+    for fit, record in enumerate(records):
+        used += count_tokens(record.content, model) + 1
+        if used > token_budget:
+            break
+    else:
+        return "\n".join(r.content for r in records)
+
+    aggregates = summarize_records(records)
+    remaining = token_budget - count_tokens(_header(len(records), len(records)) + "\n" + aggregates, model) - 1
+    rows: List[str] = []
+    for record in records[:fit]:
+        cost = count_tokens(record.content, model) + 1
+        if cost > remaining:
+            break
+        rows.append(record.content)
+        remaining -= cost
+
+    print(f"✂️ [pack_records] Packed {len(rows)} of {len(records)} records into a {token_budget} token budget")
+    return "\n".join([_header(len(rows), len(records)), aggregates] + rows)
+
+
+def summarize_records(records: Sequence[RetrieverResultItem]) -> str:
+    """Compact aggregates over all records, computed locally: min/max/mean of numeric columns, top values of the rest"""
+    frame = pd.DataFrame.from_records([r.metadata or {} for r in records])
+    lines = []
+
+    for column in frame.columns:
+        values = frame[column].dropna()
+        if values.empty:
+            continue
+
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            array = values.to_numpy(dtype=np.float64)
+            lines.append(f"- {column}: min {_number(array.min())}, max {_number(array.max())}, mean {_number(array.mean())}")
+            continue
+
+        # Nested values (nodes, lists, maps) are counted by their text form
+        if not isinstance(values.iloc[0], (str, bool)):
+            values = values.map(str)
+        counts = values.value_counts()
+        if len(counts) == len(values):
+            lines.append(f"- {column}: {len(counts)} distinct values")
+        else:
+            top = ", ".join(f"{value} ({count})" for value, count in counts.head(TOP_K_VALUES).items())
+            lines.append(f"- {column}: {top} ({len(counts)} distinct)")
+
+    return "\n".join(lines)
+
+
+def _header(shown: int, total: int) -> str:
+    return f"[Showing {shown} of {total} rows. Aggregates over all {total} rows:]"
+
+
+def _number(value: float) -> str:
+    return f"{value:.6g}"
@@ -0,0 +1,79 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
+
+DEFAULT_ENCODING = "o200k_base"
+
+_lock = threading.Lock()
+_unavailable = set()
+
+
+@lru_cache(maxsize=16)
+def _encoding_name(model: Optional[str]) -> str:
+    if not model:
+        return DEFAULT_ENCODING
+    try:
+        import tiktoken
+        return tiktoken.encoding_name_for_model(model)
+    except Exception:
+        return DEFAULT_ENCODING
+
+
+def _encoding(model: Optional[str]):
+    name = _encoding_name(model)
+    if name in _unavailable:
+        return None
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        # tiktoken downloads encodings on first use; without it, fall back to the character estimate for good
+        with _lock:
+            if name not in _unavailable:
+                print(f"⚠️ [tokens] tiktoken encoding {name} unavailable, estimating tokens from characters: {e}")
+                _unavailable.add(name)
+        return None
+
+
+def count_tokens(text: Optional[str], model: Optional[str] = None) -> int:
+    """Number of tokens `text` uses for `model`; roughly four characters per token when tiktoken is unavailable"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode_ordinary(text))
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Roughly four characters per token; for metrics and rate limiting, where tokenizing would cost more than it is worth"""
+    return (len(text) + 3) // 4 if text else 0
+
+
+# Token usage the provider reported for the call in progress, filled in by the adapter that made it
+_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def capture_usage() -> Iterator[Dict[str, int]]:
+    """Collect the usage an adapter reports with report_usage; empty if it reported none.
+
+    The holder is shared by reference, so usage reported from tasks started inside still arrives.
+    """
+    holder: Dict[str, int] = {}
+    token = _usage.set(holder)
+    try:
+        yield holder
+    finally:
+        _usage.reset(token)
+
+
+def report_usage(message: Any) -> None:
+    """Pass on the `usage_metadata` of a LangChain message to the enclosing capture_usage, if any"""
+    holder = _usage.get()
+    usage = getattr(message, "usage_metadata", None)
+    if holder is not None and usage:
+        holder["prompt"] = usage.get("input_tokens", 0)
+        holder["completion"] = usage.get("output_tokens", 0)
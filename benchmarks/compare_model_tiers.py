@@ -0,0 +1,150 @@
+"""Compare LLM latency per role across model tier configurations.
+
+Each configuration is a JSON file mapping roles to model specs, for example `tiered.json`:
+
+    {"evaluation": "ollama/llama3.1:8b", "routing": "ollama/llama3.1:8b", "summarization": "gpt-4o-mini"}
+
+Roles left out use MODEL_NAME. A run with no role overrides is always included as the baseline.
+
+    python -m benchmarks.compare_model_tiers tiered.json --questions 20 --json tiers.json
+
+Every question from query_examples.yml is answered by the full agent (and routed by RetrieverRouter) once per
+configuration. The LLM spans of each run are grouped by role. Neo4j, OpenAI and any Ollama models in the
+configurations must be reachable; connection settings come from .env like the API.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import yaml
+from dotenv import load_dotenv
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from neo4j_graphrag.embeddings import OpenAIEmbeddings
+
+from app.agentservice import AgentService
+from app.llm import ROLES, LLMRegistry, ModelConfig
+from app.routers import RetrieverRouter
+from app.tracing import TRACER, Trace
+
+
+def load_configs(paths: List[str], temperature: float) -> Dict[str, Dict[str, ModelConfig]]:
+    configs = {"baseline": {}}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            specs = json.load(f)
+        name = os.path.splitext(os.path.basename(path))[0]
+        configs[name] = {role: ModelConfig.parse(spec, temperature) for role, spec in specs.items()}
+    return configs
+
+
+def load_questions(path: str, limit: int) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        examples = yaml.safe_load(f).get("query_examples", [])
+    return [example["input"] for example in examples if example.get("input")][:limit]
+
+
+def role_of(span_name: str) -> Optional[str]:
+    # Adapter spans are "llm.<role>.ask" / "llm.<role>.stream"; the retriever calls its LLM directly
+    if span_name == "llm.neo4j.generate_cypher":
+        return "cypher_generation"
+    parts = span_name.split(".")
+    if len(parts) == 3 and parts[0] == "llm" and parts[1] in ROLES:
+        return parts[1]
+    return None
+
+
+def collect(trace: Optional[Trace], latencies: Dict[str, List[float]]) -> None:
+    for span in trace.spans if trace else []:
+        role = role_of(span.name)
+        if role is not None:
+            latencies.setdefault(role, []).append(span.duration_ms)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "calls": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 1),
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1)
+    }
+
+
+async def run_config(name: str, roles: Dict[str, ModelConfig], questions: List[str], drivers, embedder) -> Dict[str, Dict[str, float]]:
+    driver, async_driver, database = drivers
+    registry = LLMRegistry(
+        model_name=os.getenv("MODEL_NAME", "gpt-4o"),
+        temperature=float(os.getenv("TEMPERATURE", 0.0)),
+        roles=roles
+    )
+    # No caches and no static validation, so every question pays for every role
+    service = AgentService(
+        llm_registry=registry,
+        driver=driver,
+        async_driver=async_driver,
+        database=database,
+        embedder=embedder,
+        static_validation=False
+    )
+    try:
+        router = RetrieverRouter(registry.get_adapter("routing"), driver, database)
+    except Exception as e:
+        print(f"⚠️ [{name}] Routing is not measured, the router could not be built: {e}")
+        router = None
+
+    latencies: Dict[str, List[float]] = {}
+    for question in questions:
+        started = time.perf_counter()
+        with TRACER.trace("benchmark.question", force=True) as trace:
+            await service.arun(question)
+            if router is not None:
+                await asyncio.to_thread(TRACER.wrap(router.decide), question)
+        latencies.setdefault("end_to_end", []).append((time.perf_counter() - started) * 1000)
+        collect(trace, latencies)
+    service.llm_executor.shutdown(wait=False)
+
+    report = {role: summarize(samples) for role, samples in latencies.items()}
+    print(f"\n📊 {name}")
+    print(f"{'role':<20}{'calls':>7}{'mean ms':>11}{'p50 ms':>11}{'p95 ms':>11}")
+    for role in (*ROLES, "end_to_end"):
+        if role in report:
+            row = report[role]
+            print(f"{role:<20}{row['calls']:>7}{row['mean_ms']:>11}{row['p50_ms']:>11}{row['p95_ms']:>11}")
+    return report
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("configs", nargs="*", help="JSON files mapping roles to model specs")
+    parser.add_argument("--questions", type=int, default=10, help="How many query_examples.yml inputs to ask")
+    parser.add_argument("--examples", default="query_examples.yml")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    load_dotenv()
+    configs = load_configs(args.configs, float(os.getenv("TEMPERATURE", 0.0)))
+    questions = load_questions(args.examples, args.questions)
+    auth = (os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD"))
+    driver = GraphDatabase.driver(os.getenv("NEO4J_URI"), auth=auth)
+    async_driver = AsyncGraphDatabase.driver(os.getenv("NEO4J_URI"), auth=auth)
+    embedder = OpenAIEmbeddings(model=os.getenv("TEXT_EMBEDDING_MODEL"))
+
+    try:
+        reports = {}
+        for name, roles in configs.items():
+            reports[name] = await run_config(name, roles, questions, (driver, async_driver, os.getenv("NEO4J_DATABASE")), embedder)
+    finally:
+        await async_driver.close()
+        driver.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
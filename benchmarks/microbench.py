@@ -0,0 +1,367 @@
+"""Microbenchmarks for the agent nodes and the ETL's hot functions, with stored baselines.
+
+    python -m benchmarks.microbench                    # run every benchmark and print the timings
+    python -m benchmarks.microbench -k format          # only benchmarks whose name contains "format"
+    python -m benchmarks.microbench --save             # also store the timings as the baseline
+    python -m benchmarks.microbench --compare          # exit 1 if a benchmark is >20% slower than the baseline
+
+Benchmarks with a latency target also exit 1 when their median misses it, baseline or not.
+
+Everything runs offline: LLM calls go to the fake-mode LLMRegistry and Neo4j is a stub driver, so
+only our own code is timed. Timings depend on the machine, so baselines live under .cache/ and are
+not committed; save one on the machine that will compare against it. Comparisons use the fastest
+round by default, which moves least when other work shares the machine.
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from neo4j import Record
+from neo4j_graphrag.types import RetrieverResultItem
+
+from app.agentservice import AgentService
+from app.cache import SemanticCache
+from app.llm import LLMRegistry
+from app.pydantictypes import MultiTurnState, Text2CypherRetrieverOutput
+from app.retrievers.text2cypher_builder import Text2CypherRetrieverBuilder
+from app.utils.query_examples import load_query_examples
+from graph_build.graphrag_graph_extractor import GraphRAGExtractor
+from graph_build.structured_graph_build import REQUIRED_KEYS, Neo4jWriter, parse_sg_string
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, ".cache", "benchmarks", "microbench.json")
+
+# name -> setup; a setup builds its inputs once and returns the call that is timed
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+# name -> the most seconds per call a benchmark's median may take
+TARGETS: Dict[str, float] = {}
+
+
+def benchmark(setup: Callable[[], Callable[[], Any]]) -> Callable[[], Callable[[], Any]]:
+    BENCHMARKS[setup.__name__] = setup
+    return setup
+
+
+def target(seconds: float) -> Callable[[Callable[[], Callable[[], Any]]], Callable[[], Callable[[], Any]]]:
+    def register(setup: Callable[[], Callable[[], Any]]) -> Callable[[], Callable[[], Any]]:
+        TARGETS[setup.__name__] = seconds
+        return setup
+    return register
+
+
+# --- Stubs and data --------------------------------------------------------------------------
+
+class StubSession:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, tx_function, params):
+        return None
+
+
+class StubDriver:
+    """Accepts every write without a database, so only the batching and filtering are timed"""
+
+    def session(self, database=None):
+        return StubSession()
+
+    def close(self):
+        pass
+
+
+class OfflineAgentService(AgentService):
+    # The format node never touches the retriever, and building it needs Neo4j
+    def _build_text2cypher_retriever(self):
+        return None
+
+
+def property_rows(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    types = ["Office", "Retail", "Industrial", "Multifamily", "Hotel"]
+    cities = ["New York", "Chicago", "Dallas", "Seattle", "Atlanta", "Denver"]
+    return [
+        {
+            "p.name": f"{rng.choice(cities)} Tower {i}",
+            "p.address": f"{rng.randint(1, 9999)} Main St",
+            "p.property_type": rng.choice(types),
+            "p.square_feet": rng.randint(5_000, 900_000),
+            "f.cap_rate": round(rng.uniform(3.0, 9.0), 2)
+        }
+        for i in range(count)
+    ]
+
+
+def result_items(count: int) -> List[RetrieverResultItem]:
+    return [
+        RetrieverResultItem(content=" | ".join(f"{k}: {v}" for k, v in row.items()), metadata=row)
+        for row in property_rows(count)
+    ]
+
+
+def graph_state(count: int) -> MultiTurnState:
+    cypher = "MATCH (p:Property)-[:HAS_FINANCIAL]->(f:Financial) RETURN p.name, p.address, p.property_type, p.square_feet, f.cap_rate"
+    return MultiTurnState(
+        current_question="Show me properties with cap rates above 6%",
+        conversation_history=[
+            {"turn": turn, "question": f"Follow-up question {turn}", "response": "An earlier answer. " * 20}
+            for turn in range(1, 11)
+        ],
+        turn_number=11,
+        results=Text2CypherRetrieverOutput(cypher=cypher, results=result_items(count)),
+        cypher_generated=cypher,
+        records_found=count
+    )
+
+
+def server_rows(count: int, seed: int = 0) -> pd.DataFrame:
+    """Inventory rows in the ETL's normalized columns; about one in ten lacks a required value"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = {key: f"{key.lower()}-{i % 500}" for key in REQUIRED_KEYS["_create_server"]}
+        row["Servers"] = f"srv-{i:06d}"
+        row["Security_Groups"] = "[" + " ".join(f"sg-{rng.getrandbits(32):08x}" for _ in range(rng.randint(1, 4))) + "]"
+        row["VPC_ID"] = f"vpc-{i % 40:04d}"
+        if rng.random() < 0.1:
+            row[rng.choice(REQUIRED_KEYS["_create_server"])] = None
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+# --- Benchmarks ------------------------------------------------------------------------------
+
+@benchmark
+def format_result_10k() -> Callable[[], Any]:
+    builder = Text2CypherRetrieverBuilder.__new__(Text2CypherRetrieverBuilder)
+    records = [Record(row) for row in property_rows(10_000)]
+    return lambda: [builder._format_result(record) for record in records]
+
+
+def _format_service() -> AgentService:
+    return OfflineAgentService(
+        llm_registry=LLMRegistry(mode="fake"),
+        driver=None,
+        database="neo4j",
+        embedder=None,
+        static_validation=False
+    )
+
+
+@benchmark
+def format_prompts_10k() -> Callable[[], Any]:
+    service = _format_service()
+    state = graph_state(10_000)
+    return lambda: service._build_format_prompts(state)
+
+
+@benchmark
+def format_response_node_10k() -> Callable[[], Any]:
+    service = _format_service()
+    state = graph_state(10_000)
+    return lambda: service._format_response_node(state, AgentService._run_config())
+
+
+@benchmark
+def multiturn_state_json_roundtrip_1k() -> Callable[[], Any]:
+    # What the session store does with every turn
+    state = graph_state(1_000)
+    return lambda: MultiTurnState.model_validate_json(state.model_dump_json())
+
+
+@benchmark
+def multiturn_state_dict_roundtrip_1k() -> Callable[[], Any]:
+    state = graph_state(1_000)
+    return lambda: MultiTurnState.model_validate(state.model_dump())
+
+
+@benchmark
+def load_query_examples_yaml() -> Callable[[], Any]:
+    path = os.path.join(ROOT, "query_examples.yml")
+    return lambda: load_query_examples(path)
+
+
+@benchmark
+def write_batches_serial_filter_20k() -> Callable[[], Any]:
+    writer = Neo4jWriter(driver=StubDriver(), df=server_rows(20_000), batch_size=1000)
+    records = writer.df.to_dict(orient="records")
+    return lambda: writer.write_batches_serial(records, Neo4jWriter._create_server)
+
+
+@benchmark
+def parse_sg_string_20k() -> Callable[[], Any]:
+    values = server_rows(20_000)["Security_Groups"].tolist() + [float("nan")] * 1_000
+    return lambda: [parse_sg_string(value) for value in values]
+
+
+@benchmark
+def build_chunk_entity_links_2k_x_300() -> Callable[[], Any]:
+    rng = random.Random(0)
+    entities = [{"id": f"e{i}", "name": f"Entity {i} Holdings"} for i in range(300)]
+    words = "lease tenant vacancy rent office retail market square feet renewal broker".split()
+    chunks = []
+    for i in range(2_000):
+        text = " ".join(rng.choice(words) for _ in range(80))
+        # Roughly one chunk in four mentions an entity
+        if rng.random() < 0.25:
+            text += f" {rng.choice(entities)['name']}"
+        chunks.append({"id": f"c{i}", "text": text})
+    extractor = GraphRAGExtractor.__new__(GraphRAGExtractor)
+    return lambda: extractor.build_chunk_entity_links(chunks, entities)
+
+
+@benchmark
+@target(1e-3)
+def semantic_cache_lookup_100k() -> Callable[[], Any]:
+    # Random unit vectors have no clusters to partition around, the hardest case for the index
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((100_000, 1536)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    cache = SemanticCache(max_entries=100_000, max_bytes=1 << 40, ttl_seconds=None)
+    state = MultiTurnState(current_question="Which properties are in Dallas?")
+    for i, vector in enumerate(vectors):
+        cache.store(f"question {i}", vector, state)
+
+    # Rephrasings of stored questions, at cosine similarity 0.97
+    picked = rng.integers(0, len(vectors), 1_000)
+    noise = rng.standard_normal((picked.size, vectors.shape[1])).astype(np.float32)
+    noise -= (noise * vectors[picked]).sum(axis=1, keepdims=True) * vectors[picked]
+    noise /= np.linalg.norm(noise, axis=1, keepdims=True)
+    queries = itertools.cycle(list(0.97 * vectors[picked] + np.sqrt(1 - 0.97 ** 2) * noise))
+    return lambda: cache.lookup("rephrased question", next(queries))
+
+
+# --- Runner ----------------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def quiet():
+    # The functions log with print; the prints still run, they just do not flood the terminal
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def measure(fn: Callable[[], Any], rounds: int = 7, min_round_seconds: float = 0.05) -> Dict[str, float]:
+    """Seconds per call over `rounds` rounds, each repeating `fn` until it takes `min_round_seconds`"""
+    def run(loops: int) -> float:
+        with quiet():
+            started = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            return time.perf_counter() - started
+
+    run(1)
+    loops = 1
+    elapsed = run(loops)
+    while elapsed < min_round_seconds and loops < 1_000_000:
+        loops *= max(2, min(10, int(min_round_seconds / max(elapsed, 1e-9)) + 1))
+        elapsed = run(loops)
+
+    samples = [run(loops) / loops for _ in range(rounds)]
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "rounds": rounds,
+        "loops": loops
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    metric: str = "min"
+) -> List[Tuple[str, float]]:
+    """Benchmarks whose `metric` is more than `threshold` (0.2 = 20%) slower than the baseline, with their ratio"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and before[metric] > 0:
+            ratio = result[metric] / before[metric]
+            if ratio > 1 + threshold:
+                regressions.append((name, ratio))
+    return regressions
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="keyword", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to save to or compare with")
+    parser.add_argument("--save", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Fail when a benchmark regressed past --threshold")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--metric", choices=("min", "median", "mean"), default="min", help="Timing to compare")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"❌ No baseline at {args.baseline}; run with --save first")
+            return 2
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["benchmarks"]
+
+    results = {}
+    print(f"{'benchmark':<36}{'median':>12}{'min':>12}{'loops':>8}{'vs baseline':>14}")
+    for name, setup in BENCHMARKS.items():
+        if args.keyword and args.keyword not in name:
+            continue
+        with quiet():
+            fn = setup()
+        results[name] = result = measure(fn, rounds=args.rounds)
+        change = ""
+        if name in baseline:
+            change = f"{(result[args.metric] / baseline[name][args.metric] - 1) * 100:+.1f}%"
+        elif args.compare:
+            change = "new"
+        print(f"{name:<36}{_format_seconds(result['median']):>12}{_format_seconds(result['min']):>12}{result['loops']:>8}{change:>14}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "machine": platform.platform(),
+                "python": platform.python_version(),
+                "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "benchmarks": results
+            }, f, indent=2)
+        print(f"💾 Saved baseline to {args.baseline}")
+
+    missed = [(name, results[name]["median"]) for name in results if results[name]["median"] > TARGETS.get(name, float("inf"))]
+    for name, median in missed:
+        print(f"❌ {name} takes {_format_seconds(median)}, over its {_format_seconds(TARGETS[name])} target")
+
+    if args.compare:
+        regressions = compare(results, baseline, args.threshold, args.metric)
+        for name, ratio in regressions:
+            print(f"❌ {name} is {(ratio - 1) * 100:.1f}% slower than the baseline (threshold {args.threshold * 100:.0f}%)")
+        if regressions:
+            return 1
+        print(f"✅ No benchmark regressed by more than {args.threshold * 100:.0f}%")
+    return 1 if missed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
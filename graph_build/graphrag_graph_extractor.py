@@ -1,5 +1,4 @@
 from typing import Dict, List
-from langchain_core.language_models.base import BaseLanguageModel
 from neo4j import Driver
 import asyncio
 from neo4j_graphrag.experimental.components.kg_writer import Neo4jWriter
@@ -25,14 +24,17 @@ from neo4j_graphrag.experimental.components.schema import (
     SchemaConfig,
 )
 from neo4j_graphrag.embeddings.base import Embedder
+from neo4j_graphrag.llm import LLMInterface
+from graph_build.utils import bump_graph_epoch
 
 
 class GraphRAGExtractor:
     def __init__(
         self,
-        llm: BaseLanguageModel,
+        llm: LLMInterface,
         driver: Driver,
         embedder: Embedder,
+        max_concurrency: int = 5,
     ):
         self.driver = driver
         self.neo4j_writer = Neo4jWriter(self.driver)
@@ -79,7 +81,7 @@ class GraphRAGExtractor:
             create_lexical_graph=True,
             enforce_schema=SchemaEnforcementMode.STRICT,
             on_error=OnError.IGNORE,
-            max_concurrency=5,
+            max_concurrency=max_concurrency,
         )
 
         self.pipeline = Pipeline()
@@ -108,7 +110,10 @@ class GraphRAGExtractor:
             }
         }
 
-        return await self.pipeline.run(pipe_inputs)
+        result = await self.pipeline.run(pipe_inputs)
+        # The bump is a blocking driver call, keep it off the event loop
+        await asyncio.to_thread(bump_graph_epoch, self.driver)
+        return result
 
     async def extract_graph_data(self, chunk_nodes: TextChunks) -> List[Neo4jGraph]:
         await self.extract_and_write_graphs(chunk_nodes)
@@ -19,6 +19,9 @@ from neo4j_graphrag.experimental.components.types import TextChunk, TextChunks
 from neo4j_graphrag.embeddings.base import Embedder
 from neo4j_graphrag.embeddings.openai import OpenAIEmbeddings
 from neo4j_graphrag.embeddings.sentence_transformers import SentenceTransformerEmbeddings
+from app.cache import LLMRecording, ResponseCache
+from app.llm import CachedLLM, LLMClientLayer, Neo4jLLMAdapter, RecordReplayLLM, RecordReplayLLMAdapter, ResilientLLM
+from app.utils.replay_embedder import RecordReplayEmbedder
 
 
 def main():
@@ -47,18 +50,55 @@ def main():
 
     chunk_nodes: TextChunks = TextChunks(chunks=chunk_list)
 
+    # LLM_MODE=replay or fake runs the ETL without any model server, e.g. to profile it offline
+    llm_mode = os.getenv("LLM_MODE", "live")
+    live = llm_mode in ("live", "record")
     embedder: Embedder = (
         OpenAIEmbeddings(env_vars.get("TEXT_EMBEDDING_MODEL"))
         if env_vars.get("LOCAL_MODE") == "False"
         else SentenceTransformerEmbeddings(env_vars.get("TEXT_EMBEDDING_MODEL"))
-    )
+    ) if live else None
 
     print("[INFO] Initializing LLM and GraphRAG extractor...")
-    llm: BaseChatModel = (
+    # The ETL has its own rate limit budget; keep it and the API's LLM_* limits within the account quota together
+    max_concurrency = int(os.getenv("ETL_MAX_CONCURRENCY", 5))
+    client_layer = LLMClientLayer(
+        requests_per_minute=float(os.getenv("ETL_LLM_REQUESTS_PER_MINUTE", 200)) or None,
+        tokens_per_minute=float(os.getenv("ETL_LLM_TOKENS_PER_MINUTE", 100000)) or None,
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", 5)),
+        max_connections=max_concurrency
+    )
+    chat_model: BaseChatModel = (
         ChatOllama(model="llama3.1:8b")
         if env_vars.get("LOCAL_MODE") == "True"
-        else ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    )
+        else ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0,
+            max_retries=0,
+            http_client=client_layer.http_client,
+            http_async_client=client_layer.http_async_client
+        )
+    ) if live else None
+    llm = ResilientLLM(chat_model, client_layer) if live else None
+    if llm_mode == "live" and os.getenv("LLM_CACHE_ENABLED", "True") == "True" and env_vars.get("LOCAL_MODE") != "True":
+        # Extraction runs at temperature 0, so rerunning on unchanged PDFs is answered from the cache
+        response_cache = ResponseCache(
+            path=os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite"),
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", 256)) * 1024 * 1024
+        )
+        llm = CachedLLM(llm, response_cache, "gpt-4o-mini")
+    if llm_mode != "live":
+        recording = (
+            LLMRecording(os.getenv("LLM_RECORDING_PATH", ".cache/llm_recording.jsonl.gz"))
+            if llm_mode in ("record", "replay") else None
+        )
+        replay_latency = float(os.environ["LLM_REPLAY_LATENCY_SECONDS"]) if os.getenv("LLM_REPLAY_LATENCY_SECONDS") else None
+        llm = RecordReplayLLM(
+            RecordReplayLLMAdapter(llm_mode, recording, Neo4jLLMAdapter(llm) if live else None, latency=replay_latency),
+            "gpt-4o-mini"
+        )
+        embedder = RecordReplayEmbedder(llm_mode, recording, embedder, latency=replay_latency)
+        print(f"[INFO] LLM mode '{llm_mode}'" + (f", recording at {recording.path}" if recording else ""))
 
     driver = GraphDatabase.driver(
         os.getenv("NEO4J_URI"),
@@ -68,11 +108,14 @@ def main():
     graph_extractor = GraphRAGExtractor(
         llm=llm,
         driver=driver,
-        embedder=embedder
+        embedder=embedder,
+        max_concurrency=max_concurrency
     )
 
     print("[INFO] Extracting knowledge graph structure from text chunks...")
     asyncio.run(graph_extractor.extract_graph_data(chunk_nodes))
+    if isinstance(llm, CachedLLM):
+        print(f"[INFO] LLM response cache: {llm.cache.hits} hits, {llm.cache.misses} misses")
 
     print("[INFO] Loading structured Excel data...")
     structured_data_path = os.getenv("STRUCTURED_DATA_PATH")
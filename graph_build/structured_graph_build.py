@@ -3,6 +3,7 @@ import re
 import pandas as pd
 from typing import List, Dict, Any, Callable, Iterator
 from neo4j import GraphDatabase
+from graph_build.utils import bump_graph_epoch
 
 def batch_parameters(lst: List[Any], batch_size: int) -> Iterator[List[Any]]:
     for i in range(0, len(lst), batch_size):
@@ -112,6 +113,8 @@ class Neo4jWriter:
         self.write_batches_serial(records, self._rel_server_part_of_vpc)
         self.write_batches_serial(records, self._rel_server_uses_sg)
 
+        bump_graph_epoch(self.driver)
+
     def write_batches_serial(self, data: List[Dict], tx_function: Callable[[Any, Dict[str, List[Dict]]], None]):
         func_name = tx_function.__name__
         required = REQUIRED_KEYS.get(func_name, [])
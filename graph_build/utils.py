@@ -1,8 +1,29 @@
-
 import re
+from typing import Optional
+
+# Bumped after every ETL write; the API compares it to decide when cached query results are stale
+BUMP_EPOCH_QUERY = """
+MERGE (m:GraphMeta {id: 'graph'})
+SET m.epoch = coalesce(m.epoch, 0) + 1,
+    m.updated_at = datetime()
+RETURN m.epoch AS epoch
+"""
+
 
 def normalize_column_name(name: str) -> str:
     name = name.strip()
     name = re.sub(r"[^\w]", "_", name)  # Replace all non-word characters with underscores
     name = re.sub(r"__+", "_", name)    # Collapse multiple underscores
-    return name
\ No newline at end of file
+    return name
+
+
+def bump_graph_epoch(driver, database: Optional[str] = "neo4j") -> Optional[int]:
+    """Mark the graph as changed so API caches drop results read before this write"""
+    try:
+        records, _, _ = driver.execute_query(BUMP_EPOCH_QUERY, database_=database)
+        epoch = records[0]["epoch"]
+        print(f"[INFO] Graph epoch bumped to {epoch}")
+        return epoch
+    except Exception as e:
+        print(f"[ERROR] Failed to bump graph epoch: {e}")
+        return None
@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import time
+
+from neo4j import Record
+from neo4j_graphrag.types import RawSearchResult
+
+from app.agentservice import AgentService
+
+CYPHER = "MATCH (p:Property) RETURN p.name"
+
+
+class RoleAdapter:
+    """Answers for one role and records when its calls start, finish or are cancelled"""
+
+    def __init__(self, answer: str, delay: float = 0.0):
+        self.answer = answer
+        self.delay = delay
+        self.started = asyncio.Event()
+        self.thread_started = threading.Event()
+        self.finished = False
+        self.cancelled = False
+
+    def ask(self, prompt: str) -> str:
+        self.thread_started.set()
+        time.sleep(self.delay)
+        self.finished = True
+        return self.answer
+
+    def stream(self, prompt: str):
+        self.thread_started.set()
+        words = self.answer.split(" ")
+        try:
+            for i, word in enumerate(words):
+                time.sleep(self.delay / len(words))
+                yield word if i == 0 else f" {word}"
+        except GeneratorExit:
+            self.cancelled = True
+            raise
+        self.finished = True
+
+    async def aask(self, prompt: str) -> str:
+        self.started.set()
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        self.finished = True
+        return self.answer
+
+
+class RoleRegistry:
+    neo4j_llm = None
+
+    def __init__(self, **adapters: RoleAdapter):
+        self.adapters = adapters
+
+    def get_adapter(self, mode: str = "langgraph"):
+        return self.adapters[mode]
+
+
+class StubRetriever:
+    result_formatter = None
+
+    def __init__(self, wait_for=None):
+        # An event text2cypher waits on before it answers; None answers straight away
+        self.wait_for = wait_for
+        self.saw_event = None
+
+    def get_search_results(self, query_text, query_vector=None):
+        if self.wait_for is not None:
+            self.saw_event = self.wait_for.wait(timeout=1.0)
+        return RawSearchResult(records=[Record({"name": "Tower A"})], metadata={"cypher": CYPHER})
+
+    async def aget_search_results(self, query_text, query_vector=None):
+        if self.wait_for is not None:
+            try:
+                await asyncio.wait_for(self.wait_for.wait(), timeout=1.0)
+                self.saw_event = True
+            except asyncio.TimeoutError:
+                self.saw_event = False
+        return RawSearchResult(records=[Record({"name": "Tower A"})], metadata={"cypher": CYPHER})
+
+
+def agent(monkeypatch, retriever, evaluation="VALID", llm_only_delay=0.0, summary_delay=0.0, **kwargs):
+    registry = RoleRegistry(
+        evaluation=RoleAdapter(evaluation),
+        summarization=RoleAdapter("graph answer", delay=summary_delay),
+        llm_only=RoleAdapter("llm-only answer", delay=llm_only_delay)
+    )
+    monkeypatch.setattr(AgentService, "_build_text2cypher_retriever", lambda self: retriever)
+    service = AgentService(llm_registry=registry, driver=None, database="neo4j", embedder=None, **kwargs)
+    return service, registry.adapters
+
+
+def test_llm_only_answer_starts_alongside_text2cypher(monkeypatch):
+    async def run():
+        retriever = StubRetriever()
+        service, adapters = agent(monkeypatch, retriever)
+        # text2cypher only finishes once the LLM-only call is under way, so a sequential graph would stall
+        retriever.wait_for = adapters["llm_only"].started
+        return await service.arun("Which properties are in Dallas?"), retriever
+
+    state, retriever = asyncio.run(run())
+
+    assert retriever.saw_event is True
+    assert state.llm_only_response == "llm-only answer"
+
+    retriever = StubRetriever()
+    service, adapters = agent(monkeypatch, retriever)
+    retriever.wait_for = adapters["llm_only"].thread_started
+    state = service.run("Which properties are in Dallas?")
+
+    assert retriever.saw_event is True
+    assert state.llm_only_response == "llm-only answer"
+
+
+def test_format_waits_for_both_branches(monkeypatch):
+    # The LLM-only branch is still running when evaluate is done
+    service, adapters = agent(monkeypatch, StubRetriever(), llm_only_delay=0.2)
+    state = asyncio.run(service.arun("Which properties are in Dallas?"))
+
+    assert adapters["llm_only"].finished
+    assert state.formatted_response == "graph answer"
+    assert state.llm_only_response == "llm-only answer"
+
+    service, adapters = agent(monkeypatch, StubRetriever(), llm_only_delay=0.2)
+    state = service.run("Which properties are in Dallas?")
+
+    assert state.formatted_response == "graph answer"
+    assert state.llm_only_response == "llm-only answer"
+
+
+def test_speculative_answer_is_discarded_when_clarification_is_needed(monkeypatch):
+    service, adapters = agent(monkeypatch, StubRetriever(), evaluation="NEEDS_CLARIFICATION: Which market?", llm_only_delay=5.0)
+
+    started = time.perf_counter()
+    state = asyncio.run(service.arun("Which properties are cheap?"))
+
+    assert time.perf_counter() - started < 2.0
+    assert adapters["llm_only"].cancelled
+    assert not adapters["summarization"].started.is_set()
+    assert state.needs_clarification
+    assert state.formatted_response == "Which market?"
+    assert state.llm_only_response is None
+
+    service, adapters = agent(monkeypatch, StubRetriever(), evaluation="NEEDS_CLARIFICATION: Which market?", llm_only_delay=0.2)
+    state = service.run("Which properties are cheap?")
+
+    assert state.formatted_response == "Which market?"
+    assert state.llm_only_response is None
+
+
+def test_sync_speculative_call_stops_when_clarification_is_needed(monkeypatch):
+    # Still queued behind a busy worker: the adapter is never called
+    service, adapters = agent(monkeypatch, StubRetriever(), evaluation="NEEDS_CLARIFICATION: Which market?", max_llm_workers=1)
+    release = threading.Event()
+    service.llm_executor.submit(release.wait, 5.0)
+    state = service.run("Which properties are cheap?")
+    release.set()
+    service.llm_executor.shutdown(wait=True)
+
+    assert state.formatted_response == "Which market?"
+    assert not adapters["llm_only"].thread_started.is_set()
+
+    # Already generating: the stream is closed before the rest of the answer is produced
+    retriever = StubRetriever()
+    service, adapters = agent(monkeypatch, retriever, evaluation="NEEDS_CLARIFICATION: Which market?", llm_only_delay=1.0)
+    retriever.wait_for = adapters["llm_only"].thread_started
+    state = service.run("Which properties are cheap?")
+    service.llm_executor.shutdown(wait=True)
+
+    assert retriever.saw_event is True
+    assert state.llm_only_response is None
+    assert adapters["llm_only"].cancelled
+    assert not adapters["llm_only"].finished
+
+
+def test_format_prompts_are_answered_concurrently(monkeypatch):
+    service, _ = agent(monkeypatch, StubRetriever(), llm_only_delay=0.3, summary_delay=0.3)
+
+    started = time.perf_counter()
+    answers = service._ask_concurrently({"graph": "graph prompt", "llm_only": "llm-only prompt"})
+
+    assert answers == {"graph": "graph answer", "llm_only": "llm-only answer"}
+    assert time.perf_counter() - started < 0.5
+
+
+def test_slow_answer_times_out_without_losing_the_other(monkeypatch):
+    service, _ = agent(monkeypatch, StubRetriever(), llm_only_delay=0.5, llm_timeout=0.1)
+
+    answers = service._ask_concurrently({"graph": "graph prompt", "llm_only": "llm-only prompt"})
+
+    assert answers["graph"] == "graph answer"
+    assert isinstance(answers["llm_only"], TimeoutError)
+
+
+def test_time_queued_for_a_worker_does_not_count_against_the_timeout(monkeypatch):
+    # With one worker the second call waits 0.2s for the first; measured from submission it would time out
+    service, _ = agent(monkeypatch, StubRetriever(), llm_only_delay=0.2, summary_delay=0.2, llm_timeout=0.3, max_llm_workers=1)
+
+    answers = service._ask_concurrently({"graph": "graph prompt", "llm_only": "llm-only prompt"})
+
+    assert answers == {"graph": "graph answer", "llm_only": "llm-only answer"}
@@ -0,0 +1,32 @@
+import asyncio
+
+from app.agentservice import AgentService
+from app.pydantictypes import MultiTurnState
+
+
+def test_batch_keeps_order_dedupes_and_isolates_failures(monkeypatch):
+    monkeypatch.setattr(AgentService, "_build_text2cypher_retriever", lambda self: None)
+    agent_service = AgentService(llm_registry=None, driver=None, database="neo4j", embedder=None)
+    asked = []
+    in_flight = [0, 0]
+
+    async def fake_arun(question, conversation_history=None):
+        asked.append(question)
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(0.01 * (len(asked) % 3))
+        in_flight[0] -= 1
+        if question == "broken":
+            raise RuntimeError("neo4j unavailable")
+        return MultiTurnState(current_question=question, formatted_response=f"answer to {question}")
+
+    monkeypatch.setattr(agent_service, "arun", fake_arun)
+    questions = ["Vacancy rates?", "cap rates", "broken", "vacancy rates", "leases"]
+
+    results = asyncio.run(agent_service.arun_many(questions, max_concurrency=2))
+
+    assert sorted(asked) == ["Vacancy rates?", "broken", "cap rates", "leases"]
+    assert in_flight[1] <= 2
+    assert isinstance(results[2], RuntimeError)
+    assert [r.current_question for i, r in enumerate(results) if i != 2] == ["Vacancy rates?", "cap rates", "vacancy rates", "leases"]
+    assert results[3].formatted_response == "answer to Vacancy rates?"
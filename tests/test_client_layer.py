@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.llm.client_layer import CircuitOpenError, LLMClientLayer, TokenBucket, failure_kind, retry_after
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = httpx.Response(status_code, headers=headers or {})
+
+
+def flaky(errors, result="ok"):
+    calls = []
+
+    def call():
+        calls.append(time.monotonic())
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+    return call, calls
+
+
+def test_retries_throttling_after_the_requested_delay():
+    layer = LLMClientLayer(requests_per_minute=None, tokens_per_minute=None, base_delay=0.001)
+    call, calls = flaky([StatusError(429, {"retry-after-ms": "50"}), StatusError(503)])
+
+    assert layer.call(call, "prompt") == "ok"
+    assert len(calls) == 3
+    assert calls[1] - calls[0] >= 0.05
+
+
+def test_wrapped_errors_are_classified_and_bad_requests_are_not_retried():
+    try:
+        try:
+            raise StatusError(429, {"retry-after": "2"})
+        except StatusError as e:
+            raise RuntimeError(e)
+    except RuntimeError as wrapped:
+        assert failure_kind(wrapped) == "throttled"
+        assert retry_after(wrapped) == 2.0
+
+    layer = LLMClientLayer(requests_per_minute=None, tokens_per_minute=None)
+    call, calls = flaky([StatusError(400)])
+    with pytest.raises(StatusError):
+        layer.call(call)
+    assert len(calls) == 1
+
+
+def test_circuit_opens_after_consecutive_failures_and_recovers():
+    layer = LLMClientLayer(requests_per_minute=None, tokens_per_minute=None, max_retries=0,
+                           failure_threshold=2, reset_seconds=0.05)
+    call, calls = flaky([StatusError(500), httpx.ConnectError("down")])
+    for _ in range(2):
+        with pytest.raises(Exception):
+            layer.call(call)
+    assert layer.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(layer.acall(lambda: asyncio.sleep(0)))
+    assert len(calls) == 2
+
+    time.sleep(0.06)
+    assert layer.breaker.state == "half_open"
+    assert layer.call(call) == "ok"
+    assert layer.breaker.state == "closed"
+
+
+def test_token_bucket_spaces_out_requests_beyond_the_burst():
+    bucket = TokenBucket(per_minute=60)
+    waits = [bucket.reserve(1) for _ in range(62)]
+    assert waits[59] == 0
+    assert waits[60] == pytest.approx(1.0, abs=0.05)
+    assert waits[61] == pytest.approx(2.0, abs=0.05)
+
+
+def half_open_layer():
+    layer = LLMClientLayer(requests_per_minute=None, tokens_per_minute=None, max_retries=0,
+                           failure_threshold=1, reset_seconds=0.01)
+    with pytest.raises(StatusError):
+        layer.call(flaky([StatusError(500)])[0])
+    time.sleep(0.02)
+    assert layer.breaker.state == "half_open"
+    return layer
+
+
+def test_a_cancelled_or_abandoned_trial_frees_the_half_open_slot():
+    layer = half_open_layer()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(layer.acall(lambda: asyncio.sleep(1)), timeout=0.01))
+    assert layer.breaker.state == "half_open"
+
+    stream = layer.stream(lambda: iter(["a", "b"]))
+    assert next(stream) == "a"
+    stream.close()
+    assert layer.breaker.state == "half_open"
+
+    assert layer.call(lambda: "ok") == "ok"
+    assert layer.breaker.state == "closed"
+
+
+def test_throttling_does_not_close_a_half_open_circuit():
+    layer = half_open_layer()
+    with pytest.raises(StatusError):
+        layer.call(flaky([StatusError(429)])[0])
+    assert layer.breaker.state == "half_open"
+    assert layer.call(lambda: "ok") == "ok"
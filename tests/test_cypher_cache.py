@@ -0,0 +1,46 @@
+import time
+
+from app.cache import CypherCache
+
+SCHEMA = "Node properties:\nProperty {name: STRING}"
+CYPHER = "MATCH (p:Property) RETURN p.name"
+
+
+def test_questions_differing_in_case_punctuation_and_spacing_share_an_entry():
+    cache = CypherCache()
+    cache.put("List all properties!", SCHEMA, CYPHER)
+
+    assert cache.get("  list ALL   properties ", SCHEMA) == CYPHER
+    assert cache.get("list all properties?", SCHEMA) == CYPHER
+    assert cache.get("list all tenants", SCHEMA) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_schema_change_makes_older_entries_unreachable():
+    cache = CypherCache()
+    cache.put("list all properties", SCHEMA, CYPHER)
+    new_schema = SCHEMA + "\nVacancy {vacancy_rate: FLOAT}"
+
+    assert cache.key("list all properties", SCHEMA) != cache.key("list all properties", new_schema)
+    assert cache.get("list all properties", new_schema) is None
+    # An equal schema built as a new string keeps hitting
+    assert cache.get("list all properties", SCHEMA[:5] + SCHEMA[5:]) == CYPHER
+
+
+def test_least_recently_used_entry_is_evicted_and_entries_expire():
+    cache = CypherCache(max_entries=2)
+    cache.put("a", SCHEMA, "RETURN 'a'")
+    cache.put("b", SCHEMA, "RETURN 'b'")
+    cache.get("a", SCHEMA)
+    cache.put("c", SCHEMA, "RETURN 'c'")
+
+    assert cache.get("b", SCHEMA) is None
+    assert cache.get("a", SCHEMA) == "RETURN 'a'"
+    assert cache.get("c", SCHEMA) == "RETURN 'c'"
+    assert len(cache) == 2
+
+    cache = CypherCache(ttl_seconds=0.01)
+    cache.put("a", SCHEMA, "RETURN 'a'")
+    time.sleep(0.02)
+    assert cache.get("a", SCHEMA) is None
+    assert len(cache) == 0
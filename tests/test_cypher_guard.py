@@ -0,0 +1,47 @@
+import pytest
+
+from app.retrievers import CypherGuardrailError, CypherGuardrails
+
+
+class ExplainSummary:
+    def __init__(self, plan, notifications=None):
+        self.plan = plan
+        self.notifications = notifications
+
+
+class PlanDriver:
+    def __init__(self, plan, notifications=None):
+        self.plan = plan
+        self.notifications = notifications
+
+    def execute_query(self, query, **kwargs):
+        return [], ExplainSummary(self.plan, self.notifications), []
+
+
+def test_limit_is_added_only_to_unbounded_list_queries():
+    guardrails = CypherGuardrails(auto_limit=100)
+
+    assert guardrails.rewrite("MATCH (p:Property) RETURN p.name;") == "MATCH (p:Property) RETURN p.name\nLIMIT 100"
+    for cypher in (
+        "MATCH (p:Property) RETURN p.name LIMIT 5",
+        "MATCH (p:Property) RETURN count(p)",
+        "MATCH (p:Property) RETURN p.name UNION MATCH (t:Tenant) RETURN t.name",
+        "MATCH (p:Property) CALL { WITH p RETURN p.name AS n } RETURN n LIMIT 3",
+        "MATCH (p:Property) CALL { WITH p MATCH (p)-[:HAS_LEASE]->(l) RETURN l }",
+    ):
+        assert guardrails.rewrite(cypher) == cypher
+    assert guardrails.rewrite("MATCH (p:Property {note: 'no LIMIT'}) RETURN p").endswith("LIMIT 100")
+
+
+def test_plan_with_large_estimate_is_refused():
+    plan = {"operatorType": "ProduceResults", "args": {"EstimatedRows": 10.0}, "children": [
+        {"operatorType": "CartesianProduct", "args": {"EstimatedRows": 4e9}, "children": []}
+    ]}
+    guardrails = CypherGuardrails(max_estimated_rows=1e6)
+
+    with pytest.raises(CypherGuardrailError):
+        guardrails.check_plan(PlanDriver(plan), "neo4j", "MATCH (a), (b) RETURN a, b")
+    warning = {"code": "Neo.ClientNotification.Statement.UnknownLabelWarning", "description": "unknown label"}
+    plan = guardrails.check_plan(PlanDriver({"args": {"EstimatedRows": 50.0}}, [warning]), "neo4j", "MATCH (a:Lease) RETURN a")
+    assert plan.estimated_rows == 50.0
+    assert plan.notifications == [warning]
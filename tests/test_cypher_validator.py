@@ -0,0 +1,131 @@
+from app.retrievers import CypherValidator, EvaluationTierStats
+
+SCHEMA = {
+    "node_props": {
+        "Property": [{"property": "name", "type": "STRING"}, {"property": "property_type", "type": "STRING"}],
+        "Vacancy": [{"property": "vacancy_rate", "type": "FLOAT"}]
+    },
+    "rel_props": {},
+    "relationships": [{"start": "Property", "type": "HAS_VACANCY", "end": "Vacancy"}]
+}
+
+
+class ExplainSummary:
+    def __init__(self, notifications):
+        self.notifications = notifications
+
+
+class ExplainDriver:
+    def __init__(self, notifications=None):
+        self.notifications = notifications or []
+        self.queries = []
+
+    def execute_query(self, query, **kwargs):
+        self.queries.append(query)
+        return [], ExplainSummary(self.notifications), []
+
+
+def test_query_accounting_for_the_question_is_valid_without_the_llm():
+    driver = ExplainDriver()
+    cypher = "MATCH (p:Property)-[:HAS_VACANCY]->(v:Vacancy) WHERE p.property_type = 'Retail' RETURN p.name, v.vacancy_rate"
+
+    validation = CypherValidator(driver, "neo4j", SCHEMA).validate("What are the vacancy rates for retail properties?", cypher, 4)
+
+    assert validation.verdict == "VALID"
+    assert driver.queries == [f"EXPLAIN {cypher}"]
+
+    # Conservative mode leaves VALID to the LLM
+    conservative = CypherValidator(ExplainDriver(), "neo4j", SCHEMA, static_valid=False)
+    assert conservative.validate("What are the vacancy rates for retail properties?", cypher, 4).verdict is None
+
+
+def test_explain_warnings_and_missing_schema_go_to_the_llm():
+    cypher = "MATCH (p:Property), (v:Vacancy) RETURN p.name, v.vacancy_rate"
+    warning = {"code": "Neo.ClientNotification.Statement.CartesianProduct", "severity": "WARNING", "description": "cartesian product"}
+
+    validation = CypherValidator(ExplainDriver([warning]), "neo4j", SCHEMA).validate("Show vacancy rates of properties", cypher, 3)
+    assert validation.verdict is None
+    assert validation.reasons == ["EXPLAIN warning: cartesian product"]
+
+    assert CypherValidator(ExplainDriver(), "neo4j").validate("Show vacancy rates of properties", cypher, 3).verdict is None
+
+
+def test_wrong_intent_queries_that_fit_the_schema_go_to_the_llm():
+    validator = CypherValidator(ExplainDriver(), "neo4j", SCHEMA)
+    cases = [
+        # Wrong filter value
+        ("What are the vacancy rates for retail properties?",
+         "MATCH (p:Property)-[:HAS_VACANCY]->(v:Vacancy) WHERE p.property_type = 'Office' RETURN p.name, v.vacancy_rate", 6),
+        # Comparison flipped
+        ("Which properties have vacancy rates below 10%?",
+         "MATCH (p:Property)-[:HAS_VACANCY]->(v:Vacancy) WHERE v.vacancy_rate > 0.1 RETURN p.name, v.vacancy_rate", 9),
+        # Filter dropped entirely
+        ("List retail properties",
+         "MATCH (p:Property) RETURN p.name", 40),
+        # Wrong aggregate
+        ("What is the average vacancy rate?",
+         "MATCH (v:Vacancy) RETURN max(v.vacancy_rate)", 1),
+    ]
+
+    for question, cypher, records_found in cases:
+        assert validator.validate(question, cypher, records_found).verdict is None, question
+
+    # The same questions with queries that answer them
+    assert validator.validate(
+        "Which properties have vacancy rates below 10%?",
+        "MATCH (p:Property)-[:HAS_VACANCY]->(v:Vacancy) WHERE v.vacancy_rate < 0.1 RETURN p.name, v.vacancy_rate", 9
+    ).verdict == "VALID"
+    assert validator.validate("What is the average vacancy rate?", "MATCH (v:Vacancy) RETURN avg(v.vacancy_rate)", 1).verdict == "VALID"
+
+
+def test_empty_result_is_decided_without_explain():
+    driver = ExplainDriver()
+    validation = CypherValidator(driver, "neo4j", SCHEMA).validate("List office properties", "MATCH (p:Property) RETURN p.name", 0)
+
+    assert validation.verdict == "NO_RESULTS"
+    assert driver.queries == []
+
+
+def test_unknown_schema_elements_need_clarification():
+    validator = CypherValidator(ExplainDriver(), "neo4j", SCHEMA)
+    cypher = "MATCH (p:Property)-[:HAS_LEASE]->(l:Lease) RETURN p.cap_rate, l.tenant_name"
+
+    validation = validator.validate("Show leases", cypher, 3)
+
+    assert validation.verdict == "NEEDS_CLARIFICATION"
+    assert validation.reasons == ["unknown label :Lease", "unknown relationship type :HAS_LEASE", "unknown property p.cap_rate"]
+
+
+def test_shape_mismatch_escalates_to_llm():
+    validator = CypherValidator(ExplainDriver(), "neo4j", SCHEMA)
+
+    validation = validator.validate("How many retail properties are there?", "MATCH (p:Property) RETURN p.name", 12)
+
+    assert validation.verdict is None
+
+
+def test_notifications_from_the_guardrail_explain_are_reused():
+    driver = ExplainDriver()
+    validator = CypherValidator(driver, "neo4j", SCHEMA)
+    warning = {"code": "Neo.ClientNotification.Statement.UnknownPropertyKeyWarning", "description": "unknown property vacancy"}
+
+    validation = validator.validate("Show properties", "MATCH (p:Property) RETURN p.name", 3, [warning])
+
+    assert validation.verdict == "NEEDS_CLARIFICATION"
+    assert validation.reasons == ["unknown property vacancy"]
+    assert driver.queries == []
+
+
+def test_stats_report_llm_calls_saved_on_queries_with_rows():
+    stats = EvaluationTierStats()
+    stats.record("static", "NO_RESULTS")
+    stats.record("static", "VALID")
+    stats.record("llm")
+    stats.record("llm")
+
+    snapshot = stats.snapshot()
+
+    assert snapshot["static_verdicts"] == {"VALID": 1, "NEEDS_CLARIFICATION": 0, "NO_RESULTS": 1}
+    assert snapshot["llm_calls_saved"] == 2
+    assert snapshot["llm_calls_saved_with_rows"] == 1
+    assert snapshot["static_decision_rate_with_rows"] == 1 / 3
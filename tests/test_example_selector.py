@@ -0,0 +1,40 @@
+import numpy as np
+
+from app.retrievers import ExampleSelector
+
+VOCABULARY = ["vacancy", "retail", "lease", "tenant", "office", "cap", "rate", "manager"]
+
+
+class WordEmbedder:
+    model = "words"
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        words = text.lower().replace("?", "").split()
+        return [float(word in words) for word in VOCABULARY] + [0.1]
+
+
+EXAMPLES = [
+    "User: What is the vacancy rate for retail\nCypher: MATCH (p:Property)-[:HAS_VACANCY]->(v) RETURN v",
+    "User: Which tenant has a lease expiring\nCypher: MATCH (l:Lease) RETURN l",
+    "User: Show office cap rate\nCypher: MATCH (f:Financial) RETURN f.cap_rate",
+    "User: Who is the manager\nCypher: MATCH (m:Management) RETURN m",
+]
+
+
+def test_closest_examples_are_selected_and_embeddings_are_cached(tmp_path):
+    embedder = WordEmbedder()
+    selector = ExampleSelector(EXAMPLES, embedder, k=2, cache_dir=str(tmp_path))
+    assert embedder.calls == len(EXAMPLES)
+
+    selected = selector.select("retail vacancy in office buildings?")
+    assert len(selected) == 2
+    assert selected[-1] == EXAMPLES[0]
+    assert EXAMPLES[2] in selected
+
+    cached = ExampleSelector(EXAMPLES, WordEmbedder(), k=2, cache_dir=str(tmp_path))
+    assert cached.embedder.calls == 0
+    assert np.allclose(cached.matrix, selector.matrix)
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from app.llm import BaseLLMAdapter, HedgedLLMAdapter, LLMClientLayer, ResilientLLMAdapter
+
+
+class TimedAdapter(BaseLLMAdapter):
+    def __init__(self, name: str, seconds: float, fail: bool = False):
+        self.name = name
+        self.seconds = seconds
+        self.fail = fail
+        self.cancelled = 0
+
+    def ask(self, prompt: str) -> str:
+        time.sleep(self.seconds)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        return self.name
+
+    async def aask(self, prompt: str) -> str:
+        try:
+            await asyncio.sleep(self.seconds)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        return self.name
+
+    async def astream(self, prompt: str):
+        yield await self.aask(prompt)
+        yield "!"
+
+
+def test_slow_primary_is_hedged_and_loses_to_the_secondary():
+    primary, secondary = TimedAdapter("primary", 0.5), TimedAdapter("secondary", 0.01)
+    adapter = HedgedLLMAdapter(primary, secondary, max_delay=0.05)
+
+    started = time.monotonic()
+    assert asyncio.run(adapter.aask("q")) == "secondary"
+    assert time.monotonic() - started < 0.3
+    assert primary.cancelled == 1
+
+    async def stream():
+        return [chunk async for chunk in adapter.astream("q")]
+    assert asyncio.run(stream()) == ["secondary", "!"]
+    assert adapter.ask("q") == "secondary"
+
+
+def test_fast_primary_is_not_hedged_and_a_failing_one_falls_back():
+    secondary = TimedAdapter("secondary", 0.0)
+    assert asyncio.run(HedgedLLMAdapter(TimedAdapter("primary", 0.0), secondary, max_delay=1.0).aask("q")) == "primary"
+    assert asyncio.run(HedgedLLMAdapter(TimedAdapter("primary", 0.0, fail=True), secondary, max_delay=1.0).aask("q")) == "secondary"
+
+
+def test_hedge_delay_follows_the_primary_latency_percentile():
+    adapter = HedgedLLMAdapter(TimedAdapter("p", 0), TimedAdapter("s", 0), percentile=90, min_delay=0.1, max_delay=5.0, min_samples=10)
+    assert adapter.hedge_delay == 5.0
+
+    for seconds in [0.2] * 9 + [3.0]:
+        adapter.latency["primary"].add(seconds)
+    assert adapter.hedge_delay == 3.0
+    for _ in range(200):
+        adapter.latency["primary"].add(0.01)
+    assert adapter.hedge_delay == 0.1
+
+
+def test_a_cancelled_hedge_loser_does_not_leave_its_circuit_stuck_open():
+    layer = LLMClientLayer(requests_per_minute=None, tokens_per_minute=None, max_retries=0,
+                           failure_threshold=1, reset_seconds=0.01)
+    layer.breaker.record_failure()
+    time.sleep(0.02)
+    assert layer.breaker.state == "half_open"
+
+    # The slow primary is the half-open trial and loses to the secondary
+    backend = TimedAdapter("primary", 0.5)
+    primary = ResilientLLMAdapter(backend, layer)
+    adapter = HedgedLLMAdapter(primary, TimedAdapter("secondary", 0.01), max_delay=0.05)
+    assert asyncio.run(adapter.aask("q")) == "secondary"
+    assert backend.cancelled == 1
+
+    # The cancelled trial freed the slot, so the primary gets the next call again
+    backend.seconds = 0.0
+    assert asyncio.run(adapter.aask("q")) == "primary"
+    assert layer.breaker.state == "closed"
+
+
+def test_streams_record_the_wait_for_the_first_chunk():
+    adapter = HedgedLLMAdapter(TimedAdapter("primary", 0.0), TimedAdapter("secondary", 0.0), max_delay=1.0)
+
+    async def stream():
+        chunks = []
+        async for chunk in adapter.astream("q"):
+            chunks.append(chunk)
+            await asyncio.sleep(0.2)
+        return chunks
+    assert asyncio.run(stream()) == ["primary", "!"]
+    assert adapter.latency["primary"].percentile(50) < 0.1
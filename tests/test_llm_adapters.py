@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+from neo4j_graphrag.llm import LLMResponse
+
+from app.llm import BaseLLMAdapter, Neo4jLLMAdapter
+
+
+class EchoAdapter(BaseLLMAdapter):
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def ask(self, prompt: str) -> str:
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+        return prompt.upper()
+
+
+class FakeGraphRAGLLM:
+    model_name = "fake"
+    model_params = {}
+
+    def invoke(self, input, **kwargs):
+        return LLMResponse(content=f"answer to {input}")
+
+    async def ainvoke(self, input, **kwargs):
+        return LLMResponse(content=f"answer to {input}")
+
+
+def test_ask_many_keeps_order_and_bounds_concurrency():
+    adapter = EchoAdapter()
+    prompts = [f"q{i}" for i in range(12)]
+
+    assert adapter.ask_many(prompts, max_concurrency=3) == [p.upper() for p in prompts]
+    assert adapter.peak <= 3
+
+    adapter.peak = 0
+    assert asyncio.run(adapter.aask_many(prompts, max_concurrency=2)) == [p.upper() for p in prompts]
+    assert adapter.peak <= 2
+
+
+def test_neo4j_adapter_returns_text():
+    adapter = Neo4jLLMAdapter(FakeGraphRAGLLM())
+
+    assert adapter.ask("q") == "answer to q"
+    assert asyncio.run(adapter.aask("q")) == "answer to q"
+    assert list(adapter.stream("q")) == ["answer to q"]
@@ -0,0 +1,20 @@
+import pytest
+
+from app.llm import LLMRegistry, ModelConfig
+
+
+def test_model_specs_name_the_provider():
+    assert ModelConfig.parse("gpt-4o-mini") == ModelConfig("gpt-4o-mini", 0.0, "openai")
+    assert ModelConfig.parse("ollama/llama3.1:8b", 0.2) == ModelConfig("llama3.1:8b", 0.2, "ollama")
+
+
+def test_roles_get_their_own_model_and_the_rest_the_default(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    registry = LLMRegistry(model_name="gpt-4o", roles={"evaluation": ModelConfig.parse("gpt-4o-mini")})
+
+    assert registry.get_adapter("evaluation").model_name == "gpt-4o-mini"
+    assert registry.get_adapter("summarization").model_name == "gpt-4o"
+    assert registry.neo4j_llm.model_name == "gpt-4o"
+
+    with pytest.raises(ValueError):
+        LLMRegistry(roles={"translation": ModelConfig("gpt-4o-mini")})
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from neo4j import Record
+from neo4j_graphrag.types import RawSearchResult
+
+from app.agentservice import AgentService
+
+# Starlette runs sync endpoints on an anyio threadpool capped at 40 threads
+THREADPOOL_SIZE = 40
+IN_FLIGHT_QUESTIONS = 200
+STAGE_LATENCY = 0.3
+
+
+class SlowAsyncAdapter:
+    """Stands in for an LLM whose calls take STAGE_LATENCY seconds"""
+
+    def ask(self, prompt: str) -> str:
+        raise AssertionError("the async path must not fall back to blocking calls")
+
+    async def aask(self, prompt: str) -> str:
+        await asyncio.sleep(STAGE_LATENCY)
+        return "VALID" if "Respond with ONLY" in prompt else "summary"
+
+
+class StubRegistry:
+    neo4j_llm = None
+
+    def __init__(self):
+        self.adapter = SlowAsyncAdapter()
+
+    def get_adapter(self, mode: str = "langgraph"):
+        return self.adapter
+
+
+class CountingRetriever:
+    """Tracks how many questions are inside text2cypher at the same time"""
+    result_formatter = None
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def aget_search_results(self, query_text: str, query_vector=None) -> RawSearchResult:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(STAGE_LATENCY)
+        finally:
+            self.in_flight -= 1
+        return RawSearchResult(records=[Record({"name": "Tower A"})], metadata={"cypher": "MATCH (p:Property) RETURN p.name"})
+
+
+def test_async_path_is_not_bounded_by_threadpool(monkeypatch):
+    retriever = CountingRetriever()
+    monkeypatch.setattr(AgentService, "_build_text2cypher_retriever", lambda self: retriever)
+    agent_service = AgentService(llm_registry=StubRegistry(), driver=None, database="neo4j", embedder=None)
+
+    async def run_all():
+        # Starve the default executor so any hidden blocking call would serialize the run
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+        questions = [f"What is the vacancy rate of property {i}?" for i in range(IN_FLIGHT_QUESTIONS)]
+        return await asyncio.gather(*(agent_service.arun(q) for q in questions))
+
+    started = time.perf_counter()
+    states = asyncio.run(run_all())
+    elapsed = time.perf_counter() - started
+
+    assert len(states) == IN_FLIGHT_QUESTIONS
+    assert all(state.formatted_response == "summary" for state in states)
+    assert retriever.peak_in_flight == IN_FLIGHT_QUESTIONS
+
+    # A threadpool-bound server needs ceil(200 / 40) = 5 waves of three stages each
+    threadpool_bound = -(-IN_FLIGHT_QUESTIONS // THREADPOOL_SIZE) * 3 * STAGE_LATENCY
+    assert elapsed < threadpool_bound * 0.6
@@ -0,0 +1,77 @@
+import asyncio
+
+from app.llm.base_adapter import BaseLLMAdapter
+from app.llm.metered_adapter import MeteredLLMAdapter
+from app.metrics import LLM_TOKENS, MetricsRegistry, timed_node, NODE_SECONDS
+from app.utils.tokens import report_usage
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("node_seconds", "Node latency", ["node"], buckets=(0.1, 1.0))
+    calls = registry.counter("llm_calls_total", "LLM calls", ["adapter"])
+    latency.observe(0.05, "format")
+    latency.observe(0.5, "format")
+    latency.observe(3.0, "format")
+    calls.inc("neo4j")
+    calls.inc("neo4j", amount=2)
+
+    text = registry.render()
+
+    assert 'node_seconds_bucket{node="format",le="0.1"} 1' in text
+    assert 'node_seconds_bucket{node="format",le="1.0"} 2' in text
+    assert 'node_seconds_bucket{node="format",le="+Inf"} 3' in text
+    assert 'node_seconds_sum{node="format"} 3.55' in text
+    assert 'node_seconds_count{node="format"} 3' in text
+    assert 'llm_calls_total{adapter="neo4j"} 3' in text
+    assert "# TYPE node_seconds histogram" in text
+
+
+def test_collectors_are_read_on_scrape():
+    registry = MetricsRegistry()
+    hits = {"semantic": 0}
+    registry.register_collector("cache_hits", "Cache hits", "counter", lambda: [({"cache": "semantic"}, hits["semantic"])])
+    hits["semantic"] = 7
+
+    assert 'cache_hits{cache="semantic"} 7' in registry.render()
+
+
+def test_timed_node_records_sync_and_async_nodes():
+    def node(state):
+        return state
+
+    async def anode(state, config):
+        return config["configurable"]["value"]
+
+    before = NODE_SECONDS.count("test_node")
+    assert timed_node("test_node", node)("state", {}) == "state"
+    assert asyncio.run(timed_node("test_node", anode)("state", {"configurable": {"value": 1}})) == 1
+    assert NODE_SECONDS.count("test_node") == before + 2
+
+
+def test_llm_tokens_use_reported_usage_and_estimate_otherwise():
+    class Message:
+        content = "four score"
+        usage_metadata = {"input_tokens": 11, "output_tokens": 3}
+
+    class ReportingAdapter(BaseLLMAdapter):
+        def ask(self, prompt):
+            message = Message()
+            report_usage(message)
+            return message.content
+
+        async def aask(self, prompt):
+            # Reported from another task, as a hedged call does
+            return await asyncio.ensure_future(asyncio.sleep(0, self.ask(prompt)))
+
+    class PlainAdapter(BaseLLMAdapter):
+        def ask(self, prompt):
+            return "x" * 40
+
+    before = LLM_TOKENS.get("reporting", "prompt"), LLM_TOKENS.get("plain", "completion")
+    MeteredLLMAdapter(ReportingAdapter(), "reporting").ask("prompt")
+    asyncio.run(MeteredLLMAdapter(ReportingAdapter(), "reporting").aask("prompt"))
+    MeteredLLMAdapter(PlainAdapter(), "plain").ask("prompt")
+
+    assert LLM_TOKENS.get("reporting", "prompt") == before[0] + 22
+    assert LLM_TOKENS.get("plain", "completion") == before[1] + 10
@@ -0,0 +1,14 @@
+from benchmarks.microbench import BENCHMARKS, compare, measure
+
+
+def test_compare_flags_only_slowdowns_past_the_threshold():
+    baseline = {"fast": {"min": 1.0}, "slow": {"min": 1.0}, "removed": {"min": 1.0}}
+    results = {"fast": {"min": 0.5}, "slow": {"min": 1.5}, "new": {"min": 9.0}}
+
+    assert compare(results, baseline, threshold=0.2) == [("slow", 1.5)]
+    assert compare(results, baseline, threshold=0.6) == []
+
+
+def test_benchmarks_run_offline():
+    result = measure(BENCHMARKS["parse_sg_string_20k"](), rounds=1, min_round_seconds=0)
+    assert result["loops"] == 1 and result["min"] > 0
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.cache import LLMRecording, llm_recording
+from app.llm import BaseLLMAdapter, LLMRegistry, RecordReplayLLMAdapter, ReplayMissError
+from app.utils.replay_embedder import RecordReplayEmbedder
+
+
+class EchoAdapter(BaseLLMAdapter):
+    def ask(self, prompt: str) -> str:
+        return f"answer to {prompt}"
+
+
+class ConstantEmbedder:
+    def embed_query(self, text: str) -> list:
+        return [0.5, 0.25, float(len(text))]
+
+
+def test_recorded_answers_replay_from_the_file_with_synthetic_latency(tmp_path):
+    path = str(tmp_path / "recording.jsonl.gz")
+    recording = LLMRecording(path)
+    recorder = RecordReplayLLMAdapter("record", recording, EchoAdapter())
+    assert recorder.ask("q1") == "answer to q1"
+    assert asyncio.run(recorder.aask("q2")) == "answer to q2"
+    assert RecordReplayEmbedder("record", recording, ConstantEmbedder()).embed_query("text") == [0.5, 0.25, 4.0]
+    recording.flush()
+
+    replayed = LLMRecording(path)
+    assert len(replayed) == 3
+    replayer = RecordReplayLLMAdapter("replay", replayed, latency=0.05)
+    started = time.monotonic()
+    assert replayer.ask("q1") == "answer to q1"
+    assert time.monotonic() - started >= 0.05
+    assert asyncio.run(replayer.aask("q2")) == "answer to q2"
+    assert RecordReplayEmbedder("replay", replayed, latency=0).embed_query("text") == [0.5, 0.25, 4.0]
+    with pytest.raises(ReplayMissError):
+        replayer.ask("never recorded")
+
+
+def test_recording_is_written_without_blocking_the_event_loop(tmp_path, monkeypatch):
+    path = str(tmp_path / "recording.jsonl.gz")
+    disk_ready = threading.Event()
+    gzip_open = llm_recording.gzip.open
+
+    def slow_open(*args, **kwargs):
+        disk_ready.wait(timeout=5.0)
+        return gzip_open(*args, **kwargs)
+
+    monkeypatch.setattr(llm_recording.gzip, "open", slow_open)
+    recording = LLMRecording(path, flush_every=2)
+    recorder = RecordReplayLLMAdapter("record", recording, EchoAdapter())
+
+    async def record():
+        started = time.perf_counter()
+        for i in range(5):
+            await recorder.aask(f"q{i}")
+        return time.perf_counter() - started
+
+    assert asyncio.run(record()) < 1.0
+
+    disk_ready.set()
+    recording.flush()
+    replayed = LLMRecording(path)
+    assert len(replayed) == 5
+    assert all(replayed.get("llm", f"q{i}")["s"] < 1.0 for i in range(5))
+
+
+def test_fake_mode_answers_the_agent_prompts_without_a_model(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    registry = LLMRegistry(mode="fake")
+
+    prompt = "You are a Cypher-generating expert\n\nUser Question:\nFind industrial properties larger than 50,000 square feet\n"
+    assert "p.property_type = 'Industrial'" in registry.neo4j_llm.invoke(prompt).content
+    assert registry.get_adapter("routing").ask("You are a retriever router") == '{"route": "text2cypher"}'
+    assert registry.get_adapter("evaluation").ask("evaluating if a Cypher query\nNumber of Records Found: 0\n") == "NO_RESULTS"
+
+    embedder = RecordReplayEmbedder("fake", dimensions=8)
+    assert embedder.embed_query("same text") == embedder.embed_query("same text")
+    assert embedder.embed_query("same text") != embedder.embed_query("other text")
@@ -0,0 +1,104 @@
+import asyncio
+import sqlite3
+import time
+
+from app.cache import ResponseCache
+from app.llm import BaseLLMAdapter, CachedLLMAdapter
+
+
+class CountingAdapter(BaseLLMAdapter):
+    def __init__(self):
+        self.calls = 0
+
+    def ask(self, prompt: str) -> str:
+        self.calls += 1
+        return f"answer to {prompt}"
+
+
+def test_cached_adapter_answers_repeated_prompts_from_disk(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    backend = CountingAdapter()
+    adapter = CachedLLMAdapter(backend, ResponseCache(path), "gpt-4o")
+
+    assert adapter.ask("q") == "answer to q"
+    assert asyncio.run(adapter.aask("q")) == "answer to q"
+    assert backend.calls == 1
+
+    # Another process (or a restart) sees the same file; other models do not share entries
+    restarted = CachedLLMAdapter(backend, ResponseCache(path), "gpt-4o")
+    assert list(restarted.stream("q")) == ["answer to q"]
+    assert backend.calls == 1
+    CachedLLMAdapter(backend, ResponseCache(path), "gpt-4o-mini").ask("q")
+    assert backend.calls == 2
+
+
+def test_least_recently_used_responses_are_evicted_past_the_size_cap(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=300)
+    for i in range(3):
+        cache.put("m", 0.0, f"p{i}", "x" * 100)
+        time.sleep(0.01)
+    assert cache.get("m", 0.0, "p0") is not None
+
+    cache.put("m", 0.0, "p3", "x" * 100)
+
+    assert cache.get("m", 0.0, "p1") is None
+    assert cache.get("m", 0.0, "p0") is not None
+    assert cache.get("m", 0.0, "p3") is not None
+
+
+def test_total_size_is_tracked_without_summing_the_table(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=1000)
+    cache.put("m", 0.0, "p0", "x" * 100)
+    cache.put("m", 0.0, "p1", "x" * 200)
+    cache.put("m", 0.0, "p0", "x" * 50)
+    assert cache.total_bytes == 250
+
+    for i in range(2, 12):
+        cache.put("m", 0.0, f"p{i}", "x" * 100)
+    stored = cache._connection().execute("SELECT SUM(size) FROM responses").fetchone()[0]
+    assert cache.total_bytes == stored <= 1000
+
+    cache.clear()
+    assert cache.total_bytes == 0
+
+
+def test_hits_record_access_times_in_batches(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), access_batch=3)
+    for i in range(3):
+        cache.put("m", 0.0, f"p{i}", "x")
+    db = cache._connection()
+    before = dict(db.execute("SELECT key, accessed FROM responses"))
+    time.sleep(0.01)
+
+    cache.get("m", 0.0, "p0")
+    cache.get("m", 0.0, "p1")
+    assert dict(db.execute("SELECT key, accessed FROM responses")) == before
+
+    cache.get("m", 0.0, "p2")
+    after = dict(db.execute("SELECT key, accessed FROM responses"))
+    assert all(after[key] > before[key] for key in before)
+
+
+def test_async_lookups_do_not_block_the_event_loop_on_a_write_lock(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    # Every hit writes its access time, so this lookup needs the write lock
+    adapter = CachedLLMAdapter(CountingAdapter(), ResponseCache(path, access_batch=1), "gpt-4o")
+    adapter.ask("q")
+
+    async def run():
+        other_worker = sqlite3.connect(path, isolation_level=None)
+        other_worker.execute("BEGIN IMMEDIATE")
+        lookup = asyncio.create_task(adapter.aask("q"))
+        ticks = 0
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not lookup.done()
+        other_worker.execute("COMMIT")
+        other_worker.close()
+        return ticks, await lookup
+
+    ticks, answer = asyncio.run(run())
+
+    assert ticks == 20
+    assert answer == "answer to q"
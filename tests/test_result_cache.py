@@ -0,0 +1,74 @@
+from neo4j import Record
+
+from app.cache import GraphEpoch, ResultCache
+
+
+class EpochDriver:
+    def __init__(self, epoch=1):
+        self.epoch = epoch
+
+    def execute_query(self, query, **kwargs):
+        return [Record({"epoch": self.epoch})], None, []
+
+
+def rows(count, text="Tower"):
+    return [Record({"name": f"{text} {i}"}) for i in range(count)]
+
+
+def test_results_are_dropped_when_the_graph_epoch_changes():
+    driver = EpochDriver(epoch=1)
+    cache = ResultCache(GraphEpoch(driver, check_interval=0))
+
+    epoch = cache.validate()
+    cache.put("MATCH (p) RETURN p.name", None, rows(3), epoch)
+    assert len(cache.get("MATCH (p) RETURN p.name")) == 3
+
+    # A query that started before the ETL finished must not store what it read
+    stale = cache.validate()
+    driver.epoch = 2
+    assert cache.validate() == 2
+    assert cache.get("MATCH (p) RETURN p.name") is None
+    cache.put("MATCH (p) RETURN p.name", None, rows(3), stale)
+    assert cache.get("MATCH (p) RETURN p.name") is None
+
+    cache.put("MATCH (p) RETURN p.name", None, rows(2), 2)
+    assert len(cache.get("MATCH (p) RETURN p.name")) == 2
+
+
+def test_parameters_are_part_of_the_key():
+    cache = ResultCache(GraphEpoch(EpochDriver(), check_interval=0))
+    epoch = cache.validate()
+    cache.put("MATCH (p {city: $city}) RETURN p", {"city": "Dallas"}, rows(1, "Dallas"), epoch)
+
+    assert cache.get("MATCH (p {city: $city}) RETURN p", {"city": "Denver"}) is None
+    assert cache.get("MATCH (p {city: $city}) RETURN p", {"city": "Dallas"})[0]["name"] == "Dallas 0"
+
+
+def test_entry_row_and_byte_caps_are_enforced():
+    cache = ResultCache(GraphEpoch(EpochDriver(), check_interval=0), max_entries=2, max_rows_per_entry=5)
+    epoch = cache.validate()
+    cache.put("q1", None, rows(1), epoch)
+    cache.put("q2", None, rows(1), epoch)
+    cache.get("q1")
+    cache.put("q3", None, rows(1), epoch)
+
+    # Least recently used goes first
+    assert cache.get("q2") is None
+    assert cache.get("q1") is not None and cache.get("q3") is not None
+    assert len(cache) == 2
+
+    cache.put("too many rows", None, rows(6), epoch)
+    assert cache.get("too many rows") is None
+
+    one_entry = ResultCache._estimate_bytes("q1", rows(10))
+    cache = ResultCache(GraphEpoch(EpochDriver(), check_interval=0), max_bytes=int(one_entry * 1.5))
+    epoch = cache.validate()
+    cache.put("q1", None, rows(10), epoch)
+    cache.put("q2", None, rows(10), epoch)
+    assert cache.get("q1") is None
+    assert cache.get("q2") is not None
+    assert cache.memory_bytes <= cache.max_bytes
+
+    cache.put("bigger than the budget", None, rows(100), epoch)
+    assert cache.get("bigger than the budget") is None
+    assert cache.get("q2") is not None
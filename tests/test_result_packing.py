@@ -0,0 +1,28 @@
+from neo4j_graphrag.types import RetrieverResultItem
+
+from app.utils.result_packing import pack_records
+from app.utils.tokens import count_tokens
+
+
+def item(i: int) -> RetrieverResultItem:
+    metadata = {"name": f"Tower {i}", "property_type": ["Office", "Retail"][i % 2], "vacancy_rate": float(i % 10)}
+    return RetrieverResultItem(content=" | ".join(f"{k}: {v}" for k, v in metadata.items()), metadata=metadata)
+
+
+def test_small_results_are_unchanged():
+    records = [item(i) for i in range(3)]
+    assert pack_records(records, 1000) == "\n".join(r.content for r in records)
+
+
+def test_large_results_stay_within_budget_with_aggregates():
+    records = [item(i) for i in range(20_000)]
+
+    packed = pack_records(records, 400)
+
+    assert count_tokens(packed) <= 400
+    lines = packed.splitlines()
+    assert lines[0].startswith("[Showing ") and lines[0].endswith("of 20000 rows. Aggregates over all 20000 rows:]")
+    assert "- name: 20000 distinct values" in lines
+    assert "- property_type: Office (10000), Retail (10000) (2 distinct)" in lines
+    assert "- vacancy_rate: min 0, max 9, mean 4.5" in lines
+    assert records[0].content in lines
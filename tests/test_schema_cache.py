@@ -0,0 +1,57 @@
+from app.cache import SchemaCache
+from app.cache import schema_cache as schema_cache_module
+
+
+class ShapeDriver:
+    def __init__(self, labels):
+        self.labels = labels
+
+    def execute_query(self, query, **kwargs):
+        return [{"labels": self.labels, "types": ["HAS_VACANCY"], "keys": ["name"], "nodes": 10, "relationships": 4}], None, []
+
+
+def test_saved_schema_is_reused_and_refreshed_when_the_graph_changes(tmp_path, monkeypatch):
+    fetched = []
+
+    def get_structured_schema(driver, is_enhanced=False, database=None):
+        fetched.append(list(driver.labels))
+        return {"node_props": {label: [] for label in driver.labels}, "rel_props": {}, "relationships": [], "metadata": {}}
+
+    monkeypatch.setattr(schema_cache_module, "get_structured_schema", get_structured_schema)
+    path = str(tmp_path / "schema.json")
+
+    first = SchemaCache(ShapeDriver(["Property"]), "neo4j", path).get()
+    assert fetched == [["Property"]]
+
+    driver = ShapeDriver(["Property"])
+    cache = SchemaCache(driver, "neo4j", path)
+    assert cache.get().fingerprint == first.fingerprint
+    assert cache.refresh() is False
+    assert len(fetched) == 1
+
+    swapped = []
+    cache.subscribe(swapped.append)
+    driver.labels = ["Property", "Vacancy"]
+    assert cache.refresh() is True
+    assert "Vacancy" in swapped[0].schema
+    assert SchemaCache(driver, "neo4j", path).get().fingerprint == swapped[0].fingerprint
+
+
+def test_graph_meta_epoch_node_is_left_out_of_the_schema(tmp_path, monkeypatch):
+    def get_structured_schema(driver, is_enhanced=False, database=None):
+        return {
+            "node_props": {
+                "Property": [{"property": "name", "type": "STRING"}],
+                "GraphMeta": [{"property": "epoch", "type": "INTEGER"}]
+            },
+            "rel_props": {},
+            "relationships": [],
+            "metadata": {"constraint": [{"labelsOrTypes": ["GraphMeta"], "properties": ["id"]}], "index": []}
+        }
+
+    monkeypatch.setattr(schema_cache_module, "get_structured_schema", get_structured_schema)
+    snapshot = SchemaCache(ShapeDriver(["Property"]), "neo4j", str(tmp_path / "schema.json")).get()
+
+    assert "GraphMeta" not in snapshot.schema
+    assert list(snapshot.structured_schema["node_props"]) == ["Property"]
+    assert snapshot.structured_schema["metadata"]["constraint"] == []
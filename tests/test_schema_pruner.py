@@ -0,0 +1,46 @@
+from app.retrievers import SchemaPruner
+
+VOCABULARY = ["vacancy", "rate", "property", "name", "lease", "tenant", "market", "has", "signed"]
+
+
+class WordEmbedder:
+    model = "words"
+
+    def embed_query(self, text):
+        words = text.lower().replace("?", "").replace(":", "").replace(",", "").split()
+        return [float(word in words) for word in VOCABULARY] + [0.1]
+
+
+def props(*names):
+    return [{"property": name, "type": "STRING"} for name in names]
+
+
+SCHEMA = {
+    "node_props": {
+        "Property": props("name", "address", "year_built"),
+        "Vacancy": props("vacancy_rate", "last_updated"),
+        "Lease": props("rent", "end_date"),
+        "Tenant": props("name", "industry"),
+        "Market": props("name", "region"),
+    },
+    "rel_props": {"SIGNED": props("signed_on")},
+    "relationships": [
+        {"start": "Property", "type": "HAS_VACANCY", "end": "Vacancy"},
+        {"start": "Property", "type": "HAS_LEASE", "end": "Lease"},
+        {"start": "Tenant", "type": "SIGNED", "end": "Lease"},
+        {"start": "Property", "type": "IN_MARKET", "end": "Market"},
+    ],
+    "metadata": {"constraint": [], "index": []},
+}
+
+
+def test_question_keeps_matching_labels_and_their_neighbours():
+    pruner = SchemaPruner(SCHEMA, WordEmbedder(), top_labels=1, top_relationships=1, neighbour_properties=1, cache_dir=None)
+
+    pruned = pruner.prune(WordEmbedder().embed_query("What is the vacancy rate?"))
+
+    assert set(pruned["node_props"]) == {"Vacancy", "Property"}
+    assert pruned["node_props"]["Vacancy"] == SCHEMA["node_props"]["Vacancy"]
+    assert len(pruned["node_props"]["Property"]) == 1
+    assert [r["type"] for r in pruned["relationships"]] == ["HAS_VACANCY"]
+    assert pruned["rel_props"] == {}
@@ -0,0 +1,127 @@
+import time
+
+import numpy as np
+from neo4j import Record
+from neo4j_graphrag.types import RawSearchResult
+
+from app.agentservice import AgentService
+from app.cache import SemanticCache
+from app.llm import LLMRegistry
+from app.pydantictypes import MultiTurnState
+
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def answer(text: str) -> MultiTurnState:
+    return MultiTurnState(current_question=text, formatted_response=f"answer to {text}")
+
+
+def test_paraphrase_hits_and_unrelated_question_misses():
+    rng = np.random.default_rng(7)
+    base = unit(rng.standard_normal(64))
+    cache = SemanticCache(threshold=0.9)
+    cache.store("vacancy rates for retail", base, answer("vacancy rates for retail"))
+
+    paraphrase = unit(base + 0.1 * unit(rng.standard_normal(64)))
+    hit = cache.lookup("retail vacancy rates?", paraphrase)
+    assert hit is not None
+    assert hit.formatted_response == "answer to vacancy rates for retail"
+
+    assert cache.lookup("who manages tower a", unit(rng.standard_normal(64))) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache(max_entries=2)
+    vectors = np.eye(3, dtype=np.float32)
+    cache.store("a", vectors[0], answer("a"))
+    cache.store("b", vectors[1], answer("b"))
+    cache.lookup("a", vectors[0])
+    cache.store("c", vectors[2], answer("c"))
+
+    assert cache.lookup("b", vectors[1]) is None
+    assert cache.lookup("a", vectors[0]) is not None
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl():
+    cache = SemanticCache(ttl_seconds=0.01)
+    cache.store("a", [1.0, 0.0], answer("a"))
+    time.sleep(0.02)
+
+    assert cache.lookup("a", [1.0, 0.0]) is None
+    assert len(cache) == 0
+
+
+def test_partitioned_index_finds_near_duplicates():
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((5000, 96)).astype(np.float32)
+    cache = SemanticCache(threshold=0.9, max_entries=5000, partition_min_entries=1000)
+    for i, vector in enumerate(vectors):
+        cache.store(f"question {i}", vector, answer(f"question {i}"))
+
+    query = unit(vectors[1234]) + 0.05 * unit(rng.standard_normal(96))
+    hit = cache.lookup("something else entirely", query)
+    assert hit is not None
+    assert hit.current_question == "question 1234"
+
+
+def test_partition_rebuild_runs_outside_the_lock_and_keeps_concurrent_changes():
+    rng = np.random.default_rng(5)
+    vectors = rng.standard_normal((302, 32)).astype(np.float32)
+    cache = SemanticCache(threshold=0.99, max_entries=1000, partition_min_entries=300, n_probe=1000)
+    for i in range(299):
+        cache.store(f"question {i}", vectors[i], answer(f"question {i}"))
+
+    rebuild = SemanticCache._closest_centroids
+    during = []
+
+    def closest_centroids(rows, centroids, chunk=8192):
+        if not during:
+            # The lock is not reentrant, so these would deadlock if the rebuild held it
+            during.append(cache.lookup("question 5", vectors[5]))
+            cache.store("question 300", vectors[300], answer("question 300"))
+            cache.store("question 0", vectors[301], answer("question 0 again"))
+        return rebuild(rows, centroids, chunk)
+
+    cache._closest_centroids = closest_centroids
+    cache.store("question 299", vectors[299], answer("question 299"))
+
+    assert during[0].current_question == "question 5"
+    assert cache._centroids is not None
+    assert cache.lookup("unseen", vectors[300]).current_question == "question 300"
+    assert cache.lookup("unseen", vectors[301]).formatted_response == "answer to question 0 again"
+    assert cache.lookup("unseen", vectors[0]) is None
+    assert sorted(s for p in cache._partitions for s in p) == sorted(cache._entries)
+
+
+def test_question_is_embedded_once_for_the_cache_and_cypher_generation(monkeypatch):
+    class CountingEmbedder:
+        def __init__(self):
+            self.calls = 0
+
+        def embed_query(self, text):
+            self.calls += 1
+            return [1.0, 0.0, 0.0]
+
+    class VectorRecordingRetriever:
+        result_formatter = None
+        query_vectors = []
+
+        def get_search_results(self, query_text, query_vector=None):
+            self.query_vectors.append(query_vector)
+            return RawSearchResult(records=[Record({"name": "Tower A"})], metadata={"cypher": "MATCH (p:Property) RETURN p.name"})
+
+    retriever = VectorRecordingRetriever()
+    monkeypatch.setattr(AgentService, "_build_text2cypher_retriever", lambda self: retriever)
+    embedder = CountingEmbedder()
+    service = AgentService(
+        llm_registry=LLMRegistry(mode="fake"), driver=None, database="neo4j", embedder=embedder, semantic_cache=SemanticCache()
+    )
+
+    service.run("What is the vacancy rate of Tower A?")
+
+    assert embedder.calls == 1
+    assert retriever.query_vectors == [[1.0, 0.0, 0.0]]
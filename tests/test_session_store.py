@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+from app.pydantictypes import MultiTurnState, Text2CypherRetrieverOutput, RetrieverResultItem
+from app.sessions import InMemorySessionStore
+
+
+def state(question: str) -> MultiTurnState:
+    records = [RetrieverResultItem(content=f"name: Tower {i}") for i in range(500)]
+    return MultiTurnState(
+        current_question=question,
+        results=Text2CypherRetrieverOutput(cypher="MATCH (p:Property) RETURN p.name", results=records),
+        records_found=len(records),
+        formatted_response=f"answer to {question}"
+    )
+
+
+def test_session_round_trip_drops_records():
+    store = InMemorySessionStore()
+    session_id = store.create(state("list properties"))
+
+    restored = store.get(session_id)
+    assert restored.current_question == "list properties"
+    assert restored.records_found == 500
+    assert restored.results is None
+
+
+def test_least_recently_used_session_is_evicted():
+    store = InMemorySessionStore(max_sessions=2)
+    first = store.create(state("a"))
+    second = store.create(state("b"))
+    store.get(first)
+    store.create(state("c"))
+
+    assert store.get(second) is None
+    assert store.get(first) is not None
+    assert len(store) == 2
+
+
+def test_sessions_expire_after_ttl():
+    store = InMemorySessionStore(ttl_seconds=0.01)
+    session_id = asyncio.run(store.acreate(state("a")))
+    time.sleep(0.02)
+
+    assert asyncio.run(store.aget(session_id)) is None
+    assert len(store) == 0
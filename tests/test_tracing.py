@@ -0,0 +1,88 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.tracing import JsonlSpanExporter, Tracer, exporters
+
+
+def test_spans_follow_thread_pool_and_tasks():
+    tracer = Tracer()
+
+    def work(name):
+        with tracer.span(name):
+            pass
+
+    async def awork():
+        with tracer.span("task"):
+            await asyncio.sleep(0)
+
+    with tracer.trace("request", force=True) as trace:
+        with tracer.span("node"):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                pool.submit(tracer.wrap(work), "thread").result()
+            asyncio.run(awork())
+
+    spans = {row["name"]: row for row in trace.waterfall()}
+    assert spans["request"]["depth"] == 0
+    assert spans["node"]["parent_id"] == spans["request"]["span_id"]
+    assert spans["thread"]["parent_id"] == spans["node"]["span_id"]
+    assert spans["task"]["parent_id"] == spans["node"]["span_id"]
+
+
+def test_no_spans_without_trace_or_exporter():
+    tracer = Tracer()
+
+    with tracer.trace("request") as trace:
+        with tracer.span("node") as span:
+            assert span is None
+    assert trace is None
+
+
+def test_trace_is_exported_once_finished():
+    exported = []
+
+    class Collector:
+        def export(self, trace):
+            exported.append(trace)
+
+    tracer = Tracer()
+    tracer.add_exporter(Collector())
+    try:
+        with tracer.trace("request"):
+            with tracer.span("node"):
+                raise ValueError("neo4j down")
+    except ValueError:
+        pass
+
+    assert [s.name for s in exported[0].spans] == ["node", "request"]
+    assert exported[0].spans[0].status == "error"
+
+
+def test_jsonl_export_does_not_wait_for_the_disk(tmp_path, monkeypatch):
+    disk_ready = threading.Event()
+
+    def slow_open(*args, **kwargs):
+        disk_ready.wait(timeout=5.0)
+        return open(*args, **kwargs)
+
+    monkeypatch.setattr(exporters, "open", slow_open, raising=False)
+    exporter = JsonlSpanExporter(str(tmp_path / "spans.jsonl"))
+    tracer = Tracer()
+    tracer.add_exporter(exporter)
+
+    started = time.perf_counter()
+    for _ in range(3):
+        with tracer.trace("request"):
+            with tracer.span("node"):
+                pass
+    assert time.perf_counter() - started < 1.0
+
+    disk_ready.set()
+    exporter.flush()
+    lines = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["node", "request"] * 3
+
+    tracer.shutdown()
+    assert not exporter._writer.is_alive()
@@ -0,0 +1,22 @@
+import asyncio
+
+from app.startup import Readiness, warm_step
+
+
+def test_step_is_retried_until_it_succeeds():
+    readiness = Readiness(["neo4j", "agent"])
+    attempts = []
+
+    async def connect():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("refused")
+        return "driver"
+
+    assert asyncio.run(warm_step(readiness, "neo4j", connect, retry_seconds=0.001)) == "driver"
+    status = readiness.snapshot()
+
+    assert len(attempts) == 3
+    assert status["steps"]["neo4j"]["status"] == "ok"
+    assert status["steps"]["agent"] == {"status": "pending"}
+    assert not status["ready"]